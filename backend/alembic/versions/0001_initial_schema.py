@@ -0,0 +1,169 @@
+"""Initial schema
+
+The tables as create_all() built them before migrations were introduced:
+users, documents, workflow_history, comments and notifications.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19 08:36:04
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+ENUM_TYPES = (
+    "userrole", "userdepartment", "documenttype", "documentstatus",
+    "documentpriority", "notificationtype", "notificationpriority"
+)
+
+def upgrade() -> None:
+    op.create_table('users',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('username', sa.String(length=50), nullable=False),
+    sa.Column('email', sa.String(length=100), nullable=False),
+    sa.Column('hashed_password', sa.String(length=255), nullable=False),
+    sa.Column('full_name', sa.String(length=100), nullable=True),
+    sa.Column('role', sa.Enum('admin', 'executive', 'maintenance', 'compliance', 'finance', 'user', name='userrole'), nullable=False),
+    sa.Column('department', sa.Enum('management', 'engineering', 'operations', 'legal_compliance', 'finance', 'general', name='userdepartment'), nullable=False),
+    sa.Column('permissions', sa.Text(), nullable=True),
+    sa.Column('language_preference', sa.String(length=10), nullable=True),
+    sa.Column('notification_settings', sa.Text(), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('is_verified', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('last_login', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_users_email'), 'users', ['email'], unique=True)
+    op.create_index(op.f('ix_users_id'), 'users', ['id'], unique=False)
+    op.create_index(op.f('ix_users_username'), 'users', ['username'], unique=True)
+
+    op.create_table('documents',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('title', sa.String(length=255), nullable=False),
+    sa.Column('summary', sa.Text(), nullable=True),
+    sa.Column('content', sa.Text(), nullable=True),
+    sa.Column('type', sa.Enum('safety', 'maintenance', 'compliance', 'finance', 'operations', 'training', name='documenttype'), nullable=False),
+    sa.Column('department', sa.String(length=50), nullable=False),
+    sa.Column('status', sa.Enum('draft', 'pending', 'approved', 'rejected', 'archived', name='documentstatus'), nullable=True),
+    sa.Column('priority', sa.Enum('low', 'medium', 'high', 'urgent', name='documentpriority'), nullable=True),
+    sa.Column('file_path', sa.String(length=500), nullable=False),
+    sa.Column('file_name', sa.String(length=255), nullable=False),
+    sa.Column('file_type', sa.String(length=10), nullable=False),
+    sa.Column('file_size', sa.Integer(), nullable=False),
+    sa.Column('version', sa.String(length=20), nullable=True),
+    sa.Column('page_count', sa.Integer(), nullable=True),
+    sa.Column('uploaded_by', sa.Integer(), nullable=False),
+    sa.Column('approved_by', sa.Integer(), nullable=True),
+    sa.Column('approval_required', sa.Boolean(), nullable=True),
+    sa.Column('deadline', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('view_count', sa.Integer(), nullable=True),
+    sa.Column('download_count', sa.Integer(), nullable=True),
+    sa.Column('bookmarked_by', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('approved_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['approved_by'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['uploaded_by'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_documents_department'), 'documents', ['department'], unique=False)
+    op.create_index(op.f('ix_documents_id'), 'documents', ['id'], unique=False)
+    op.create_index(op.f('ix_documents_priority'), 'documents', ['priority'], unique=False)
+    op.create_index(op.f('ix_documents_status'), 'documents', ['status'], unique=False)
+    op.create_index(op.f('ix_documents_title'), 'documents', ['title'], unique=False)
+    op.create_index(op.f('ix_documents_type'), 'documents', ['type'], unique=False)
+
+    op.create_table('comments',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('content', sa.Text(), nullable=False),
+    sa.Column('page_number', sa.Integer(), nullable=True),
+    sa.Column('position_x', sa.Integer(), nullable=True),
+    sa.Column('position_y', sa.Integer(), nullable=True),
+    sa.Column('document_id', sa.Integer(), nullable=False),
+    sa.Column('author_id', sa.Integer(), nullable=False),
+    sa.Column('parent_id', sa.Integer(), nullable=True),
+    sa.Column('is_resolved', sa.Boolean(), nullable=True),
+    sa.Column('is_internal', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['author_id'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['document_id'], ['documents.id'], ),
+    sa.ForeignKeyConstraint(['parent_id'], ['comments.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_comments_id'), 'comments', ['id'], unique=False)
+
+    op.create_table('notifications',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('title', sa.String(length=255), nullable=False),
+    sa.Column('message', sa.Text(), nullable=False),
+    sa.Column('type', sa.Enum('document_action', 'system', 'comment', 'deadline_reminder', 'approval_request', name='notificationtype'), nullable=False),
+    sa.Column('priority', sa.Enum('low', 'medium', 'high', 'urgent', name='notificationpriority'), nullable=True),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('document_id', sa.Integer(), nullable=True),
+    sa.Column('is_read', sa.Boolean(), nullable=True),
+    sa.Column('action_required', sa.Boolean(), nullable=True),
+    sa.Column('extra_data', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('read_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['document_id'], ['documents.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_notifications_id'), 'notifications', ['id'], unique=False)
+    op.create_index(op.f('ix_notifications_is_read'), 'notifications', ['is_read'], unique=False)
+    op.create_index(op.f('ix_notifications_type'), 'notifications', ['type'], unique=False)
+
+    op.create_table('workflow_history',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('document_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('action', sa.String(length=50), nullable=False),
+    sa.Column('comments', sa.Text(), nullable=True),
+    sa.Column('previous_status', sa.String(length=20), nullable=True),
+    sa.Column('new_status', sa.String(length=20), nullable=True),
+    sa.Column('timestamp', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.ForeignKeyConstraint(['document_id'], ['documents.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_workflow_history_id'), 'workflow_history', ['id'], unique=False)
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_workflow_history_id'), table_name='workflow_history')
+    op.drop_table('workflow_history')
+
+    op.drop_index(op.f('ix_notifications_type'), table_name='notifications')
+    op.drop_index(op.f('ix_notifications_is_read'), table_name='notifications')
+    op.drop_index(op.f('ix_notifications_id'), table_name='notifications')
+    op.drop_table('notifications')
+
+    op.drop_index(op.f('ix_comments_id'), table_name='comments')
+    op.drop_table('comments')
+
+    op.drop_index(op.f('ix_documents_type'), table_name='documents')
+    op.drop_index(op.f('ix_documents_title'), table_name='documents')
+    op.drop_index(op.f('ix_documents_status'), table_name='documents')
+    op.drop_index(op.f('ix_documents_priority'), table_name='documents')
+    op.drop_index(op.f('ix_documents_id'), table_name='documents')
+    op.drop_index(op.f('ix_documents_department'), table_name='documents')
+    op.drop_table('documents')
+
+    op.drop_index(op.f('ix_users_username'), table_name='users')
+    op.drop_index(op.f('ix_users_id'), table_name='users')
+    op.drop_index(op.f('ix_users_email'), table_name='users')
+    op.drop_table('users')
+
+    if op.get_bind().dialect.name == "postgresql":
+        for name in ENUM_TYPES:
+            sa.Enum(name=name).drop(op.get_bind(), checkfirst=True)
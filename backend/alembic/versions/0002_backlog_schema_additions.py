@@ -0,0 +1,189 @@
+"""Backlog schema additions
+
+Digest queue, email outbox, scheduler watermarks, token revocations,
+replication heartbeat, comment paths and query indexes.
+
+Databases that were kept up to date by create_all() before migrations
+existed may already have some of these objects, so every step checks
+first. Stamp such a database at 0001 and upgrade:
+
+    alembic stamp 0001 && alembic upgrade head
+
+Replaces migrate_comment_paths.py: comments.path is added and backfilled
+from each comment's parent chain.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19 08:38:12
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Frozen copies of app.models.comment constants at this revision
+PATH_SEGMENT_WIDTH = 10
+PATH_MAX_LENGTH = 500
+BATCH_SIZE = 1000
+
+def existing_enum(*values: str, name: str) -> sa.Enum:
+    """Enum whose Postgres type was created by an earlier revision"""
+    return sa.Enum(*values, name=name).with_variant(
+        postgresql.ENUM(*values, name=name, create_type=False), "postgresql"
+    )
+
+def has_table(name: str) -> bool:
+    return sa.inspect(op.get_bind()).has_table(name)
+
+def has_column(table: str, column: str) -> bool:
+    return column in {c["name"] for c in sa.inspect(op.get_bind()).get_columns(table)}
+
+def has_index(table: str, index: str) -> bool:
+    return index in {i["name"] for i in sa.inspect(op.get_bind()).get_indexes(table)}
+
+def create_index(name: str, table: str, columns: list) -> None:
+    if not has_index(table, name):
+        op.create_index(name, table, columns, unique=False)
+
+def backfill_comment_paths() -> None:
+    """Compute the path of every comment from its parent chain"""
+    bind = op.get_bind()
+    comments = sa.table(
+        "comments",
+        sa.column("id", sa.Integer),
+        sa.column("parent_id", sa.Integer),
+        sa.column("path", sa.String),
+        sa.column("updated_at", sa.DateTime)
+    )
+    parents = dict(bind.execute(sa.select(comments.c.id, comments.c.parent_id)).all())
+    paths = {}
+
+    def path_of(comment_id):
+        # Walk up iteratively, deep threads would overflow recursion
+        chain = []
+        current = comment_id
+        while current is not None and current not in paths:
+            chain.append(current)
+            current = parents.get(current)
+        prefix = paths.get(current, "")
+        for ancestor_id in reversed(chain):
+            prefix += str(ancestor_id).zfill(PATH_SEGMENT_WIDTH)
+            paths[ancestor_id] = prefix
+        return paths[comment_id]
+
+    rows = [{"comment_id": comment_id, "comment_path": path_of(comment_id)} for comment_id in parents]
+
+    # Keep updated_at as is, the comments themselves did not change
+    statement = comments.update().where(
+        comments.c.id == sa.bindparam("comment_id")
+    ).values(path=sa.bindparam("comment_path"), updated_at=comments.c.updated_at)
+    for start in range(0, len(rows), BATCH_SIZE):
+        bind.execute(statement, rows[start:start + BATCH_SIZE])
+
+def upgrade() -> None:
+    if not has_table('notification_digest_queue'):
+        op.create_table('notification_digest_queue',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('frequency', sa.String(length=10), nullable=False),
+        sa.Column('title', sa.String(length=255), nullable=False),
+        sa.Column('message', sa.Text(), nullable=False),
+        sa.Column('type', existing_enum('document_action', 'system', 'comment', 'deadline_reminder', 'approval_request', name='notificationtype'), nullable=False),
+        sa.Column('priority', existing_enum('low', 'medium', 'high', 'urgent', name='notificationpriority'), nullable=True),
+        sa.Column('document_id', sa.Integer(), nullable=True),
+        sa.Column('extra_data', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.ForeignKeyConstraint(['document_id'], ['documents.id'], ),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id')
+        )
+    create_index('ix_notification_digest_queue_id', 'notification_digest_queue', ['id'])
+    create_index('ix_notification_digest_queue_frequency_user', 'notification_digest_queue', ['frequency', 'user_id'])
+
+    if not has_table('email_outbox'):
+        op.create_table('email_outbox',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('to_address', sa.String(length=100), nullable=False),
+        sa.Column('subject', sa.String(length=255), nullable=False),
+        sa.Column('body', sa.Text(), nullable=False),
+        sa.Column('status', sa.Enum('pending', 'sent', 'failed', name='emailstatus'), nullable=False),
+        sa.Column('attempts', sa.Integer(), nullable=False),
+        sa.Column('next_attempt_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column('sent_at', sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+        )
+    create_index('ix_email_outbox_id', 'email_outbox', ['id'])
+    create_index('ix_email_outbox_status_next_attempt', 'email_outbox', ['status', 'next_attempt_at'])
+
+    if not has_table('scheduler_watermarks'):
+        op.create_table('scheduler_watermarks',
+        sa.Column('name', sa.String(length=50), nullable=False),
+        sa.Column('value', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.PrimaryKeyConstraint('name')
+        )
+
+    if not has_table('token_revocations'):
+        op.create_table('token_revocations',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('token_id', sa.String(length=64), nullable=True),
+        sa.Column('user_id', sa.Integer(), nullable=True),
+        sa.Column('revoked_before', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+        )
+    create_index('ix_token_revocations_id', 'token_revocations', ['id'])
+    create_index('ix_token_revocations_expires_at', 'token_revocations', ['expires_at'])
+
+    if not has_table('replication_heartbeat'):
+        op.create_table('replication_heartbeat',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('beat_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+        )
+
+    if not has_column('comments', 'path'):
+        with op.batch_alter_table('comments', schema=None) as batch_op:
+            batch_op.add_column(sa.Column('path', sa.String(length=PATH_MAX_LENGTH), nullable=True))
+    backfill_comment_paths()
+    create_index('ix_comments_path', 'comments', ['path'])
+    create_index('ix_comments_document_page', 'comments', ['document_id', 'page_number'])
+
+    create_index('ix_documents_status_deadline', 'documents', ['status', 'deadline'])
+
+def downgrade() -> None:
+    op.drop_index('ix_documents_status_deadline', table_name='documents')
+
+    op.drop_index('ix_comments_document_page', table_name='comments')
+    op.drop_index('ix_comments_path', table_name='comments')
+    with op.batch_alter_table('comments', schema=None) as batch_op:
+        batch_op.drop_column('path')
+
+    op.drop_table('replication_heartbeat')
+
+    op.drop_index('ix_token_revocations_expires_at', table_name='token_revocations')
+    op.drop_index('ix_token_revocations_id', table_name='token_revocations')
+    op.drop_table('token_revocations')
+
+    op.drop_table('scheduler_watermarks')
+
+    op.drop_index('ix_email_outbox_status_next_attempt', table_name='email_outbox')
+    op.drop_index('ix_email_outbox_id', table_name='email_outbox')
+    op.drop_table('email_outbox')
+    if op.get_bind().dialect.name == "postgresql":
+        sa.Enum(name='emailstatus').drop(op.get_bind(), checkfirst=True)
+
+    op.drop_index('ix_notification_digest_queue_frequency_user', table_name='notification_digest_queue')
+    op.drop_index('ix_notification_digest_queue_id', table_name='notification_digest_queue')
+    op.drop_table('notification_digest_queue')
@@ -0,0 +1,33 @@
+"""Document row version
+
+documents.row_version is the optimistic concurrency counter behind
+If-Match and the compare-and-set UPDATE of edits and workflow actions.
+Existing rows start at 1.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19 09:05:41
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def has_column(table: str, column: str) -> bool:
+    return column in {c["name"] for c in sa.inspect(op.get_bind()).get_columns(table)}
+
+def upgrade() -> None:
+    if not has_column('documents', 'row_version'):
+        with op.batch_alter_table('documents', schema=None) as batch_op:
+            batch_op.add_column(sa.Column('row_version', sa.Integer(), server_default='1', nullable=False))
+
+def downgrade() -> None:
+    with op.batch_alter_table('documents', schema=None) as batch_op:
+        batch_op.drop_column('row_version')
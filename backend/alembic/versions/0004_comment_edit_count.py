@@ -0,0 +1,32 @@
+"""Comment edit counter
+
+comments.edit_count is bumped by every UPDATE so the comment list ETag
+changes on edits made within the same second.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19 10:12:27
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def has_column(table: str, column: str) -> bool:
+    return column in {c["name"] for c in sa.inspect(op.get_bind()).get_columns(table)}
+
+def upgrade() -> None:
+    if not has_column('comments', 'edit_count'):
+        with op.batch_alter_table('comments', schema=None) as batch_op:
+            batch_op.add_column(sa.Column('edit_count', sa.Integer(), server_default='0', nullable=False))
+
+def downgrade() -> None:
+    with op.batch_alter_table('comments', schema=None) as batch_op:
+        batch_op.drop_column('edit_count')
@@ -0,0 +1,55 @@
+"""Per-document deadline reminder state
+
+documents.reminded_offset_hours replaces the deadline_reminders watermark.
+Pending documents are backfilled with the most urgent offset they had
+reached at the watermark (or now, when reminders never ran), so the upgrade
+neither re-sends reminders nor floods owners with overdue ones.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19 14:20:03
+
+"""
+from datetime import datetime, timedelta
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.core.config import settings
+
+# revision identifiers, used by Alembic.
+revision: str = '0005'
+down_revision: Union[str, None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def has_column(table: str, column: str) -> bool:
+    return column in {c["name"] for c in sa.inspect(op.get_bind()).get_columns(table)}
+
+def upgrade() -> None:
+    if has_column('documents', 'reminded_offset_hours'):
+        return
+    with op.batch_alter_table('documents', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('reminded_offset_hours', sa.Integer(), nullable=True))
+
+    bind = op.get_bind()
+    reached = bind.execute(
+        sa.text("SELECT value FROM scheduler_watermarks WHERE name = 'deadline_reminders'")
+    ).scalar()
+    if isinstance(reached, str):
+        reached = datetime.fromisoformat(reached)
+    reached = reached.replace(tzinfo=None) if reached else datetime.utcnow()
+    for offset_hours in sorted(settings.DEADLINE_REMINDER_OFFSETS_HOURS):
+        bind.execute(
+            sa.text(
+                "UPDATE documents SET reminded_offset_hours = :offset "
+                "WHERE status = 'pending' AND deadline <= :due AND reminded_offset_hours IS NULL"
+            ),
+            {"offset": offset_hours, "due": reached + timedelta(hours=offset_hours)}
+        )
+    bind.execute(sa.text("DELETE FROM scheduler_watermarks WHERE name = 'deadline_reminders'"))
+
+def downgrade() -> None:
+    with op.batch_alter_table('documents', schema=None) as batch_op:
+        batch_op.drop_column('reminded_offset_hours')
@@ -2,25 +2,153 @@
 Dependencies for API endpoints
 """
 
-from typing import Generator, Optional
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
 
+from app.core.cache import TTLCache, invalidation_bus
 from app.core.config import settings
-from app.core.database import get_db
-from app.core.security import verify_token
-from app.models.user import User
+from app.core.permissions import Permission, compile_permissions, has_permission
+from app.core.database import SessionLocal, get_db
+from app.core.security import decode_token
+from app.models.user import User, UserRole, UserDepartment
+from app.services.token_revocation import revocation_list
 
 oauth2_scheme = OAuth2PasswordBearer(
     tokenUrl=f"{settings.API_V1_STR}/auth/login"
 )
 
+@dataclass(frozen=True)
+class AuthUser:
+    """Authorization-relevant fields of a user, safe to cache"""
+    id: int
+    role: UserRole
+    department: UserDepartment
+    is_active: bool
+    permission_bits: int
+
+# Cached AuthUser by user id, avoids a SELECT on every authenticated request
+auth_user_cache = TTLCache(
+    maxsize=settings.AUTH_CACHE_MAX_SIZE,
+    ttl=settings.AUTH_CACHE_TTL_SECONDS,
+    name="auth_user"
+)
+invalidation_bus.register("auth_user", auth_user_cache.delete, reset=auth_user_cache.clear)
+
+def invalidate_auth_user(user_id: int) -> None:
+    """Drop a user from the auth cache on every worker"""
+    invalidation_bus.publish("auth_user", user_id)
+
+def get_auth_user(db: Session, user_id: int) -> Optional[AuthUser]:
+    auth_user = auth_user_cache.get(user_id)
+    if auth_user is None:
+        row = db.query(
+            User.id, User.role, User.department, User.is_active, User.permissions
+        ).filter(User.id == user_id).first()
+        if row is None:
+            return None
+        auth_user = AuthUser(
+            id=row.id,
+            role=row.role,
+            department=row.department,
+            is_active=row.is_active,
+            permission_bits=compile_permissions(row.role, row.permissions)
+        )
+        auth_user_cache.set(user_id, auth_user)
+    return auth_user
+
+class CurrentUser:
+    """
+    The authenticated user.
+
+    id, role, department, is_active and permission_bits come from the auth cache.
+    Anything else (names, settings, or the ORM object to modify) needs load(),
+    which queries the full user row once per request.
+    """
+
+    def __init__(self, auth_user: AuthUser, db: Session):
+        self._auth_user = auth_user
+        self._db = db
+        self._user: Optional[User] = None
+
+    @property
+    def id(self) -> int:
+        return self._auth_user.id
+
+    @property
+    def role(self) -> UserRole:
+        return self._auth_user.role
+
+    @property
+    def department(self) -> UserDepartment:
+        return self._auth_user.department
+
+    @property
+    def is_active(self) -> bool:
+        return self._auth_user.is_active
+
+    @property
+    def permission_bits(self) -> int:
+        return self._auth_user.permission_bits
+
+    def load(self) -> User:
+        if self._user is None:
+            self._user = self._db.get(User, self._auth_user.id)
+        return self._user
+
+def get_token_claims(token: str = Depends(oauth2_scheme)) -> Dict[str, Any]:
+    """
+    Claims of a valid, unrevoked access token
+    """
+    payload = decode_token(token)
+    if payload is None or revocation_list.is_revoked(payload):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return payload
+
+def authorization_has_permission(authorization: Optional[str], permission: Permission) -> bool:
+    """
+    Whether an Authorization header carries a valid token of an active user
+    holding permission, for checks outside the dependency system (middleware)
+    """
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return False
+    payload = decode_token(token)
+    if payload is None or revocation_list.is_revoked(payload):
+        return False
+    db = SessionLocal()
+    try:
+        auth_user = get_auth_user(db, int(payload["sub"]))
+    finally:
+        db.close()
+    return auth_user is not None and auth_user.is_active and has_permission(auth_user, permission)
+
+def get_read_db(
+    db: Session = Depends(get_db),
+    claims: Dict[str, Any] = Depends(get_token_claims)
+) -> Session:
+    """
+    Session for read-only endpoints, served by a replica when one is within
+    REPLICA_MAX_LAG_SECONDS and the user has not written recently.
+
+    This is the request's get_db session (shared with get_current_user),
+    flagged read-only, so a request never holds more than one connection.
+    """
+    db.info["read_only"] = True
+    db.info["subject"] = claims["sub"]
+    return db
+
 def get_current_user(
     db: Session = Depends(get_db),
-    token: str = Depends(oauth2_scheme)
-) -> User:
+    claims: Dict[str, Any] = Depends(get_token_claims)
+) -> CurrentUser:
     """
     Get current authenticated user
     """
@@ -29,32 +157,47 @@ def get_current_user(
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    
-    user_id = verify_token(token)
-    if user_id is None:
-        raise credentials_exception
-    
-    user = db.query(User).filter(User.id == int(user_id)).first()
-    if user is None:
+
+    # Writes in this session send the user's reads to the primary for a while
+    db.info["subject"] = claims["sub"]
+    auth_user = get_auth_user(db, int(claims["sub"]))
+    # A cache miss queried the database: return the connection to the pool
+    # instead of holding it until the endpoint needs one (possibly a replica)
+    if db.in_transaction():
+        db.rollback()
+    if auth_user is None:
         raise credentials_exception
-    
-    if not user.is_active:
+
+    if not auth_user.is_active:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Inactive user"
         )
-    
-    return user
+
+    return CurrentUser(auth_user, db)
 
 def get_current_active_superuser(
-    current_user: User = Depends(get_current_user),
-) -> User:
+    current_user: CurrentUser = Depends(get_current_user),
+) -> CurrentUser:
     """
-    Get current user if they are an admin
+    Get current user if they can manage users
     """
-    if current_user.role != "admin":
+    if not has_permission(current_user, Permission.manage_users):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not enough permissions"
         )
-    return current_user
\ No newline at end of file
+    return current_user
+
+def require_permission(permission: Permission):
+    """
+    Dependency returning the current user if they hold permission
+    """
+    def dependency(current_user: CurrentUser = Depends(get_current_user)) -> CurrentUser:
+        if not has_permission(current_user, permission):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Not enough permissions"
+            )
+        return current_user
+    return dependency
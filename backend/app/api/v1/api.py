@@ -4,7 +4,7 @@ Main API router that includes all endpoint routers
 
 from fastapi import APIRouter
 
-from app.api.v1.endpoints import auth, documents, users, notifications, dashboard, comments
+from app.api.v1.endpoints import auth, documents, users, notifications, dashboard, comments, collaboration, profiles
 
 api_router = APIRouter()
 
@@ -14,4 +14,9 @@ api_router.include_router(documents.router, prefix="/documents", tags=["document
 api_router.include_router(comments.router, prefix="/documents", tags=["comments"])
 api_router.include_router(users.router, prefix="/users", tags=["users"])
 api_router.include_router(notifications.router, prefix="/notifications", tags=["notifications"])
-api_router.include_router(dashboard.router, prefix="/dashboard", tags=["dashboard"])
\ No newline at end of file
+api_router.include_router(dashboard.router, prefix="/dashboard", tags=["dashboard"])
+api_router.include_router(profiles.router, prefix="/profiles", tags=["profiling"])
+
+# WebSocket routes, mounted under /ws
+ws_router = APIRouter()
+ws_router.include_router(collaboration.router, prefix="/documents")
\ No newline at end of file
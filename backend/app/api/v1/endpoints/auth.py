@@ -2,35 +2,107 @@
 Authentication endpoints
 """
 
-from datetime import timedelta
-from typing import Any
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
 from app.core.config import settings
 from app.core.database import get_db
-from app.core.security import verify_password, create_access_token, verify_token
+from app.core.ratelimit import TokenBucketLimiter, enforce
+from app.core.security import (
+    verify_and_update_password_async, create_access_token, create_refresh_token,
+    decode_token, new_session_id
+)
 from app.models.user import User
-from app.schemas.user import UserLogin, Token, User as UserSchema, UserProfileUpdate
-from app.api.deps import get_current_user
+from app.schemas.user import (
+    UserLogin, Token, TokenRefresh, RefreshTokenRequest, User as UserSchema, UserProfileUpdate
+)
+from app.api.deps import get_current_user, get_token_claims, get_auth_user, invalidate_auth_user
+from app.services.token_revocation import revocation_list, revoke_token_id
 
 router = APIRouter()
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/auth/login")
 
+login_username_limiter = TokenBucketLimiter(
+    burst=settings.LOGIN_USERNAME_BURST,
+    per_minute=settings.LOGIN_USERNAME_PER_MINUTE
+)
+login_ip_limiter = TokenBucketLimiter(
+    burst=settings.LOGIN_IP_BURST,
+    per_minute=settings.LOGIN_IP_PER_MINUTE
+)
+
+def find_user(db: Session, username: str) -> Optional[User]:
+    """
+    The user, detached with its columns loaded. The transaction is ended so
+    the connection goes back to the pool while bcrypt runs: queued behind a
+    login burst that can take seconds, and holding a connection meanwhile
+    would exhaust the pool.
+    """
+    user = db.query(User).filter(User.username == username).first()
+    if user is not None:
+        db.expunge(user)
+    db.rollback()
+    return user
+
+def record_login(db: Session, user: User, new_hash: Optional[str]) -> UserSchema:
+    """Update last login, and the hash if the bcrypt cost changed; returns the user response"""
+    db.add(user)
+    user.last_login = datetime.utcnow()
+    if new_hash:
+        user.hashed_password = new_hash
+    db.commit()
+    
+    # Create user response with converted JSON fields
+    return UserSchema(
+        id=user.id,
+        username=user.username,
+        email=user.email,
+        full_name=user.full_name,
+        role=user.role,
+        department=user.department,
+        permissions=user.permissions_list,
+        language_preference=user.language_preference,
+        notification_settings=user.notification_settings_dict,
+        is_active=user.is_active,
+        is_verified=user.is_verified,
+        created_at=user.created_at,
+        updated_at=user.updated_at,
+        last_login=user.last_login
+    )
+
 @router.post("/login", response_model=Token)
 async def login(
+    request: Request,
     form_data: OAuth2PasswordRequestForm = Depends(),
     db: Session = Depends(get_db)
 ) -> Any:
     """
     OAuth2 compatible token login, get an access token for future requests
+    
+    Async so bcrypt runs on the bounded hashing executor; the database work
+    runs in the threadpool, never on the event loop.
     """
-    user = db.query(User).filter(User.username == form_data.username).first()
+    # Throttle before touching the database or bcrypt; only failures use up
+    # the budget, so a shift change behind one NAT address is not throttled
+    client_ip = request.client.host if request.client else "unknown"
+    username_key = form_data.username.lower()
+    enforce(login_ip_limiter, client_ip, "Too many failed login attempts from this address")
+    enforce(login_username_limiter, username_key, "Too many failed login attempts for this user")
+    
+    user = await run_in_threadpool(find_user, db, form_data.username)
     
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    valid, new_hash = await verify_and_update_password_async(
+        form_data.password, user.hashed_password if user else None
+    )
+    if not user or not valid:
+        login_ip_limiter.charge(client_ip)
+        login_username_limiter.charge(username_key)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
@@ -43,57 +115,79 @@ async def login(
             detail="Inactive user"
         )
     
-    access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = create_access_token(
-        subject=user.id, expires_delta=access_token_expires
-    )
+    session_id = new_session_id()
+    access_token = create_access_token(subject=user.id, session_id=session_id)
+    refresh_token = create_refresh_token(subject=user.id, session_id=session_id)
     
-    # Update last login
-    from datetime import datetime
-    user.last_login = datetime.utcnow()
-    db.commit()
-    
-    # Create user response with converted JSON fields
-    user_response = UserSchema(
-        id=user.id,
-        username=user.username,
-        email=user.email,
-        full_name=user.full_name,
-        role=user.role,
-        department=user.department,
-        permissions=user.permissions_list,
-        language_preference=user.language_preference,
-        notification_settings=user.notification_settings_dict,
-        is_active=user.is_active,
-        is_verified=user.is_verified,
-        created_at=user.created_at,
-        updated_at=user.updated_at,
-        last_login=user.last_login
-    )
+    user_response = await run_in_threadpool(record_login, db, user, new_hash)
     
     return {
         "access_token": access_token,
+        "refresh_token": refresh_token,
         "token_type": "bearer",
         "expires_in": settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
         "user": user_response
     }
 
+@router.post("/refresh", response_model=TokenRefresh)
+def refresh_access_token(
+    refresh_data: RefreshTokenRequest,
+    db: Session = Depends(get_db)
+) -> Any:
+    """
+    Exchange a refresh token for a new access and refresh token
+    """
+    credentials_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Invalid refresh token",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+    
+    payload = decode_token(refresh_data.refresh_token, token_type="refresh")
+    if payload is None:
+        raise credentials_exception
+    
+    if revocation_list.is_revoked(payload):
+        # A refresh token is only used once, reuse means it leaked: end the session
+        if payload["jti"] in revocation_list.token_ids:
+            revoke_token_id(db, payload["sid"], datetime.utcfromtimestamp(payload["exp"]))
+        raise credentials_exception
+    
+    auth_user = get_auth_user(db, int(payload["sub"]))
+    if auth_user is None or not auth_user.is_active:
+        raise credentials_exception
+    
+    # Rotate: the presented refresh token cannot be used again
+    revoke_token_id(db, payload["jti"], datetime.utcfromtimestamp(payload["exp"]))
+    
+    return {
+        "access_token": create_access_token(subject=auth_user.id, session_id=payload["sid"]),
+        "refresh_token": create_refresh_token(subject=auth_user.id, session_id=payload["sid"]),
+        "token_type": "bearer",
+        "expires_in": settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+    }
+
 @router.post("/logout")
-async def logout(current_user: User = Depends(get_current_user)) -> Any:
+def logout(
+    claims: Dict[str, Any] = Depends(get_token_claims),
+    db: Session = Depends(get_db)
+) -> Any:
     """
-    Logout user (in a real app, you'd invalidate the token)
+    Logout user, revoking the access and refresh tokens of this login
     """
+    expires_at = datetime.utcnow() + timedelta(minutes=settings.REFRESH_TOKEN_EXPIRE_MINUTES)
+    revoke_token_id(db, claims["sid"], expires_at)
     return {"message": "Logout successful"}
 
 @router.get("/me", response_model=UserSchema)
-async def read_users_me(current_user: User = Depends(get_current_user)) -> Any:
+def read_users_me(current_user: User = Depends(get_current_user)) -> Any:
     """
     Get current user profile
     """
-    return current_user
+    return current_user.load()
 
 @router.put("/profile", response_model=UserSchema)
-async def update_profile(
+def update_profile(
     profile_data: UserProfileUpdate,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -101,16 +195,18 @@ async def update_profile(
     """
     Update current user profile
     """
+    user = current_user.load()
     update_data = profile_data.dict(exclude_unset=True)
     
     for field, value in update_data.items():
         if field == "notification_settings" and value:
             import json
-            setattr(current_user, field, json.dumps(value))
+            setattr(user, field, json.dumps(value))
         else:
-            setattr(current_user, field, value)
+            setattr(user, field, value)
     
     db.commit()
-    db.refresh(current_user)
+    invalidate_auth_user(user.id)
+    db.refresh(user)
     
-    return current_user
\ No newline at end of file
+    return user
\ No newline at end of file
@@ -0,0 +1,76 @@
+"""
+Real-time document collaboration WebSocket
+"""
+
+import time
+from typing import Optional
+
+from fastapi import APIRouter, Query, WebSocket, WebSocketDisconnect, status
+from starlette.concurrency import run_in_threadpool
+
+from app.core.database import SessionLocal
+from app.core.permissions import compile_permissions
+from app.core.security import decode_token
+from app.models.document import Document
+from app.models.user import User
+from app.services.collaboration import collaboration_hub, Viewer
+from app.services.token_revocation import revocation_list
+
+router = APIRouter()
+
+def authorize_viewer(token: str, document_id: int) -> Optional[Viewer]:
+    """
+    The viewer for a valid token of an active user, None otherwise or when the
+    document does not exist. Blocking (revocation list and database), so it
+    runs in the threadpool.
+    """
+    claims = decode_token(token)
+    user_id = claims["sub"] if claims and not revocation_list.is_revoked(claims) else None
+
+    # Short-lived session, the socket may stay open for hours
+    db = SessionLocal()
+    try:
+        user = db.query(User).filter(User.id == int(user_id)).first() if user_id else None
+        document_exists = db.query(Document.id).filter(Document.id == document_id).first()
+    finally:
+        db.close()
+
+    if user is None or not user.is_active or not document_exists:
+        return None
+    return Viewer(
+        user_id=user.id,
+        username=user.username,
+        full_name=user.full_name,
+        permission_bits=compile_permissions(user.role, user.permissions),
+        last_seen=time.monotonic()
+    )
+
+@router.websocket("/{document_id}")
+async def document_collaboration(
+    websocket: WebSocket,
+    document_id: int,
+    token: str = Query(...)
+):
+    """
+    Join the live room of a document.
+
+    Events sent to clients: comment_added, status_changed, user_viewing.
+    Clients send {"type": "heartbeat"} periodically to stay present.
+    """
+    viewer = await run_in_threadpool(authorize_viewer, token, document_id)
+    if viewer is None:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    await websocket.accept()
+    await collaboration_hub.join(document_id, websocket, viewer)
+
+    try:
+        while True:
+            # Any message counts as a heartbeat
+            await websocket.receive_text()
+            collaboration_hub.heartbeat(document_id, websocket)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        await collaboration_hub.leave(document_id, websocket)
@@ -3,52 +3,115 @@ Comments & Annotations endpoints
 """
 
 from typing import Any, List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Request, status, Query
+from sqlalchemy import or_, func
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
 
 from app.core.database import get_db
-from app.models.comment import Comment
+from app.core.http_cache import CacheValidators
+from app.core.serialization import json_response
+from app.core.permissions import Permission, has_permission
+from app.models.comment import Comment, PATH_SEGMENT_WIDTH, MAX_THREAD_DEPTH
 from app.models.document import Document
 from app.models.user import User
+from app.models.notification import NotificationType, NotificationPriority
 from app.schemas.comment import (
     Comment as CommentSchema,
     CommentCreate,
     CommentUpdate,
-    CommentList
+    CommentList,
+    AnnotationList
 )
-from app.api.deps import get_current_user
+from app.api.deps import get_current_user, get_read_db
+from app.services.collaboration import collaboration_hub
+from app.services.notifications import notify_user
 from datetime import datetime
 
 router = APIRouter()
 
+def load_threads(db: Session, roots: List[Comment], show_internal: bool) -> None:
+    """
+    Attach the full reply tree of each root comment.
+    
+    Descendants are fetched with one indexed range query on the materialized
+    path per root, ordered by path (display order), and linked in memory so
+    serialization does not trigger lazy loads.
+    """
+    children = {root.path: [] for root in roots if root.path}
+    
+    if children:
+        query = db.query(Comment).options(selectinload(Comment.author)).filter(
+            or_(*[Comment.subtree_filter(path) for path in children])
+        )
+        if not show_internal:
+            query = query.filter(Comment.is_internal == False)
+        
+        for comment in query.order_by(Comment.path):
+            if comment.path in children:
+                continue  # One of the roots
+            siblings = children.get(comment.path[:-PATH_SEGMENT_WIDTH])
+            # A hidden (internal) parent hides its whole branch
+            if siblings is None:
+                continue
+            siblings.append(comment)
+            children[comment.path] = []
+    
+    for comment in roots:
+        set_committed_value(comment, "replies", children.get(comment.path, []))
+    for path, replies in children.items():
+        for reply in replies:
+            set_committed_value(reply, "replies", children[reply.path])
+
 @router.get("/{document_id}/comments", response_model=CommentList)
-async def get_document_comments(
+def get_document_comments(
     document_id: int,
+    request: Request,
     page: int = Query(1, ge=1),
     limit: int = Query(20, le=100),
     include_internal: bool = Query(False),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ) -> Any:
     """
     Get comments for a document
     """
     # Check if document exists
-    document = db.query(Document).filter(Document.id == document_id).first()
+    document = db.query(Document.id).filter(Document.id == document_id).first()
     if not document:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Document not found"
         )
     
+    # Internal comments are only visible to users allowed to see them
+    show_internal = include_internal and has_permission(current_user, Permission.view_internal_comments)
+    
+    # Any added, edited or deleted comment or reply changes count, newest id
+    # or the edit counter sum (timestamps alone miss edits within a second)
+    probe = db.query(
+        func.count(Comment.id),
+        func.max(Comment.id),
+        func.sum(Comment.edit_count),
+        func.max(func.coalesce(Comment.updated_at, Comment.created_at))
+    ).filter(Comment.document_id == document_id)
+    if not show_internal:
+        probe = probe.filter(Comment.is_internal == False)
+    count, last_id, edits, last_modified = probe.one()
+    validators = CacheValidators(
+        "comments", document_id, page, limit, show_internal, count, last_id, edits, last_modified,
+        last_modified=last_modified
+    )
+    if validators.is_fresh(request):
+        return validators.not_modified()
+    
     # Build query for top-level comments (no parent)
     query = db.query(Comment).filter(
         Comment.document_id == document_id,
         Comment.parent_id.is_(None)
     )
     
-    # Filter internal comments based on permissions
-    if not include_internal or current_user.role not in ["admin", "executive"]:
+    if not show_internal:
         query = query.filter(Comment.is_internal == False)
     
     # Get total count
@@ -56,76 +119,117 @@ async def get_document_comments(
     
     # Apply pagination and ordering
     offset = (page - 1) * limit
-    comments = query.order_by(
+    comments = query.options(selectinload(Comment.author)).order_by(
         Comment.created_at.desc()
     ).offset(offset).limit(limit).all()
     
-    # Enrich comments with author info and replies
-    enriched_comments = []
-    for comment in comments:
-        comment_dict = {
-            "id": comment.id,
-            "content": comment.content,
-            "page_number": comment.page_number,
-            "position_x": comment.position_x,
-            "position_y": comment.position_y,
-            "is_internal": comment.is_internal,
-            "document_id": comment.document_id,
-            "author_id": comment.author_id,
-            "parent_id": comment.parent_id,
-            "is_resolved": comment.is_resolved,
-            "created_at": comment.created_at,
-            "updated_at": comment.updated_at,
-            "author": {
-                "id": comment.author.id,
-                "username": comment.author.username,
-                "full_name": comment.author.full_name,
-                "role": comment.author.role
-            } if comment.author else None,
-            "replies": []
-        }
-        
-        # Get replies for this comment
-        replies = db.query(Comment).filter(
-            Comment.parent_id == comment.id
-        ).order_by(Comment.created_at.asc()).all()
-        
-        for reply in replies:
-            if not reply.is_internal or include_internal:
-                reply_dict = {
-                    "id": reply.id,
-                    "content": reply.content,
-                    "page_number": reply.page_number,
-                    "position_x": reply.position_x,
-                    "position_y": reply.position_y,
-                    "is_internal": reply.is_internal,
-                    "document_id": reply.document_id,
-                    "author_id": reply.author_id,
-                    "parent_id": reply.parent_id,
-                    "is_resolved": reply.is_resolved,
-                    "created_at": reply.created_at,
-                    "updated_at": reply.updated_at,
-                    "author": {
-                        "id": reply.author.id,
-                        "username": reply.author.username,
-                        "full_name": reply.author.full_name,
-                        "role": reply.author.role
-                    } if reply.author else None,
-                    "replies": None
-                }
-                comment_dict["replies"].append(reply_dict)
-        
-        enriched_comments.append(comment_dict)
+    # Load the reply trees of the whole page in one query
+    load_threads(db, comments, show_internal)
     
-    return {
-        "comments": enriched_comments,
+    return json_response(CommentList, {
+        "comments": comments,
         "total": total,
         "page": page,
         "limit": limit
-    }
+    }, headers=validators.headers)
+
+@router.get("/{document_id}/annotations", response_model=AnnotationList)
+def get_document_annotations(
+    document_id: int,
+    page: Optional[int] = Query(None, ge=1),
+    page_from: Optional[int] = Query(None, ge=1),
+    page_to: Optional[int] = Query(None, ge=1),
+    x_min: Optional[int] = None,
+    x_max: Optional[int] = None,
+    y_min: Optional[int] = None,
+    y_max: Optional[int] = None,
+    include_internal: bool = Query(False),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+) -> Any:
+    """
+    Get annotation overlays for a page (or page range) of a document
+    """
+    if page is not None:
+        page_from = page_to = page
+    if page_from is not None and page_to is not None and page_from > page_to:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="page_from must not be greater than page_to"
+        )
+    
+    # Check if document exists
+    if not db.query(Document.id).filter(Document.id == document_id).first():
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Document not found"
+        )
+    
+    # Only the overlay columns, served by the (document_id, page_number) index
+    query = db.query(
+        Comment.id,
+        Comment.page_number,
+        Comment.position_x,
+        Comment.position_y,
+        Comment.author_id,
+        Comment.is_resolved,
+        Comment.is_internal
+    ).filter(
+        Comment.document_id == document_id,
+        Comment.page_number.isnot(None),
+        Comment.parent_id.is_(None)
+    )
+    
+    if page_from is not None:
+        query = query.filter(Comment.page_number >= page_from)
+    if page_to is not None:
+        query = query.filter(Comment.page_number <= page_to)
+    
+    # Optional bounding box on the annotation position
+    if x_min is not None:
+        query = query.filter(Comment.position_x >= x_min)
+    if x_max is not None:
+        query = query.filter(Comment.position_x <= x_max)
+    if y_min is not None:
+        query = query.filter(Comment.position_y >= y_min)
+    if y_max is not None:
+        query = query.filter(Comment.position_y <= y_max)
+    
+    if not (include_internal and has_permission(current_user, Permission.view_internal_comments)):
+        query = query.filter(Comment.is_internal == False)
+    
+    rows = query.order_by(Comment.page_number, Comment.id).all()
+    
+    return json_response(AnnotationList, {"annotations": rows})
+
+@router.get("/comments/{comment_id}/thread", response_model=CommentSchema)
+def get_comment_thread(
+    comment_id: int,
+    include_internal: bool = Query(False),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+) -> Any:
+    """
+    Get a comment with all its nested replies
+    """
+    comment = db.query(Comment).options(selectinload(Comment.author)).filter(
+        Comment.id == comment_id
+    ).first()
+    
+    show_internal = include_internal and has_permission(current_user, Permission.view_internal_comments)
+    
+    if not comment or (comment.is_internal and not show_internal):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Comment not found"
+        )
+    
+    load_threads(db, [comment], show_internal)
+    
+    return json_response(CommentSchema, comment)
 
 @router.post("/{document_id}/comments", response_model=CommentSchema)
-async def create_comment(
+def create_comment(
     document_id: int,
     comment_data: CommentCreate,
     db: Session = Depends(get_db),
@@ -143,6 +247,7 @@ async def create_comment(
         )
     
     # If replying to a comment, check if parent comment exists
+    parent_comment = None
     if comment_data.parent_id:
         parent_comment = db.query(Comment).filter(
             Comment.id == comment_data.parent_id,
@@ -153,6 +258,11 @@ async def create_comment(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Parent comment not found"
             )
+        if parent_comment.depth >= MAX_THREAD_DEPTH:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Maximum reply depth reached"
+            )
     
     # Create comment
     comment = Comment(
@@ -167,50 +277,43 @@ async def create_comment(
     )
     
     db.add(comment)
+    db.flush()
+    comment.assign_path(parent_comment)
     db.commit()
     db.refresh(comment)
     
+    # The author is the current user: loaded once, for the notification and the response
+    author = current_user.load()
+    
     # Create notification for document owner (if not the commenter)
     if document.uploaded_by != current_user.id:
-        from app.models.notification import Notification, NotificationType, NotificationPriority
-        notification = Notification(
+        notify_user(
+            db,
+            document.uploader,
             title="New Comment on Document",
-            message=f"{current_user.full_name or current_user.username} commented on {document.title}",
+            message=f"{author.full_name or author.username} commented on {document.title}",
             type=NotificationType.comment,
             priority=NotificationPriority.medium,
-            user_id=document.uploaded_by,
             document_id=document_id
         )
-        db.add(notification)
         db.commit()
     
-    # Enrich comment with author info
-    comment_dict = {
-        "id": comment.id,
-        "content": comment.content,
-        "page_number": comment.page_number,
-        "position_x": comment.position_x,
-        "position_y": comment.position_y,
-        "is_internal": comment.is_internal,
-        "document_id": comment.document_id,
-        "author_id": comment.author_id,
-        "parent_id": comment.parent_id,
-        "is_resolved": comment.is_resolved,
-        "created_at": comment.created_at,
-        "updated_at": comment.updated_at,
-        "author": {
-            "id": current_user.id,
-            "username": current_user.username,
-            "full_name": current_user.full_name,
-            "role": current_user.role
-        },
-        "replies": []
-    }
-    
-    return comment_dict
+    set_committed_value(comment, "author", author)
+    set_committed_value(comment, "replies", [])
+    comment_response = CommentSchema.model_validate(comment)
+    
+    # Push the comment to everyone viewing the document
+    collaboration_hub.publish(
+        document_id,
+        "comment_added",
+        comment_response.model_dump(mode="json"),
+        permission=Permission.view_internal_comments if comment.is_internal else None
+    )
+    
+    return comment_response
 
 @router.put("/comments/{comment_id}", response_model=CommentSchema)
-async def update_comment(
+def update_comment(
     comment_id: int,
     comment_data: CommentUpdate,
     db: Session = Depends(get_db),
@@ -227,8 +330,8 @@ async def update_comment(
             detail="Comment not found"
         )
     
-    # Check permissions - only author or admin can edit
-    if comment.author_id != current_user.id and current_user.role != "admin":
+    # Check permissions - only author or a moderator can edit
+    if comment.author_id != current_user.id and not has_permission(current_user, Permission.moderate_comments):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to edit this comment"
@@ -243,33 +346,12 @@ async def update_comment(
     db.commit()
     db.refresh(comment)
     
-    # Enrich comment with author info
-    comment_dict = {
-        "id": comment.id,
-        "content": comment.content,
-        "page_number": comment.page_number,
-        "position_x": comment.position_x,
-        "position_y": comment.position_y,
-        "is_internal": comment.is_internal,
-        "document_id": comment.document_id,
-        "author_id": comment.author_id,
-        "parent_id": comment.parent_id,
-        "is_resolved": comment.is_resolved,
-        "created_at": comment.created_at,
-        "updated_at": comment.updated_at,
-        "author": {
-            "id": comment.author.id,
-            "username": comment.author.username,
-            "full_name": comment.author.full_name,
-            "role": comment.author.role
-        } if comment.author else None,
-        "replies": []
-    }
-    
-    return comment_dict
+    set_committed_value(comment, "replies", [])
+    
+    return CommentSchema.model_validate(comment)
 
 @router.delete("/comments/{comment_id}")
-async def delete_comment(
+def delete_comment(
     comment_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -285,15 +367,20 @@ async def delete_comment(
             detail="Comment not found"
         )
     
-    # Check permissions - only author or admin can delete
-    if comment.author_id != current_user.id and current_user.role != "admin":
+    # Check permissions - only author or a moderator can delete
+    if comment.author_id != current_user.id and not has_permission(current_user, Permission.moderate_comments):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to delete this comment"
         )
     
-    # Delete comment and all replies (cascade handled by SQLAlchemy)
-    db.delete(comment)
+    # Delete comment and all nested replies with one range delete
+    if comment.path:
+        db.query(Comment).filter(
+            Comment.subtree_filter(comment.path)
+        ).delete(synchronize_session=False)
+    else:
+        db.delete(comment)
     db.commit()
     
     return {"message": "Comment deleted successfully"}
\ No newline at end of file
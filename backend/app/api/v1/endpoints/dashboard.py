@@ -5,9 +5,11 @@ Dashboard and analytics endpoints
 from typing import Any, Dict, List
 from fastapi import APIRouter, Depends, Query
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_, or_
+from sqlalchemy import func, and_, or_, case
 
 from app.core.database import get_db
+from app.core.serialization import json_response
+from app.core.permissions import Permission, has_permission
 from app.models.document import Document, DocumentStatus, DocumentType, DocumentPriority
 from app.models.notification import Notification
 from app.models.user import User
@@ -17,15 +19,15 @@ from app.schemas.dashboard import (
     DocumentTrends,
     DepartmentStats
 )
-from app.api.deps import get_current_user
+from app.api.deps import get_current_user, get_read_db
 from datetime import datetime, timedelta
 import json
 
 router = APIRouter()
 
 @router.get("/overview", response_model=DashboardOverview)
-async def get_dashboard_overview(
-    db: Session = Depends(get_db),
+def get_dashboard_overview(
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ) -> Any:
     """
@@ -52,8 +54,8 @@ async def get_dashboard_overview(
     # Recent documents for user
     recent_documents_query = db.query(Document)
     
-    # Filter based on user role and department
-    if current_user.role not in ["admin", "executive"]:
+    # Filter based on user permissions and department
+    if not has_permission(current_user, Permission.view_all_departments):
         recent_documents_query = recent_documents_query.filter(
             or_(
                 Document.department == current_user.department,
@@ -69,7 +71,7 @@ async def get_dashboard_overview(
     pending_actions = []
     
     # Documents pending approval (for approvers)
-    if current_user.role in ["admin", "executive"]:
+    if has_permission(current_user, Permission.approve_any_department):
         pending_docs = db.query(Document).filter(
             Document.status == DocumentStatus.pending
         ).limit(10).all()
@@ -124,7 +126,7 @@ async def get_dashboard_overview(
             "count": overdue_count
         })
     
-    return {
+    return json_response(DashboardOverview, {
         "stats": {
             "total_documents": total_documents,
             "pending_approvals": pending_approvals,
@@ -135,13 +137,13 @@ async def get_dashboard_overview(
         "recent_documents": recent_documents,
         "pending_actions": pending_actions,
         "alerts": alerts
-    }
+    })
 
 @router.get("/analytics", response_model=AnalyticsData)
-async def get_analytics(
+def get_analytics(
     period: str = Query("month", regex="^(week|month|quarter|year)$"),
     department: str = Query(None),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ) -> Any:
     """
@@ -213,8 +215,8 @@ async def get_analytics(
     dept_stats_query = db.query(
         Document.department,
         func.count(Document.id).label('total'),
-        func.sum(func.case([(Document.status == DocumentStatus.approved, 1)], else_=0)).label('approved'),
-        func.sum(func.case([(Document.status == DocumentStatus.pending, 1)], else_=0)).label('pending')
+        func.sum(case((Document.status == DocumentStatus.approved, 1), else_=0)).label('approved'),
+        func.sum(case((Document.status == DocumentStatus.pending, 1), else_=0)).label('pending')
     ).filter(Document.created_at >= start_date).group_by(Document.department)
     
     department_stats = {}
@@ -230,7 +232,7 @@ async def get_analytics(
     type_stats_query = db.query(
         Document.type,
         func.count(Document.id).label('total'),
-        func.sum(func.case([(Document.status == DocumentStatus.approved, 1)], else_=0)).label('approved')
+        func.sum(case((Document.status == DocumentStatus.approved, 1), else_=0)).label('approved')
     ).filter(Document.created_at >= start_date).group_by(Document.type)
     
     compliance_tracking = {}
@@ -242,7 +244,7 @@ async def get_analytics(
             "compliance_rate": round(compliance_rate, 1)
         }
     
-    return {
+    return json_response(AnalyticsData, {
         "period": period,
         "date_range": {
             "start": start_date.isoformat(),
@@ -252,4 +254,4 @@ async def get_analytics(
         "approval_metrics": approval_metrics,
         "department_stats": department_stats,
         "compliance_tracking": compliance_tracking
-    }
\ No newline at end of file
+    })
\ No newline at end of file
@@ -3,11 +3,15 @@ Document management endpoints
 """
 
 from typing import Any, List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form, Query
+from fastapi import APIRouter, Depends, HTTPException, Request, status, UploadFile, File, Form, Query
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, func
+from sqlalchemy.orm.exc import StaleDataError
+from sqlalchemy import and_, or_, func, update
 
 from app.core.database import get_db
+from app.core.http_cache import CacheValidators, latest
+from app.core.serialization import json_response
+from app.core.permissions import Permission, can_approve, has_permission
 from app.models.document import Document, DocumentStatus, DocumentType, DocumentPriority, WorkflowHistory
 from app.models.user import User
 from app.schemas.document import (
@@ -21,7 +25,9 @@ from app.schemas.document import (
     WorkflowHistory as WorkflowHistorySchema,
     DocumentStats
 )
-from app.api.deps import get_current_user, get_current_active_superuser
+from app.api.deps import get_current_user, get_current_active_superuser, get_read_db
+from app.services.collaboration import collaboration_hub
+from app.services.workflow import InvalidTransition, transition
 import os
 import shutil
 from datetime import datetime
@@ -29,24 +35,98 @@ import json
 
 router = APIRouter()
 
-@router.get("/", response_model=DocumentList)
-async def get_documents(
+def publish_status_change(document_id: int, workflow_entry: WorkflowHistory) -> None:
+    """Push a workflow transition to everyone viewing the document"""
+    # Skip reloading the committed entry when nobody is watching
+    if not collaboration_hub.is_watched(document_id):
+        return
+    collaboration_hub.publish(
+        document_id,
+        "status_changed",
+        {
+            "action": workflow_entry.action,
+            "previous_status": workflow_entry.previous_status,
+            "new_status": workflow_entry.new_status,
+            "user_id": workflow_entry.user_id,
+            "comments": workflow_entry.comments
+        }
+    )
+
+def document_validators(document: Document) -> CacheValidators:
+    """ETag and Last-Modified of a document, identified by its row version"""
+    last_modified = latest(document.updated_at, document.created_at)
+    return CacheValidators("document", document.id, document.row_version, last_modified=last_modified)
+
+def check_if_match(request: Request, document: Document) -> None:
+    """Refuse a change based on an outdated copy of the document"""
+    if not document_validators(document).matches(request):
+        raise HTTPException(
+            status_code=status.HTTP_412_PRECONDITION_FAILED,
+            detail="Document has been modified since it was loaded"
+        )
+
+def commit_document_change(db: Session) -> None:
+    """
+    Commit a change to a loaded document.
+    
+    The UPDATE only matches the row version that was loaded; if another
+    request committed first, this one is rolled back with 409.
+    """
+    try:
+        db.commit()
+    except StaleDataError:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Document was modified by another request, reload it and retry"
+        )
+
+def apply_transition(
+    db: Session,
+    request: Request,
+    document_id: int,
+    action: str,
+    current_user: User,
+    comments: Optional[str],
+    forbidden_detail: str
+) -> WorkflowHistory:
+    """Run a workflow action as one transaction and announce it to viewers"""
+    document = db.query(Document).filter(Document.id == document_id).first()
+    
+    if not document:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Document not found"
+        )
+    
+    if not can_approve(current_user, document.department):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=forbidden_detail
+        )
+    
+    check_if_match(request, document)
+    try:
+        workflow_entry = transition(db, document, action, current_user, comments)
+    except InvalidTransition as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e)
+        )
+    commit_document_change(db)
+    
+    publish_status_change(document_id, workflow_entry)
+    return workflow_entry
+
+def filter_documents(
+    query,
     type: Optional[DocumentType] = None,
     department: Optional[str] = None,
     status: Optional[DocumentStatus] = None,
     priority: Optional[DocumentPriority] = None,
-    search: Optional[str] = None,
-    page: int = Query(1, ge=1),
-    limit: int = Query(20, le=100),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
-) -> Any:
-    """
-    Get documents with filtering and pagination
-    """
-    query = db.query(Document)
-    
-    # Apply filters
+    search: Optional[str] = None
+):
+    """Apply the document list filters to a query"""
     if type:
         query = query.filter(Document.type == type)
     if department:
@@ -63,9 +143,40 @@ async def get_documents(
                 Document.content.ilike(f"%{search}%")
             )
         )
-    
-    # Get total count
-    total = query.count()
+    return query
+
+@router.get("/", response_model=DocumentList)
+def get_documents(
+    request: Request,
+    type: Optional[DocumentType] = None,
+    department: Optional[str] = None,
+    status: Optional[DocumentStatus] = None,
+    priority: Optional[DocumentPriority] = None,
+    search: Optional[str] = None,
+    page: int = Query(1, ge=1),
+    limit: int = Query(20, le=100),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+) -> Any:
+    """
+    Get documents with filtering and pagination
+    """
+    query = filter_documents(db.query(Document), type, department, status, priority, search)
+    
+    # Get total count and change markers in one probe, enough to answer a
+    # revalidation; row versions catch edits within the same second
+    total, last_id, versions, last_modified = query.with_entities(
+        func.count(Document.id),
+        func.max(Document.id),
+        func.sum(Document.row_version),
+        func.max(func.coalesce(Document.updated_at, Document.created_at))
+    ).one()
+    validators = CacheValidators(
+        "documents", str(request.query_params), total, last_id, versions, last_modified,
+        last_modified=last_modified
+    )
+    if validators.is_fresh(request):
+        return validators.not_modified()
     
     # Apply pagination
     offset = (page - 1) * limit
@@ -74,39 +185,52 @@ async def get_documents(
     # Calculate pages
     pages = (total + limit - 1) // limit
     
-    return {
+    return json_response(DocumentList, {
         "documents": documents,
         "total": total,
         "page": page,
         "limit": limit,
         "pages": pages
-    }
+    }, headers=validators.headers)
 
 @router.get("/{document_id}", response_model=DocumentSchema)
-async def get_document(
+def get_document(
     document_id: int,
+    request: Request,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ) -> Any:
     """
     Get single document by ID
     """
-    document = db.query(Document).filter(Document.id == document_id).first()
+    probe = db.query(Document.id, Document.row_version, Document.updated_at, Document.created_at).filter(
+        Document.id == document_id
+    ).first()
     
-    if not document:
+    if not probe:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Document not found"
         )
     
-    # Increment view count
-    document.view_count += 1
+    # Increment view count without touching updated_at, views are not edits
+    db.execute(
+        update(Document)
+        .where(Document.id == document_id)
+        .values(view_count=Document.view_count + 1, updated_at=Document.updated_at)
+        .execution_options(synchronize_session=False)
+    )
     db.commit()
     
-    return document
+    validators = document_validators(probe)
+    if validators.is_fresh(request):
+        return validators.not_modified()
+    
+    document = db.query(Document).filter(Document.id == document_id).first()
+    return json_response(DocumentSchema, document, headers=validators.headers)
 
 @router.post("/", response_model=DocumentSchema)
-async def create_document(
+def create_document(
     title: str = Form(...),
     summary: Optional[str] = Form(None),
     type: DocumentType = Form(...),
@@ -154,14 +278,13 @@ async def create_document(
         file_type=file_extension[1:],  # Remove the dot
         file_size=file_size,
         uploaded_by=current_user.id,
-        status=DocumentStatus.pending if current_user.role != "admin" else DocumentStatus.approved
+        status=DocumentStatus.approved if has_permission(current_user, Permission.manage_documents) else DocumentStatus.pending
     )
     
     db.add(document)
-    db.commit()
-    db.refresh(document)
+    db.flush()
     
-    # Create workflow history entry
+    # Create workflow history entry in the same transaction
     workflow_entry = WorkflowHistory(
         document_id=document.id,
         user_id=current_user.id,
@@ -174,9 +297,10 @@ async def create_document(
     return document
 
 @router.put("/{document_id}", response_model=DocumentSchema)
-async def update_document(
+def update_document(
     document_id: int,
     document_update: DocumentUpdate,
+    request: Request,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ) -> Any:
@@ -192,24 +316,26 @@ async def update_document(
         )
     
     # Check permissions
-    if document.uploaded_by != current_user.id and current_user.role != "admin":
+    if document.uploaded_by != current_user.id and not has_permission(current_user, Permission.manage_documents):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not enough permissions"
         )
     
+    check_if_match(request, document)
+    
     # Update fields
     update_data = document_update.dict(exclude_unset=True)
     for field, value in update_data.items():
         setattr(document, field, value)
     
-    db.commit()
+    commit_document_change(db)
     db.refresh(document)
     
-    return document
+    return json_response(DocumentSchema, document, headers=document_validators(document).headers)
 
 @router.delete("/{document_id}")
-async def delete_document(
+def delete_document(
     document_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -226,7 +352,7 @@ async def delete_document(
         )
     
     # Check permissions
-    if document.uploaded_by != current_user.id and current_user.role != "admin":
+    if document.uploaded_by != current_user.id and not has_permission(current_user, Permission.manage_documents):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not enough permissions"
@@ -234,56 +360,28 @@ async def delete_document(
     
     # Soft delete
     document.status = DocumentStatus.archived
-    db.commit()
+    commit_document_change(db)
     
     return {"message": "Document deleted successfully"}
 
 @router.post("/{document_id}/approve", response_model=DocumentApprovalResponse)
-async def approve_document(
+def approve_document(
     document_id: int,
     approval_data: DocumentApproval,
+    request: Request,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ) -> Any:
     """
     Approve document
     """
-    document = db.query(Document).filter(Document.id == document_id).first()
-    
-    if not document:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Document not found"
-        )
-    
-    # Check if user can approve
-    if current_user.role not in ["admin", "executive"] and current_user.department != document.department:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to approve documents"
-        )
-    
-    previous_status = document.status
-    document.status = DocumentStatus.approved
-    document.approved_by = current_user.id
-    document.approved_at = datetime.utcnow()
-    
-    db.commit()
-    
-    # Create workflow history entry
-    workflow_entry = WorkflowHistory(
-        document_id=document.id,
-        user_id=current_user.id,
-        action="approve",
-        comments=approval_data.comments,
-        previous_status=previous_status.value,
-        new_status=document.status.value
+    apply_transition(
+        db, request, document_id, "approve", current_user, approval_data.comments,
+        "Not authorized to approve documents"
     )
-    db.add(workflow_entry)
-    db.commit()
     
     return {
-        "document_id": document.id,
+        "document_id": document_id,
         "action": "approve",
         "approved_by": current_user.id,
         "comments": approval_data.comments,
@@ -291,49 +389,23 @@ async def approve_document(
     }
 
 @router.post("/{document_id}/reject", response_model=DocumentApprovalResponse)
-async def reject_document(
+def reject_document(
     document_id: int,
     approval_data: DocumentApproval,
+    request: Request,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ) -> Any:
     """
     Reject document
     """
-    document = db.query(Document).filter(Document.id == document_id).first()
-    
-    if not document:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Document not found"
-        )
-    
-    # Check if user can reject
-    if current_user.role not in ["admin", "executive"] and current_user.department != document.department:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to reject documents"
-        )
-    
-    previous_status = document.status
-    document.status = DocumentStatus.rejected
-    
-    db.commit()
-    
-    # Create workflow history entry
-    workflow_entry = WorkflowHistory(
-        document_id=document.id,
-        user_id=current_user.id,
-        action="reject",
-        comments=approval_data.comments,
-        previous_status=previous_status.value,
-        new_status=document.status.value
+    apply_transition(
+        db, request, document_id, "reject", current_user, approval_data.comments,
+        "Not authorized to reject documents"
     )
-    db.add(workflow_entry)
-    db.commit()
     
     return {
-        "document_id": document.id,
+        "document_id": document_id,
         "action": "reject",
         "approved_by": current_user.id,
         "comments": approval_data.comments,
@@ -341,15 +413,16 @@ async def reject_document(
     }
 
 @router.get("/{document_id}/workflow", response_model=WorkflowHistorySchema)
-async def get_document_workflow(
+def get_document_workflow(
     document_id: int,
-    db: Session = Depends(get_db),
+    request: Request,
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ) -> Any:
     """
     Get document workflow history
     """
-    document = db.query(Document).filter(Document.id == document_id).first()
+    document = db.query(Document.id).filter(Document.id == document_id).first()
     
     if not document:
         raise HTTPException(
@@ -357,14 +430,24 @@ async def get_document_workflow(
             detail="Document not found"
         )
     
+    # History is append-only, count and newest entry identify it
+    count, last_id, last_modified = db.query(
+        func.count(WorkflowHistory.id),
+        func.max(WorkflowHistory.id),
+        func.max(WorkflowHistory.timestamp)
+    ).filter(WorkflowHistory.document_id == document_id).one()
+    validators = CacheValidators("workflow", document_id, count, last_id, last_modified=last_modified)
+    if validators.is_fresh(request):
+        return validators.not_modified()
+    
     workflow = db.query(WorkflowHistory).filter(
         WorkflowHistory.document_id == document_id
     ).order_by(WorkflowHistory.timestamp.desc()).all()
     
-    return {"workflow": workflow}
+    return json_response(WorkflowHistorySchema, {"workflow": workflow}, headers=validators.headers)
 
 @router.get("/{document_id}/download")
-async def download_document(
+def download_document(
     document_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -372,7 +455,7 @@ async def download_document(
     """
     Download document file
     """
-    document = db.query(Document).filter(Document.id == document_id).first()
+    document = db.query(Document.file_name).filter(Document.id == document_id).first()
     
     if not document:
         raise HTTPException(
@@ -380,15 +463,20 @@ async def download_document(
             detail="Document not found"
         )
     
-    # Increment download count
-    document.download_count += 1
+    # Atomic increment, like views: no lost updates and no row version bump
+    db.execute(
+        update(Document)
+        .where(Document.id == document_id)
+        .values(download_count=Document.download_count + 1, updated_at=Document.updated_at)
+        .execution_options(synchronize_session=False)
+    )
     db.commit()
     
     # In a real implementation, you would return FileResponse
     return {"download_url": f"/static/documents/{document.file_name}"}
 
 @router.get("/{document_id}/preview")
-async def preview_document(
+def preview_document(
     document_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -411,59 +499,21 @@ async def preview_document(
     }
 
 @router.post("/{document_id}/request-revision")
-async def request_document_revision(
+def request_document_revision(
     document_id: int,
     revision_data: dict,
+    request: Request,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ) -> Any:
     """
     Request document revision
     """
-    document = db.query(Document).filter(Document.id == document_id).first()
-    
-    if not document:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Document not found"
-        )
-    
-    # Check if user can request revision
-    if current_user.role not in ["admin", "executive"] and current_user.department != document.department:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to request document revisions"
-        )
-    
-    previous_status = document.status
-    document.status = DocumentStatus.draft  # Set back to draft for revision
-    
-    db.commit()
-    
-    # Create workflow history entry
-    workflow_entry = WorkflowHistory(
-        document_id=document.id,
-        user_id=current_user.id,
-        action="request_revision",
-        comments=f"Requested changes: {', '.join(revision_data.get('requested_changes', []))}",
-        previous_status=previous_status.value,
-        new_status=document.status.value
-    )
-    db.add(workflow_entry)
-    db.commit()
-    
-    # Create notification for document owner
-    from app.models.notification import Notification, NotificationType, NotificationPriority
-    notification = Notification(
-        title="Document Revision Requested",
-        message=f"Revision requested for {document.title}",
-        type=NotificationType.document_action,
-        priority=NotificationPriority.high,
-        user_id=document.uploaded_by,
-        document_id=document_id
+    workflow_entry = apply_transition(
+        db, request, document_id, "request_revision", current_user,
+        f"Requested changes: {', '.join(revision_data.get('requested_changes', []))}",
+        "Not authorized to request document revisions"
     )
-    db.add(notification)
-    db.commit()
     
     return {
         "revision_request": {
@@ -476,8 +526,8 @@ async def request_document_revision(
     }
 
 @router.get("/stats/overview", response_model=DocumentStats)
-async def get_document_stats(
-    db: Session = Depends(get_db),
+def get_document_stats(
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ) -> Any:
     """
@@ -3,10 +3,14 @@ Notification management endpoints
 """
 
 from typing import Any, List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, Request, status, Query
+from sqlalchemy import case, func
 from sqlalchemy.orm import Session
 
 from app.core.database import get_db
+from app.core.http_cache import CacheValidators, latest
+from app.core.permissions import Permission, has_permission
+from app.core.serialization import json_response
 from app.models.notification import Notification, NotificationType, NotificationPriority
 from app.models.user import User
 from app.schemas.notification import (
@@ -16,24 +20,43 @@ from app.schemas.notification import (
     NotificationList,
     NotificationSettings
 )
-from app.api.deps import get_current_user
+from app.api.deps import get_current_user, get_read_db
+from app.services.notifications import requeue_digest_items
 from datetime import datetime
 import json
 
 router = APIRouter()
 
 @router.get("/", response_model=NotificationList)
-async def get_notifications(
+def get_notifications(
+    request: Request,
     type: Optional[NotificationType] = None,
     unread_only: bool = False,
     page: int = Query(1, ge=1),
     limit: int = Query(20, le=100),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ) -> Any:
     """
     Get user notifications with filtering and pagination
     """
+    # Frontends poll this, answer unchanged inboxes from one aggregate probe
+    count, unread, last_id, last_created, last_read = db.query(
+        func.count(Notification.id),
+        func.sum(case((Notification.is_read == False, 1), else_=0)),
+        func.max(Notification.id),
+        func.max(Notification.created_at),
+        func.max(Notification.read_at)
+    ).filter(Notification.user_id == current_user.id).one()
+    last_modified = latest(last_created, last_read)
+    validators = CacheValidators(
+        "notifications", current_user.id, str(request.query_params),
+        count, unread, last_id, last_modified,
+        last_modified=last_modified
+    )
+    if validators.is_fresh(request):
+        return validators.not_modified()
+    
     query = db.query(Notification).filter(Notification.user_id == current_user.id)
     
     # Apply filters
@@ -44,10 +67,7 @@ async def get_notifications(
     
     # Get total count
     total = query.count()
-    unread_count = db.query(Notification).filter(
-        Notification.user_id == current_user.id,
-        Notification.is_read == False
-    ).count()
+    unread_count = unread or 0
     
     # Apply pagination and ordering
     offset = (page - 1) * limit
@@ -55,16 +75,16 @@ async def get_notifications(
         Notification.created_at.desc()
     ).offset(offset).limit(limit).all()
     
-    return {
+    return json_response(NotificationList, {
         "notifications": notifications,
         "total": total,
         "unread_count": unread_count,
         "page": page,
         "limit": limit
-    }
+    }, headers=validators.headers)
 
 @router.put("/{notification_id}/read", response_model=NotificationSchema)
-async def mark_notification_read(
+def mark_notification_read(
     notification_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -92,7 +112,7 @@ async def mark_notification_read(
     return notification
 
 @router.put("/read-all")
-async def mark_all_notifications_read(
+def mark_all_notifications_read(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ) -> Any:
@@ -112,7 +132,7 @@ async def mark_all_notifications_read(
     return {"updated_count": updated_count}
 
 @router.delete("/{notification_id}")
-async def delete_notification(
+def delete_notification(
     notification_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -137,7 +157,7 @@ async def delete_notification(
     return {"message": "Notification deleted successfully"}
 
 @router.get("/settings", response_model=NotificationSettings)
-async def get_notification_settings(
+def get_notification_settings(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ) -> Any:
@@ -145,8 +165,9 @@ async def get_notification_settings(
     Get user notification settings
     """
     # Parse notification settings from user profile
-    if current_user.notification_settings:
-        settings = json.loads(current_user.notification_settings)
+    user = current_user.load()
+    if user.notification_settings:
+        settings = json.loads(user.notification_settings)
     else:
         # Default settings
         settings = {
@@ -168,7 +189,7 @@ async def get_notification_settings(
     return settings
 
 @router.put("/settings", response_model=NotificationSettings)
-async def update_notification_settings(
+def update_notification_settings(
     settings: NotificationSettings,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -177,14 +198,18 @@ async def update_notification_settings(
     Update user notification settings
     """
     # Update user notification settings
-    current_user.notification_settings = json.dumps(settings.dict())
+    user = current_user.load()
+    user.notification_settings = json.dumps(settings.dict())
+    
+    # Queued digest items follow the new frequency
+    requeue_digest_items(db, current_user.id, settings.frequency)
     db.commit()
-    db.refresh(current_user)
+    db.refresh(user)
     
     return settings
 
 @router.post("/", response_model=NotificationSchema)
-async def create_notification(
+def create_notification(
     notification_data: NotificationCreate,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -192,8 +217,8 @@ async def create_notification(
     """
     Create notification (for testing/admin purposes)
     """
-    # Only admin can create notifications manually
-    if current_user.role != "admin":
+    # Only system admins can create notifications manually
+    if not has_permission(current_user, Permission.system_admin):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not enough permissions"
@@ -0,0 +1,43 @@
+"""
+Request profile endpoints (admin only)
+"""
+
+from typing import Any, List
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import PlainTextResponse
+
+from app.core.permissions import Permission
+from app.core.profiling import collapsed, profile_store
+from app.models.user import User
+from app.api.deps import require_permission
+
+router = APIRouter()
+
+@router.get("/")
+def list_profiles(
+    current_user: User = Depends(require_permission(Permission.system_admin))
+) -> List[Any]:
+    """
+    Stored request profiles, newest first
+    """
+    return profile_store.list()
+
+@router.get("/{profile_id}", response_class=PlainTextResponse)
+def download_profile(
+    profile_id: str,
+    current_user: User = Depends(require_permission(Permission.system_admin))
+) -> Any:
+    """
+    Download a profile as collapsed stacks (flamegraph.pl, speedscope)
+    """
+    data = profile_store.load(profile_id)
+    if data is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Profile not found"
+        )
+    return PlainTextResponse(
+        collapsed(data),
+        headers={"Content-Disposition": f'attachment; filename="{profile_id}.folded"'}
+    )
@@ -3,25 +3,30 @@ User management endpoints (Admin only)
 """
 
 from typing import Any, List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
+from app.core.config import settings
 from app.core.database import get_db
+from app.core.permissions import Permission, has_permission
 from app.core.security import get_password_hash
 from app.models.user import User
-from app.schemas.user import UserCreate, UserUpdate, User as UserSchema
-from app.api.deps import get_current_user, get_current_active_superuser
+from app.services.token_revocation import revoke_user_tokens
+from app.services.user_import import ImportFileError, parse_import_file, import_users
+from app.schemas.user import UserCreate, UserUpdate, User as UserSchema, UserImportReport
+from app.api.deps import get_current_user, get_current_active_superuser, invalidate_auth_user, get_read_db
 import json
 
 router = APIRouter()
 
 @router.get("/", response_model=List[UserSchema])
-async def get_users(
+def get_users(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, le=100),
     role: Optional[str] = None,
     department: Optional[str] = None,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_active_superuser)
 ) -> Any:
     """
@@ -38,7 +43,7 @@ async def get_users(
     return users
 
 @router.post("/", response_model=UserSchema)
-async def create_user(
+def create_user(
     user_data: UserCreate,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_superuser)
@@ -60,10 +65,11 @@ async def create_user(
         )
     
     # Create user
+    hashed_password = get_password_hash(user_data.password)
     user = User(
         username=user_data.username,
         email=user_data.email,
-        hashed_password=get_password_hash(user_data.password),
+        hashed_password=hashed_password,
         full_name=user_data.full_name,
         role=user_data.role,
         department=user_data.department,
@@ -78,8 +84,44 @@ async def create_user(
     
     return user
 
+@router.post("/import", response_model=UserImportReport)
+async def import_users_file(
+    file: UploadFile = File(...),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_superuser)
+) -> Any:
+    """
+    Create users in bulk from a CSV or JSON file (Admin only)
+    
+    CSV files need a header row with the UserCreate field names; separate
+    multiple permissions with ";". Invalid rows are skipped and reported.
+    """
+    content = await file.read()
+    if len(content) > settings.MAX_FILE_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail="File too large"
+        )
+    
+    try:
+        rows = parse_import_file(file.filename or "", content)
+    except ImportFileError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    if len(rows) > settings.USER_IMPORT_MAX_ROWS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {settings.USER_IMPORT_MAX_ROWS} users per import"
+        )
+    
+    # Hashing takes seconds for large files, keep it off the event loop
+    return await run_in_threadpool(import_users, db, rows)
+
 @router.put("/{user_id}", response_model=UserSchema)
-async def update_user(
+def update_user(
     user_id: int,
     user_data: UserUpdate,
     db: Session = Depends(get_db),
@@ -107,12 +149,15 @@ async def update_user(
             setattr(user, field, value)
     
     db.commit()
+    invalidate_auth_user(user.id)
+    if update_data.get("is_active") is False:
+        revoke_user_tokens(db, user.id)
     db.refresh(user)
     
     return user
 
 @router.delete("/{user_id}")
-async def deactivate_user(
+def deactivate_user(
     user_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_superuser)
@@ -136,11 +181,13 @@ async def deactivate_user(
     
     user.is_active = False
     db.commit()
+    invalidate_auth_user(user.id)
+    revoke_user_tokens(db, user.id)
     
     return {"message": "User deactivated successfully"}
 
 @router.get("/{user_id}", response_model=UserSchema)
-async def get_user(
+def get_user(
     user_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -148,8 +195,8 @@ async def get_user(
     """
     Get user by ID
     """
-    # Users can view their own profile, admins can view any profile
-    if user_id != current_user.id and current_user.role != "admin":
+    # Users can view their own profile, user managers can view any profile
+    if user_id != current_user.id and not has_permission(current_user, Permission.manage_users):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not enough permissions"
@@ -0,0 +1,145 @@
+"""
+In-process caches and cross-worker invalidation
+"""
+
+import json
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+from app.core.config import settings
+from app.core.metrics import CACHE_REQUESTS
+
+logger = logging.getLogger(__name__)
+
+class TTLCache:
+    """
+    Thread-safe LRU cache whose entries expire after ttl seconds.
+
+    Hits and misses are also exported as cache_requests_total{cache=name}.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, name: str = "default"):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.name = name
+        self.hits = 0
+        self.misses = 0
+        self._hit_metric = CACHE_REQUESTS.labels(name, "hit")
+        self._miss_metric = CACHE_REQUESTS.labels(name, "miss")
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    del self._data[key]
+                self.misses += 1
+                self._miss_metric.inc()
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            self._hit_metric.inc()
+            return entry[1]
+
+    def set(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+class InvalidationBus:
+    """
+    Applies invalidations locally and relays them to the other workers.
+
+    With CACHE_INVALIDATION_PUBSUB enabled, messages are published on a Redis
+    channel and a listener thread applies the ones from other workers. After a
+    (re)connect every registered cache is reset, since messages may have been
+    missed while disconnected.
+    """
+
+    def __init__(self, channel: str):
+        self.channel = channel
+        self._origin = uuid.uuid4().hex
+        self._handlers: Dict[str, Callable[[Any], None]] = {}
+        self._resets: Dict[str, Callable[[], None]] = {}
+        self._client = None
+        self._thread: Optional[threading.Thread] = None
+
+    def register(
+        self,
+        topic: str,
+        handler: Callable[[Any], None],
+        reset: Optional[Callable[[], None]] = None
+    ) -> None:
+        self._handlers[topic] = handler
+        if reset is not None:
+            self._resets[topic] = reset
+
+    def publish(self, topic: str, payload: Any) -> None:
+        self._dispatch(topic, payload)
+        if not settings.CACHE_INVALIDATION_PUBSUB:
+            return
+        try:
+            self._redis().publish(self.channel, json.dumps({
+                "origin": self._origin,
+                "topic": topic,
+                "payload": payload
+            }))
+        except Exception as e:
+            logger.warning("Could not publish invalidation for %s: %s", topic, e)
+
+    def _dispatch(self, topic: str, payload: Any) -> None:
+        handler = self._handlers.get(topic)
+        if handler is not None:
+            handler(payload)
+
+    def _redis(self):
+        if self._client is None:
+            import redis
+            self._client = redis.Redis.from_url(settings.REDIS_URL)
+        return self._client
+
+    def start(self) -> None:
+        """Start listening for other workers' invalidations"""
+        if not settings.CACHE_INVALIDATION_PUBSUB:
+            return
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(target=self._listen, name="cache-invalidation", daemon=True)
+        self._thread.start()
+
+    def _listen(self) -> None:
+        while True:
+            try:
+                pubsub = self._redis().pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.channel)
+                for reset in self._resets.values():
+                    reset()
+                for message in pubsub.listen():
+                    data = json.loads(message["data"])
+                    if data.get("origin") != self._origin:
+                        self._dispatch(data["topic"], data["payload"])
+            except Exception as e:
+                logger.warning("Cache invalidation listener disconnected: %s", e)
+                time.sleep(1)
+
+invalidation_bus = InvalidationBus(settings.CACHE_INVALIDATION_CHANNEL)
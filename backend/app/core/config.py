@@ -20,12 +20,65 @@ class Settings(BaseSettings):
     
     # Security
     SECRET_KEY: str = "your-secret-key-change-this-in-production"
-    ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 8  # 8 days
+    ACCESS_TOKEN_EXPIRE_MINUTES: int = 15
+    REFRESH_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 8  # 8 days
+    TOKEN_REVOCATION_SYNC_SECONDS: int = 30
+    # Rows created this recently are re-read on every sync: ids from a
+    # sequence can commit out of order, so the id watermark alone misses some
+    TOKEN_REVOCATION_SYNC_OVERLAP_SECONDS: int = 300
     ALGORITHM: str = "HS256"
+    BCRYPT_ROUNDS: int = 12  # Existing hashes are upgraded on next login
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_PROCESSES: Optional[int] = None  # Bulk imports, defaults to CPU count
+    USER_IMPORT_MAX_ROWS: int = 5000
+
+    # Login throttling of failed attempts (token buckets, per worker)
+    LOGIN_USERNAME_BURST: int = 5
+    LOGIN_USERNAME_PER_MINUTE: int = 5
+    LOGIN_IP_BURST: int = 50
+    LOGIN_IP_PER_MINUTE: int = 120
     
     # Database
     USE_SQLITE: bool = True  # Use SQLite for development
     SQLITE_DB_PATH: str = "kmrl_documents.db"
+    SCHEMA_REVISION_CHECK: bool = True  # Refuse to start unless `alembic upgrade head` was run
+    SQL_ECHO: bool = False  # Log every statement (very verbose)
+
+    # Per-request SQL instrumentation: Server-Timing header, query log and N+1 warnings
+    SQL_INSTRUMENTATION_ENABLED: bool = True
+    SQL_INSTRUMENTATION_SAMPLE_RATE: float = 0.01  # Fraction of requests instrumented, 1.0 while developing
+    SQL_SLOW_STATEMENTS: int = 3  # Costliest statements included in the log line
+    SQL_N_PLUS_ONE_THRESHOLD: int = 5  # Warn when one statement runs this often in a request
+
+    # Prometheus metrics at /metrics; set PROMETHEUS_MULTIPROC_DIR when running several workers
+    METRICS_ENABLED: bool = True
+
+    # Sampling profiler for requests flagged by an admin (X-Profile: 1 or ?_profile=1)
+    PROFILING_ENABLED: bool = False
+    PROFILING_INTERVAL_MS: float = 5.0
+    PROFILING_SAMPLE_EVERY: int = 0  # Also profile every Nth request of a worker, 0 = off
+    PROFILING_DIR: str = "profiles"
+    PROFILING_RING_SIZE: int = 50  # Stored profiles kept, oldest are deleted
+
+    # SQLite tuning: WAL, pragmas on every connection and serialized writers
+    SQLITE_TUNED: bool = True
+    SQLITE_JOURNAL_MODE: str = "WAL"
+    SQLITE_SYNCHRONOUS: str = "NORMAL"  # Durable across app crashes, WAL may lose the last commits on power loss
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    SQLITE_MMAP_SIZE: int = 256 * 1024 * 1024
+    SQLITE_CACHE_SIZE_KB: int = 64 * 1024
+    SQLITE_WRITE_LOCK_TIMEOUT_SECONDS: float = 30
+
+    # Read replicas (comma separated URLs). Read-only endpoints use a replica
+    # unless its lag exceeds REPLICA_MAX_LAG_SECONDS or the user wrote within
+    # the last READ_YOUR_WRITES_SECONDS (keep it above the max lag)
+    DATABASE_REPLICA_URLS: str = ""
+    REPLICA_MAX_LAG_SECONDS: float = 5
+    REPLICA_HEARTBEAT_SECONDS: float = 1
+    READ_YOUR_WRITES_SECONDS: float = 10
+    # Recent writers reach other workers over CACHE_INVALIDATION_PUBSUB, which
+    # replicas therefore require unless the app runs a single worker
+    REPLICA_SINGLE_WORKER: bool = False
     
     # PostgreSQL settings (for production)
     POSTGRES_SERVER: str = "localhost"
@@ -39,6 +92,10 @@ class Settings(BaseSettings):
         if self.USE_SQLITE:
             return f"sqlite:///./{self.SQLITE_DB_PATH}"
         return f"postgresql://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}@{self.POSTGRES_SERVER}:{self.POSTGRES_PORT}/{self.POSTGRES_DB}"
+
+    @property
+    def REPLICA_URLS(self) -> List[str]:
+        return [url.strip() for url in self.DATABASE_REPLICA_URLS.split(",") if url.strip()]
     
     # CORS settings
     BACKEND_CORS_ORIGINS: List[str] = [
@@ -68,6 +125,14 @@ class Settings(BaseSettings):
     
     # Redis settings for caching and Celery
     REDIS_URL: str = "redis://localhost:6379/0"
+
+    # Authenticated-user cache
+    AUTH_CACHE_TTL_SECONDS: int = 60
+    AUTH_CACHE_MAX_SIZE: int = 10000
+
+    # Relay cache invalidations to other workers over Redis pub/sub
+    CACHE_INVALIDATION_PUBSUB: bool = False
+    CACHE_INVALIDATION_CHANNEL: str = "kmrl:cache-invalidation"
     
     # Email settings (for notifications)
     SMTP_TLS: bool = True
@@ -77,7 +142,40 @@ class Settings(BaseSettings):
     SMTP_PASSWORD: Optional[str] = None
     EMAILS_FROM_EMAIL: Optional[str] = None
     EMAILS_FROM_NAME: Optional[str] = None
-    
+    SMTP_TIMEOUT: int = 10
+    SMTP_POOL_SIZE: int = 2
+
+    # Email outbox worker
+    EMAIL_WORKER_ENABLED: bool = False  # Enable on exactly one worker
+    EMAIL_BATCH_SIZE: int = 50
+    EMAIL_RATE_LIMIT_PER_MINUTE: int = 120
+    EMAIL_MAX_ATTEMPTS: int = 5
+    EMAIL_RETRY_BASE_SECONDS: int = 30
+    EMAIL_POLL_INTERVAL_SECONDS: int = 5
+
+    @property
+    def EMAILS_ENABLED(self) -> bool:
+        return bool(self.SMTP_HOST and self.EMAILS_FROM_EMAIL)
+
+    # Notification digests (daily/weekly frequency setting)
+    DIGEST_SCHEDULER_ENABLED: bool = False  # Enable on exactly one worker, or run via cron
+    DIGEST_DAILY_HOUR_UTC: int = 8
+    DIGEST_WEEKLY_DAY: int = 0  # Monday
+    DIGEST_BATCH_SIZE: int = 500  # Users per batch
+    DIGEST_MAX_ITEMS_IN_MESSAGE: int = 10
+
+    # Deadline reminders for pending documents
+    DEADLINE_REMINDERS_ENABLED: bool = False  # Enable on exactly one worker, or run via cron
+    DEADLINE_REMINDER_OFFSETS_HOURS: List[int] = [72, 24, 0]  # 0 = overdue
+    DEADLINE_REMINDER_INTERVAL_SECONDS: int = 300
+
+    # Live collaboration (WebSocket)
+    WS_HEARTBEAT_TIMEOUT_SECONDS: int = 60
+    WS_SEND_TIMEOUT_SECONDS: float = 5  # Slower viewers are dropped instead of stalling the room
+
+    # Encode responses with orjson (endpoints using json_response are unaffected)
+    FAST_JSON_RESPONSES: bool = False
+
     # Logging
     LOG_LEVEL: str = "INFO"
     
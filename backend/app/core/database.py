@@ -2,27 +2,204 @@
 Database configuration and connection management
 """
 
-from sqlalchemy import create_engine
+import asyncio
+import itertools
+import logging
+import threading
+from typing import List, Optional
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.exc import OperationalError
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.sql.dml import UpdateBase
 
+from app.core.cache import TTLCache, invalidation_bus
 from app.core.config import settings
 
+logger = logging.getLogger(__name__)
+
+def apply_sqlite_pragmas(dbapi_connection, connection_record=None) -> None:
+    """Tune every new SQLite connection for concurrent use"""
+    cursor = dbapi_connection.cursor()
+    try:
+        # WAL lets readers run while a write is in progress
+        cursor.execute(f"PRAGMA journal_mode={settings.SQLITE_JOURNAL_MODE}")
+        cursor.execute(f"PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}")
+        cursor.execute(f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_MS)}")
+        cursor.execute(f"PRAGMA mmap_size={int(settings.SQLITE_MMAP_SIZE)}")
+        cursor.execute(f"PRAGMA cache_size={-int(settings.SQLITE_CACHE_SIZE_KB)}")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+    finally:
+        cursor.close()
+
+def _on_event_loop() -> bool:
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+class SQLiteWriteLock:
+    """
+    Serializes write transactions of this process.
+
+    SQLite allows a single writer. Without this, concurrent writers each poll
+    the database lock in SQLite's busy handler and fail with "database is
+    locked" once busy_timeout runs out. With it, the first INSERT/UPDATE/
+    DELETE of a session waits on an in-process lock until the transaction
+    ends; sessions that only read never take it.
+
+    Waiting blocks the calling thread, so writes must never run on the event
+    loop: write endpoints are plain def (FastAPI runs them in the threadpool)
+    and async code writes via run_in_threadpool. Otherwise one waiting writer
+    freezes the whole worker, reads and /health included, for up to the
+    timeout. Such waits are logged as warnings.
+    """
+
+    def __init__(self, timeout: float):
+        self.timeout = timeout
+        self._lock = threading.Lock()
+
+    def acquire(self, session) -> None:
+        if session.info.get("sqlite_write_lock"):
+            return
+        if not self._lock.acquire(blocking=False):
+            if _on_event_loop():
+                logger.warning("SQLite write lock awaited on the event loop thread, move this write to a def endpoint or run_in_threadpool")
+            if not self._lock.acquire(timeout=self.timeout):
+                raise OperationalError(
+                    "acquire SQLite write lock", None,
+                    Exception(f"write lock not acquired within {self.timeout}s")
+                )
+        session.info["sqlite_write_lock"] = True
+
+    def release(self, session) -> None:
+        if session.info.pop("sqlite_write_lock", False):
+            self._lock.release()
+
+    def install(self, session_factory) -> None:
+        @event.listens_for(session_factory, "before_flush")
+        def _before_flush(session, flush_context, instances):
+            self.acquire(session)
+
+        @event.listens_for(session_factory, "do_orm_execute")
+        def _do_orm_execute(orm_execute_state):
+            if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+                self.acquire(orm_execute_state.session)
+
+        @event.listens_for(session_factory, "after_transaction_end")
+        def _after_transaction_end(session, transaction):
+            if transaction.parent is None:
+                self.release(session)
+
+def _create_engine(url: str):
+    connect_args = {}
+    sqlite = url.startswith("sqlite")
+    if sqlite:
+        # SQLite specific configuration
+        connect_args = {"check_same_thread": False}
+
+    new_engine = create_engine(
+        url,
+        connect_args=connect_args,
+        pool_pre_ping=True,
+        echo=settings.SQL_ECHO
+    )
+    if sqlite and settings.SQLITE_TUNED:
+        event.listen(new_engine, "connect", apply_sqlite_pragmas)
+    return new_engine
+
+class ReplicaSet:
+    """
+    Read replicas, their last measured lag and the users who wrote recently.
+
+    Lag is measured by app.services.replication; until a replica has been
+    measured it is not used. Recent writers are shared between workers over
+    the invalidation bus.
+    """
+
+    def __init__(self, urls: List[str]):
+        self.engines = [_create_engine(url) for url in urls]
+        self.lag: List[Optional[float]] = [None] * len(self.engines)
+        self.recent_writers = TTLCache(
+            maxsize=100_000, ttl=settings.READ_YOUR_WRITES_SECONDS, name="replica_writers"
+        )
+        self._counter = itertools.count()
+        invalidation_bus.register("replica_writer", self._mark_writer)
+
+    def _mark_writer(self, subject: str) -> None:
+        self.recent_writers.set(subject, True)
+
+    def note_write(self, subject: str) -> None:
+        """Send subject's reads to the primary for READ_YOUR_WRITES_SECONDS"""
+        invalidation_bus.publish("replica_writer", subject)
+
+    def choose(self, subject: Optional[str]):
+        """A healthy replica for subject's reads, or None for the primary"""
+        if subject is not None and self.recent_writers.get(subject):
+            return None
+        healthy = [
+            replica for replica, lag in zip(self.engines, self.lag)
+            if lag is not None and lag <= settings.REPLICA_MAX_LAG_SECONDS
+        ]
+        if not healthy:
+            return None
+        return healthy[next(self._counter) % len(healthy)]
+
+class RoutingSession(Session):
+    """
+    Session that sends the reads of read-only sessions to a replica.
+
+    A session is read-only when info["read_only"] is set (see
+    app.api.deps.get_read_db). It picks one replica on first use and keeps
+    it for consistent reads; flushes and INSERT/UPDATE/DELETE always go to
+    the primary, as does everything after them.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if self.info.get("read_only") and replica_set.engines:
+            if self._flushing or isinstance(clause, UpdateBase):
+                self.info["bind"] = engine
+            elif "bind" not in self.info:
+                self.info["bind"] = replica_set.choose(self.info.get("subject")) or engine
+            return self.info["bind"]
+        return super().get_bind(mapper, clause=clause, **kw)
+
+def _track_writes(session_factory) -> None:
+    """Record users whose transactions wrote, for read-your-writes"""
+    @event.listens_for(session_factory, "before_flush")
+    def _before_flush(session, flush_context, instances):
+        session.info["wrote"] = True
+
+    @event.listens_for(session_factory, "do_orm_execute")
+    def _do_orm_execute(orm_execute_state):
+        if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+            orm_execute_state.session.info["wrote"] = True
+
+    @event.listens_for(session_factory, "after_commit")
+    def _after_commit(session):
+        subject = session.info.get("subject")
+        if session.info.pop("wrote", False) and subject is not None:
+            replica_set.note_write(subject)
+
+    @event.listens_for(session_factory, "after_rollback")
+    def _after_rollback(session):
+        session.info.pop("wrote", None)
+
 # Create SQLAlchemy engine
-connect_args = {}
-if settings.USE_SQLITE:
-    # SQLite specific configuration
-    connect_args = {"check_same_thread": False}
-
-engine = create_engine(
-    settings.DATABASE_URL,
-    connect_args=connect_args,
-    pool_pre_ping=True,
-    echo=settings.DEBUG
-)
+engine = _create_engine(settings.DATABASE_URL)
+replica_set = ReplicaSet(settings.REPLICA_URLS)
 
 # Create session factory
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+SessionLocal = sessionmaker(class_=RoutingSession, autocommit=False, autoflush=False, bind=engine)
+
+if settings.USE_SQLITE and settings.SQLITE_TUNED:
+    sqlite_write_lock = SQLiteWriteLock(settings.SQLITE_WRITE_LOCK_TIMEOUT_SECONDS)
+    sqlite_write_lock.install(SessionLocal)
+
+if replica_set.engines:
+    _track_writes(SessionLocal)
 
 # Create base class for models
 Base = declarative_base()
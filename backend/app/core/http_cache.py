@@ -0,0 +1,79 @@
+"""
+Conditional request support (ETag / Last-Modified / 304 Not Modified, If-Match)
+
+Validators are built from cheap probes (a row's updated_at, or count and
+max(updated_at) of a filtered query) so a revalidation can be answered
+before any rows are loaded or serialized. ETags are weak: they identify the
+data a response was built from, not its exact bytes.
+"""
+
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Dict, Optional
+
+from fastapi import Request
+from starlette.responses import Response
+
+def _as_utc(value: datetime) -> datetime:
+    # Timestamps are stored as naive UTC
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+class CacheValidators:
+    def __init__(self, *parts: Any, last_modified: Optional[datetime] = None):
+        digest = hashlib.sha1(repr(parts).encode()).hexdigest()[:20]
+        self.etag = f'W/"{digest}"'
+        self.last_modified = _as_utc(last_modified).replace(microsecond=0) if last_modified else None
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        headers = {
+            "ETag": self.etag,
+            # Responses depend on the user, clients must revalidate before reuse
+            "Cache-Control": "private, no-cache"
+        }
+        if self.last_modified:
+            headers["Last-Modified"] = format_datetime(self.last_modified, usegmt=True)
+        return headers
+
+    def is_fresh(self, request: Request) -> bool:
+        """Whether the client's cached copy is still current"""
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match is not None:
+            # If-None-Match takes precedence over If-Modified-Since
+            return self._listed(if_none_match)
+
+        if_modified_since = request.headers.get("if-modified-since")
+        if if_modified_since and self.last_modified:
+            try:
+                since = _as_utc(parsedate_to_datetime(if_modified_since))
+            except (TypeError, ValueError):
+                return False
+            return self.last_modified <= since
+        return False
+
+    def matches(self, request: Request) -> bool:
+        """
+        Whether the If-Match precondition holds (true when it is absent).
+
+        Tags are compared weakly: an ETag from a GET identifies the row
+        version a client last saw, which is what an update must be based on.
+        """
+        if_match = request.headers.get("if-match")
+        return if_match is None or self._listed(if_match)
+
+    def _listed(self, header: str) -> bool:
+        if header.strip() == "*":
+            return True
+        opaque = self.etag[2:]
+        return any(tag.strip().removeprefix("W/") == opaque for tag in header.split(","))
+
+    def not_modified(self) -> Response:
+        return Response(status_code=304, headers=self.headers)
+
+def latest(*values: Optional[datetime]) -> Optional[datetime]:
+    """Most recent of some optional timestamps"""
+    present = [value for value in values if value is not None]
+    return max(present) if present else None
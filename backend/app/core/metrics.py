@@ -0,0 +1,166 @@
+"""
+Prometheus metrics
+
+Counters, gauges and histograms are prometheus_client objects updated in
+process. With several uvicorn workers, set PROMETHEUS_MULTIPROC_DIR to an
+empty directory (wiped on every deploy): each worker then writes its values
+to memory-mapped files in it and /metrics aggregates all workers, whichever
+one answers the scrape.
+
+- http_request_duration_seconds: latency by method, route template, status
+- http_requests_in_progress: requests being handled
+- db_pool_checkout_seconds / db_pool_connections: connection pool wait
+  time and checked out / idle connections, per engine
+- background_queue_depth: pending email outbox and digest queue rows
+- cache_requests_total: hits and misses of the in-process caches
+"""
+
+import os
+import time
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram,
+    generate_latest, multiprocess
+)
+from prometheus_client.core import GaugeMetricFamily
+
+MULTIPROCESS = "PROMETHEUS_MULTIPROC_DIR" in os.environ
+
+REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency",
+    ["method", "route", "status"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+)
+REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress",
+    "HTTP requests being handled",
+    multiprocess_mode="livesum"
+)
+POOL_CHECKOUT = Histogram(
+    "db_pool_checkout_seconds",
+    "Time to get a connection from the pool",
+    ["engine"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 5)
+)
+POOL_CONNECTIONS = Gauge(
+    "db_pool_connections",
+    "Pooled database connections",
+    ["engine", "state"],
+    multiprocess_mode="livesum"
+)
+CACHE_REQUESTS = Counter(
+    "cache_requests",
+    "In-process cache lookups",
+    ["cache", "result"]
+)
+
+class MetricsMiddleware:
+    """Records latency and in-flight requests by route template"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        started = time.perf_counter()
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        REQUESTS_IN_PROGRESS.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            REQUESTS_IN_PROGRESS.dec()
+            # Set by the router; templates keep label cardinality bounded
+            route = getattr(scope.get("route"), "path", "unmatched")
+            REQUEST_DURATION.labels(scope["method"], route, str(status_code)).observe(
+                time.perf_counter() - started
+            )
+
+def instrument_engine(engine, name: str) -> None:
+    """Record pool checkout time and connection counts of an engine"""
+    from sqlalchemy import event
+
+    pool = engine.pool
+    checkout_time = POOL_CHECKOUT.labels(name)
+    checked_out = POOL_CONNECTIONS.labels(name, "checked_out")
+    idle = POOL_CONNECTIONS.labels(name, "idle")
+    connect = pool.connect
+
+    def timed_connect():
+        started = time.perf_counter()
+        try:
+            return connect()
+        finally:
+            checkout_time.observe(time.perf_counter() - started)
+
+    def on_checkout(*args):
+        checked_out.set(pool.checkedout())
+        idle.set(pool.checkedin())
+
+    def on_checkin(*args):
+        # Fired before the connection is handed back to the pool
+        checked_out.set(pool.checkedout() - 1)
+        idle.set(pool.checkedin() + 1)
+
+    pool.connect = timed_connect
+    # Not every pool class (e.g. StaticPool) keeps counts
+    if hasattr(pool, "checkedout"):
+        event.listen(pool, "checkout", on_checkout)
+        event.listen(pool, "checkin", on_checkin)
+
+class QueueDepthCollector:
+    """Rows waiting in the background job tables, read at scrape time"""
+
+    def describe(self):
+        # Lets the registry check names without querying (or importing) the database
+        return [GaugeMetricFamily("background_queue_depth", "", labels=["queue"])]
+
+    def collect(self):
+        from sqlalchemy import func
+        from app.core.database import SessionLocal
+        from app.models.email_outbox import EmailOutbox, EmailStatus
+        from app.models.notification import NotificationDigestItem
+
+        depth = GaugeMetricFamily(
+            "background_queue_depth", "Rows waiting for a background job", labels=["queue"]
+        )
+        db = SessionLocal()
+        try:
+            depth.add_metric(["email_outbox"], db.query(func.count(EmailOutbox.id)).filter(
+                EmailOutbox.status == EmailStatus.pending
+            ).scalar())
+            for frequency, count in db.query(
+                NotificationDigestItem.frequency, func.count(NotificationDigestItem.id)
+            ).group_by(NotificationDigestItem.frequency):
+                depth.add_metric([f"digest_{frequency}"], count)
+        finally:
+            db.close()
+        yield depth
+
+queue_depth_collector = QueueDepthCollector()
+if not MULTIPROCESS:
+    REGISTRY.register(queue_depth_collector)
+
+def render_metrics() -> bytes:
+    """Exposition of this worker, or of every worker in multiprocess mode"""
+    if not MULTIPROCESS:
+        return generate_latest(REGISTRY)
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    registry.register(queue_depth_collector)
+    return generate_latest(registry)
+
+def mark_worker_dead() -> None:
+    """Drop this worker's live gauges when it exits"""
+    if MULTIPROCESS:
+        multiprocess.mark_process_dead(os.getpid())
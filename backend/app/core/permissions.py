@@ -0,0 +1,64 @@
+"""
+Permission bitsets
+
+A user's permissions are the bits implied by their role plus the explicit
+grants in users.permissions (a JSON list of names). They are compiled once
+when the user enters the auth cache, so checks are a bitwise AND.
+"""
+
+import enum
+import json
+from typing import Optional
+
+from app.models.user import UserRole
+
+class Permission(enum.IntFlag):
+    read_documents = 1 << 0
+    upload_documents = 1 << 1
+    approve_documents = 1 << 2  # Documents of the user's own department
+    approve_any_department = 1 << 3
+    view_all_departments = 1 << 4
+    view_internal_comments = 1 << 5
+    manage_documents = 1 << 6  # Edit/delete any document, uploads skip approval
+    moderate_comments = 1 << 7  # Edit/delete any comment
+    manage_users = 1 << 8
+    view_analytics = 1 << 9
+    system_admin = 1 << 10
+
+_BASE = Permission.read_documents | Permission.upload_documents | Permission.approve_documents
+
+ROLE_PERMISSIONS = {
+    UserRole.admin: Permission(sum(Permission)),
+    UserRole.executive: _BASE
+        | Permission.approve_any_department
+        | Permission.view_all_departments
+        | Permission.view_internal_comments
+        | Permission.view_analytics,
+    UserRole.maintenance: _BASE,
+    UserRole.compliance: _BASE,
+    UserRole.finance: _BASE,
+    UserRole.user: _BASE,
+}
+
+def compile_permissions(role: UserRole, grants: Optional[str]) -> int:
+    """Role-implied bits plus the grants of a users.permissions JSON value"""
+    bits = ROLE_PERMISSIONS.get(role, _BASE)
+    if grants:
+        try:
+            names = json.loads(grants)
+        except (json.JSONDecodeError, TypeError):
+            names = []
+        for name in names or []:
+            if name in Permission.__members__:
+                bits |= Permission[name]
+    return int(bits)
+
+def has_permission(user, permission: Permission) -> bool:
+    """True if the user (an object with permission_bits) holds every bit of permission"""
+    return user.permission_bits & permission == permission
+
+def can_approve(user, department) -> bool:
+    """Whether the user may approve, reject or send back a document of department"""
+    if has_permission(user, Permission.approve_any_department):
+        return True
+    return has_permission(user, Permission.approve_documents) and user.department == department
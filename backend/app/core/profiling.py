@@ -0,0 +1,292 @@
+"""
+On-demand sampling profiler for single requests
+
+A profiled request registers with a sampler thread that, every
+PROFILING_INTERVAL_MS, reads the stack of every thread with
+sys._current_frames() and keeps the ones working for the request:
+
+- on the event loop thread, stacks passing through the request's own
+  middleware frame (so concurrent requests are left out)
+- on threadpool threads, stacks whose anyio worker runs a call copied from
+  the request's context (sync endpoints, dependencies, DB access)
+
+Samples where neither is the case are counted as `idle` (waiting for the
+loop or a worker thread). Stacks are stored in collapsed form
+("frame;frame;frame count"), the input of flamegraph.pl and speedscope.
+
+Requests are profiled when an admin sends `X-Profile: 1` or `?_profile=1`,
+and every PROFILING_SAMPLE_EVERY-th request of a worker when set. Profiles
+are written to PROFILING_DIR, which keeps the newest PROFILING_RING_SIZE.
+The sampler thread only runs while a request is being profiled, and the
+middleware is not installed at all unless PROFILING_ENABLED.
+"""
+
+import inspect
+import itertools
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from contextvars import ContextVar
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional
+from urllib.parse import parse_qsl
+
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+try:
+    from anyio._backends._asyncio import WorkerThread
+    _WORKER_RUN = WorkerThread.run.__code__
+    # The worker is busy with a call only while on this line; elsewhere its `context` is stale
+    _lines, _start = inspect.getsourcelines(WorkerThread.run)
+    _WORKER_CALL_LINE = _start + next(i for i, line in enumerate(_lines) if "context.run(" in line)
+except (ImportError, AttributeError, OSError, StopIteration):
+    # Other anyio versions: only event loop stacks are attributed
+    _WORKER_RUN = _WORKER_CALL_LINE = None
+
+_current_profile: ContextVar[Optional["Profile"]] = ContextVar("current_profile", default=None)
+
+@lru_cache(maxsize=4096)
+def _short_path(filename: str) -> str:
+    """File name relative to the sys.path entry it was imported from"""
+    for entry in sorted((p for p in sys.path if p), key=len, reverse=True):
+        if filename.startswith(entry + os.sep):
+            return filename[len(entry) + 1:]
+    return filename
+
+def _label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({_short_path(code.co_filename)}:{frame.f_lineno})"
+
+class Profile:
+    """Collapsed stacks sampled while handling one request"""
+
+    def __init__(self, method: str, path: str, trigger: str):
+        self.id = f"{datetime.utcnow():%Y%m%dT%H%M%S%f}-{uuid.uuid4().hex[:8]}"
+        self.method = method
+        self.path = path
+        self.trigger = trigger
+        self.route: Optional[str] = None
+        self.status_code: Optional[int] = None
+        self.started_at = datetime.utcnow()
+        self.duration_ms = 0.0
+        self.samples = 0
+        self.stacks: Counter = Counter()
+        # Coroutine frame of the middleware call handling the request
+        self.marker = None
+
+    def add(self, stack: str) -> None:
+        self.stacks[stack] += 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "route": self.route,
+            "status_code": self.status_code,
+            "trigger": self.trigger,
+            "started_at": self.started_at.isoformat(),
+            "duration_ms": round(self.duration_ms, 1),
+            "samples": self.samples,
+            "stacks": dict(self.stacks)
+        }
+
+class Sampler:
+    """Samples thread stacks for the registered profiles, runs only while there are any"""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._profiles: List[Profile] = []
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def add(self, profile: Profile) -> None:
+        with self._lock:
+            self._profiles.append(profile)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+                self._thread.start()
+
+    def remove(self, profile: Profile) -> None:
+        with self._lock:
+            if profile in self._profiles:
+                self._profiles.remove(profile)
+
+    def _run(self) -> None:
+        own_id = threading.get_ident()
+        while True:
+            # Held while sampling, so a removed profile is no longer written to
+            with self._lock:
+                if not self._profiles:
+                    self._thread = None
+                    return
+                try:
+                    self.sample(self._profiles, own_id)
+                except Exception as e:
+                    logger.warning("Profiler sample failed: %s", e)
+            time.sleep(self.interval)
+
+    def sample(self, profiles: List[Profile], own_id: int) -> None:
+        markers = {profile.marker: profile for profile in profiles}
+        seen = set()
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own_id:
+                continue
+            labels = []
+            while frame is not None:
+                profile = markers.get(frame)
+                if profile is not None:
+                    self._record(profile, "event_loop", labels, seen)
+                    break
+                if frame.f_code is _WORKER_RUN:
+                    if frame.f_lineno != _WORKER_CALL_LINE:
+                        break
+                    # The worker's current call runs in a copy of the submitting request's context
+                    context = frame.f_locals.get("context")
+                    profile = context.get(_current_profile) if context is not None else None
+                    if profile in profiles:
+                        self._record(profile, "threadpool", labels, seen)
+                    break
+                labels.append(_label(frame))
+                frame = frame.f_back
+        for profile in profiles:
+            profile.samples += 1
+            if profile.id not in seen:
+                profile.add("idle")
+
+    @staticmethod
+    def _record(profile: Profile, root: str, labels: List[str], seen: set) -> None:
+        profile.add(";".join([root, *reversed(labels)]))
+        seen.add(profile.id)
+
+class ProfileStore:
+    """Profiles on disk, shared by the workers of one host; keeps the newest `size`"""
+
+    def __init__(self, directory: str, size: int):
+        self.directory = directory
+        self.size = size
+
+    def _path(self, profile_id: str) -> str:
+        return os.path.join(self.directory, f"{profile_id}.json")
+
+    def save(self, profile: Profile) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        temporary = self._path(profile.id) + ".tmp"
+        with open(temporary, "w") as f:
+            json.dump(profile.to_dict(), f)
+        os.replace(temporary, self._path(profile.id))
+        for old in self._ids()[self.size:]:
+            try:
+                os.remove(self._path(old))
+            except FileNotFoundError:
+                pass  # Trimmed by another worker
+
+    def _ids(self) -> List[str]:
+        """Profile ids, newest first (ids start with their UTC timestamp)"""
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted(
+            (name[:-len(".json")] for name in os.listdir(self.directory) if name.endswith(".json")),
+            reverse=True
+        )
+
+    def load(self, profile_id: str) -> Optional[Dict[str, Any]]:
+        if os.path.basename(profile_id) != profile_id:
+            return None
+        try:
+            with open(self._path(profile_id)) as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def list(self) -> List[Dict[str, Any]]:
+        profiles = []
+        for profile_id in self._ids():
+            data = self.load(profile_id)
+            if data is not None:
+                data.pop("stacks")
+                profiles.append(data)
+        return profiles
+
+profile_store = ProfileStore(settings.PROFILING_DIR, settings.PROFILING_RING_SIZE)
+
+def collapsed(data: Dict[str, Any]) -> str:
+    """Collapsed stack text of a stored profile"""
+    stacks = sorted(data["stacks"].items(), key=lambda item: item[1], reverse=True)
+    return "".join(f"{stack} {count}\n" for stack, count in stacks)
+
+class ProfilingMiddleware:
+    """Profiles requests flagged by an admin and every sample_every-th request"""
+
+    def __init__(
+        self,
+        app,
+        authorize: Callable[[Optional[str]], bool],
+        store: ProfileStore,
+        interval: float,
+        sample_every: int = 0
+    ):
+        self.app = app
+        self.authorize = authorize
+        self.store = store
+        self.sampler = Sampler(interval)
+        self.sample_every = sample_every
+        self._counter = itertools.count(1)
+
+    async def _trigger(self, scope) -> Optional[str]:
+        headers = dict(scope["headers"])
+        query = dict(parse_qsl(scope.get("query_string", b"").decode("latin-1")))
+        if headers.get(b"x-profile") == b"1" or query.get("_profile") == "1":
+            authorization = headers.get(b"authorization")
+            # Checking the token may query the users table
+            if await run_in_threadpool(self.authorize, authorization and authorization.decode("latin-1")):
+                return "on_demand"
+        if self.sample_every and next(self._counter) % self.sample_every == 0:
+            return "rolling"
+        return None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        trigger = await self._trigger(scope)
+        if trigger is None:
+            await self.app(scope, receive, send)
+            return
+
+        profile = Profile(scope["method"], scope["path"], trigger)
+        profile.marker = sys._getframe()
+
+        async def send_with_profile_id(message):
+            if message["type"] == "http.response.start":
+                profile.status_code = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((b"x-profile-id", profile.id.encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        token = _current_profile.set(profile)
+        started = time.perf_counter()
+        self.sampler.add(profile)
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            self.sampler.remove(profile)
+            _current_profile.reset(token)
+            profile.duration_ms = (time.perf_counter() - started) * 1000
+            profile.route = getattr(scope.get("route"), "path", None)
+            profile.marker = None
+            try:
+                await run_in_threadpool(self.store.save, profile)
+            except OSError as e:
+                logger.warning("Could not store profile %s: %s", profile.id, e)
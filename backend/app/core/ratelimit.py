@@ -0,0 +1,81 @@
+"""
+Token-bucket rate limiting
+
+Login throttling only charges failed attempts: enforce() checks that a token
+is left and the caller charges the bucket when the attempt fails. Successful
+logins, e.g. hundreds of staff behind one depot NAT address at shift change,
+never use up the budget.
+"""
+
+import math
+import threading
+import time
+from typing import Dict, Hashable, Tuple
+
+from fastapi import HTTPException, status
+
+class TokenBucketLimiter:
+    """
+    One token bucket per key, holding up to `burst` tokens and refilling at
+    `per_minute` tokens per minute. Buckets live in the worker's memory.
+    """
+
+    def __init__(self, burst: int, per_minute: float, max_keys: int = 100000):
+        self.burst = burst
+        self.rate = per_minute / 60.0
+        self.max_keys = max_keys
+        self._buckets: Dict[Hashable, Tuple[float, float]] = {}
+        self._lock = threading.Lock()
+
+    def _tokens(self, key: Hashable, now: float) -> float:
+        tokens, updated = self._buckets.get(key, (self.burst, now))
+        return min(self.burst, tokens + (now - updated) * self.rate)
+
+    def acquire(self, key: Hashable) -> float:
+        """Take a token for key. Returns 0 if allowed, else seconds until one is available"""
+        now = time.monotonic()
+        with self._lock:
+            tokens = self._tokens(key, now)
+            if tokens < 1:
+                self._buckets[key] = (tokens, now)
+                return (1 - tokens) / self.rate
+            self._store(key, tokens - 1, now)
+            return 0.0
+
+    def wait_time(self, key: Hashable) -> float:
+        """Seconds until key has a token, 0 if it has one now; takes nothing"""
+        with self._lock:
+            tokens = self._tokens(key, time.monotonic())
+        return 0.0 if tokens >= 1 else (1 - tokens) / self.rate
+
+    def charge(self, key: Hashable) -> None:
+        """Take a token for key even if none is left, e.g. for a failed attempt"""
+        now = time.monotonic()
+        with self._lock:
+            self._store(key, max(0.0, self._tokens(key, now) - 1), now)
+
+    def _store(self, key: Hashable, tokens: float, now: float) -> None:
+        self._buckets[key] = (tokens, now)
+        if len(self._buckets) > self.max_keys:
+            self._prune(now)
+
+    def _prune(self, now: float) -> None:
+        # Buckets that would be full again are equivalent to no bucket
+        full_after = self.burst / self.rate
+        for key, (_, updated) in list(self._buckets.items()):
+            if now - updated >= full_after:
+                del self._buckets[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._buckets.clear()
+
+def enforce(limiter: TokenBucketLimiter, key: Hashable, detail: str) -> None:
+    """Raise 429 with Retry-After when key has no tokens left; charging is up to the caller"""
+    retry_after = limiter.wait_time(key)
+    if retry_after > 0:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=detail,
+            headers={"Retry-After": str(math.ceil(retry_after))}
+        )
@@ -0,0 +1,79 @@
+"""
+Startup check that the database schema is at the latest Alembic revision
+
+Schema changes are applied out of band with `alembic upgrade head`; workers
+only compare the database's revision with the newest one shipped, which is a
+single-row SELECT instead of reflecting every table.
+"""
+
+import ast
+import logging
+import os
+import re
+from typing import Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+
+from app.core.database import engine
+
+logger = logging.getLogger(__name__)
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+VERSIONS_DIR = os.path.join(BACKEND_DIR, "alembic", "versions")
+
+# e.g. revision: str = '0002' / down_revision: Union[str, None] = '0001'
+REVISION_LINE = re.compile(r"^(revision|down_revision)\b[^=]*=\s*(.+?)\s*$")
+
+def _revision_ids(path: str) -> Tuple[Optional[str], Tuple[str, ...]]:
+    """(revision, down_revisions) declared by a migration script"""
+    revision, down = None, ()
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            match = REVISION_LINE.match(line)
+            if match is None:
+                continue
+            value = ast.literal_eval(match.group(2))
+            if match.group(1) == "revision":
+                revision = value
+            elif value is not None:
+                down = tuple(value) if isinstance(value, (tuple, list)) else (value,)
+    return revision, down
+
+def expected_revision() -> Optional[str]:
+    """
+    Head revision of the migration scripts.
+
+    Read from the scripts' revision lines rather than through Alembic, whose
+    import alone costs more than the rest of the check.
+    """
+    revisions, referenced = set(), set()
+    for name in os.listdir(VERSIONS_DIR):
+        if name.endswith(".py"):
+            revision, down = _revision_ids(os.path.join(VERSIONS_DIR, name))
+            if revision:
+                revisions.add(revision)
+                referenced.update(down)
+    heads = revisions - referenced
+    if len(heads) > 1:
+        raise RuntimeError(f"Migrations have several heads: {sorted(heads)}")
+    return heads.pop() if heads else None
+
+def current_revision() -> Optional[str]:
+    try:
+        with engine.connect() as conn:
+            return conn.execute(text("SELECT version_num FROM alembic_version")).scalar()
+    except DBAPIError:
+        # No alembic_version table: never migrated
+        return None
+
+def check_schema_revision() -> None:
+    """Refuse to start against a database that is not at the head revision"""
+    current, expected = current_revision(), expected_revision()
+    if current != expected:
+        raise RuntimeError(
+            f"Database schema is at revision {current or 'none'}, expected {expected}. "
+            "Run `alembic upgrade head` (stamp databases created by older versions "
+            "with `alembic stamp 0001` first)."
+        )
+    logger.info("Database schema at revision %s", current)
\ No newline at end of file
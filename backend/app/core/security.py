@@ -2,28 +2,100 @@
 Authentication and security utilities
 """
 
+import asyncio
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional, Union
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Dict, Optional, Tuple, Union
 
 from jose import JWTError, jwt
-from passlib.context import CryptContext
 from fastapi import HTTPException, status
 
 from app.core.config import settings
 
-# Password hashing context
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+if TYPE_CHECKING:
+    from passlib.context import CryptContext
+
+@lru_cache(maxsize=None)
+def get_pwd_context() -> "CryptContext":
+    """
+    Password hashing context, hashes with a different cost are rehashed on
+    login. Built on first use: passlib is slow to import and only logins and
+    user management need it.
+    """
+    from passlib.context import CryptContext
+    return CryptContext(
+        schemes=["bcrypt"],
+        deprecated="auto",
+        bcrypt__rounds=settings.BCRYPT_ROUNDS
+    )
+
+# bcrypt releases the GIL, so a small thread pool keeps hashing off the event
+# loop while bounding how many CPU cores logins can take at once
+password_hash_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    thread_name_prefix="password-hash"
+)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a plain password against its hash"""
-    return pwd_context.verify(plain_password, hashed_password)
+    return get_pwd_context().verify(plain_password, hashed_password)
 
 def get_password_hash(password: str) -> str:
     """Generate password hash"""
-    return pwd_context.hash(password)
+    return get_pwd_context().hash(password)
+
+def verify_and_update_password(
+    plain_password: str, hashed_password: Optional[str]
+) -> Tuple[bool, Optional[str]]:
+    """
+    Verify a password, returning (valid, new_hash).
+
+    new_hash is set when the stored hash uses outdated parameters. Without a
+    stored hash a dummy verification is run so unknown usernames take as long
+    as wrong passwords.
+    """
+    if hashed_password is None:
+        get_pwd_context().dummy_verify()
+        return False, None
+    return get_pwd_context().verify_and_update(plain_password, hashed_password)
+
+async def verify_and_update_password_async(
+    plain_password: str, hashed_password: Optional[str]
+) -> Tuple[bool, Optional[str]]:
+    """verify_and_update_password on the password hashing pool"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        password_hash_executor, verify_and_update_password, plain_password, hashed_password
+    )
+
+async def get_password_hash_async(password: str) -> str:
+    """get_password_hash on the password hashing pool"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(password_hash_executor, get_password_hash, password)
+
+def _create_token(
+    subject: Union[str, int], token_type: str, expire: datetime, session_id: str
+) -> str:
+    to_encode = {
+        "exp": expire,
+        "iat": datetime.utcnow(),
+        "sub": str(subject),
+        "type": token_type,
+        "jti": uuid.uuid4().hex,
+        "sid": session_id
+    }
+    return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+
+def new_session_id() -> str:
+    """Id shared by the access and refresh tokens of one login"""
+    return uuid.uuid4().hex
 
 def create_access_token(
-    subject: Union[str, int], expires_delta: Optional[timedelta] = None
+    subject: Union[str, int],
+    expires_delta: Optional[timedelta] = None,
+    session_id: Optional[str] = None
 ) -> str:
     """Create JWT access token"""
     if expires_delta:
@@ -32,22 +104,28 @@ def create_access_token(
         expire = datetime.utcnow() + timedelta(
             minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES
         )
-    
-    to_encode = {"exp": expire, "sub": str(subject)}
-    encoded_jwt = jwt.encode(
-        to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM
-    )
-    return encoded_jwt
+    return _create_token(subject, "access", expire, session_id or new_session_id())
 
-def verify_token(token: str) -> Optional[str]:
-    """Verify JWT token and return subject"""
+def create_refresh_token(subject: Union[str, int], session_id: str) -> str:
+    """Create JWT refresh token"""
+    expire = datetime.utcnow() + timedelta(minutes=settings.REFRESH_TOKEN_EXPIRE_MINUTES)
+    return _create_token(subject, "refresh", expire, session_id)
+
+def decode_token(token: str, token_type: str = "access") -> Optional[Dict[str, Any]]:
+    """Verify a JWT and return its claims, None if invalid or of another type"""
     try:
         payload = jwt.decode(
             token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
         )
-        token_subject: str = payload.get("sub")
-        if token_subject is None:
-            return None
-        return token_subject
     except JWTError:
-        return None
\ No newline at end of file
+        return None
+    if payload.get("type") != token_type or not payload.get("sub") or not payload.get("jti"):
+        return None
+    return payload
+
+def verify_token(token: str) -> Optional[str]:
+    """Verify JWT access token and return subject"""
+    payload = decode_token(token)
+    if payload is None:
+        return None
+    return payload["sub"]
@@ -0,0 +1,49 @@
+"""
+Fast JSON serialization for large responses
+
+FastAPI's default path validates the return value against the response
+model, converts it to JSON-compatible Python objects and then encodes them
+with the stdlib json module. Endpoints with large responses can instead
+return json_response(), which validates ORM rows with a cached TypeAdapter
+and lets pydantic-core write the JSON bytes directly. The route keeps its
+response_model for the OpenAPI schema.
+
+With FAST_JSON_RESPONSES enabled, every other endpoint is encoded with
+orjson instead of the stdlib json module.
+"""
+
+from functools import lru_cache
+from typing import Any, Dict, Optional, Type
+
+from fastapi.responses import JSONResponse, ORJSONResponse
+from pydantic import TypeAdapter
+from starlette.responses import Response
+
+from app.core.config import settings
+
+default_response_class: Type[Response] = (
+    ORJSONResponse if settings.FAST_JSON_RESPONSES else JSONResponse
+)
+
+@lru_cache(maxsize=None)
+def get_adapter(tp: Any) -> TypeAdapter:
+    """TypeAdapter for a type, built once per process"""
+    return TypeAdapter(tp)
+
+def dump_json(tp: Any, obj: Any) -> bytes:
+    """Validate obj (ORM rows allowed) as tp and encode it as JSON"""
+    adapter = get_adapter(tp)
+    return adapter.dump_json(adapter.validate_python(obj, from_attributes=True))
+
+class PydanticJSONResponse(Response):
+    """Response whose body is already encoded JSON"""
+    media_type = "application/json"
+
+def json_response(
+    tp: Any,
+    obj: Any,
+    status_code: int = 200,
+    headers: Optional[Dict[str, str]] = None
+) -> Response:
+    """Serialize obj as tp straight to a response"""
+    return PydanticJSONResponse(dump_json(tp, obj), status_code=status_code, headers=headers)
@@ -0,0 +1,143 @@
+"""
+Per-request SQL instrumentation
+
+Engine events time every statement; for a sampled request the middleware
+collects them in a context variable (copied into threadpool calls, so sync
+code in the request is covered) and reports:
+
+- a Server-Timing header: `db;dur=<ms>;desc="<n> queries"`
+- one log line with the query count, total DB time and slowest statements
+- a warning when the same statement runs SQL_N_PLUS_ONE_THRESHOLD or more
+  times in one request, the usual sign of a lazy load or a query in a loop
+
+Requests that are not sampled only pay for a context variable lookup per
+statement.
+"""
+
+import logging
+import random
+import threading
+import time
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+MAX_LOGGED_SQL = 200
+
+class RequestQueries:
+    """Statements executed while handling one request"""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        # statement -> [executions, total seconds]
+        self.statements: Dict[str, List] = {}
+        self._lock = threading.Lock()
+
+    def record(self, statement: str, seconds: float) -> None:
+        with self._lock:
+            self.count += 1
+            self.seconds += seconds
+            entry = self.statements.get(statement)
+            if entry is None:
+                self.statements[statement] = [1, seconds]
+            else:
+                entry[0] += 1
+                entry[1] += seconds
+
+    def slowest(self, limit: int) -> List[Tuple[float, int, str]]:
+        """(total seconds, executions, statement) of the costliest statements"""
+        ranked = sorted(
+            ((total, runs, statement) for statement, (runs, total) in self.statements.items()),
+            reverse=True
+        )
+        return ranked[:limit]
+
+    def repeated(self, threshold: int) -> List[Tuple[int, str]]:
+        return sorted(
+            ((runs, statement) for statement, (runs, _) in self.statements.items() if runs >= threshold),
+            reverse=True
+        )
+
+    def server_timing(self) -> str:
+        return f'db;dur={self.seconds * 1000:.1f};desc="{self.count} queries"'
+
+_current: ContextVar[Optional[RequestQueries]] = ContextVar("sql_request_queries", default=None)
+
+def current_queries() -> Optional[RequestQueries]:
+    """Statements of the current request, None when it is not sampled"""
+    return _current.get()
+
+def _shorten(statement: str) -> str:
+    statement = " ".join(statement.split())
+    return statement if len(statement) <= MAX_LOGGED_SQL else statement[:MAX_LOGGED_SQL] + "..."
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None and context is not None:
+        context._sql_started = time.perf_counter()
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    queries = _current.get()
+    started = getattr(context, "_sql_started", None)
+    if queries is not None and started is not None:
+        queries.record(statement, time.perf_counter() - started)
+
+def install() -> None:
+    """Time statements of every engine"""
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+
+def report(method: str, path: str, status_code: Optional[int], queries: RequestQueries) -> None:
+    """Log the request's queries and warn about repeated statements"""
+    slowest = "; ".join(
+        f"{total * 1000:.1f}ms x{runs} {_shorten(statement)}"
+        for total, runs, statement in queries.slowest(settings.SQL_SLOW_STATEMENTS)
+    )
+    logger.info(
+        "%s %s %s: %d queries in %.1fms%s",
+        method, path, status_code, queries.count, queries.seconds * 1000,
+        f" | slowest: {slowest}" if slowest else ""
+    )
+    for runs, statement in queries.repeated(settings.SQL_N_PLUS_ONE_THRESHOLD):
+        logger.warning(
+            "Possible N+1 in %s %s: statement executed %d times: %s",
+            method, path, runs, _shorten(statement)
+        )
+
+class SQLInstrumentationMiddleware:
+    """Collects the SQL of a sample of requests, see the module docstring"""
+
+    def __init__(self, app, sample_rate: float = 1.0):
+        self.app = app
+        self.sample_rate = sample_rate
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or random.random() >= self.sample_rate:
+            await self.app(scope, receive, send)
+            return
+
+        queries = RequestQueries()
+        token = _current.set(queries)
+        status_code = None
+
+        async def send_with_timing(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", queries.server_timing().encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
+            report(scope["method"], scope["path"], status_code, queries)
@@ -2,12 +2,19 @@
 Comment model for document annotations and discussions
 """
 
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Boolean
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Boolean, Index, and_, text
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 
 from app.core.database import Base
 
+# Materialized path: fixed-width, zero-padded ids of the ancestors and the
+# comment itself, e.g. "00000000120000000034" for comment 34 replying to 12.
+# Digits only, so ordering is the same under every collation.
+PATH_SEGMENT_WIDTH = 10
+PATH_MAX_LENGTH = 500
+MAX_THREAD_DEPTH = PATH_MAX_LENGTH // PATH_SEGMENT_WIDTH
+
 class Comment(Base):
     __tablename__ = "comments"
     
@@ -25,11 +32,16 @@ class Comment(Base):
     document_id = Column(Integer, ForeignKey("documents.id"), nullable=False)
     author_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     parent_id = Column(Integer, ForeignKey("comments.id"), nullable=True)  # For replies
+    path = Column(String(PATH_MAX_LENGTH), nullable=True, index=True)  # Thread position
     
     # Status
     is_resolved = Column(Boolean, default=False)
     is_internal = Column(Boolean, default=False)  # Internal comments vs public
     
+    # Bumped by every UPDATE; timestamps have one-second resolution and cannot
+    # tell two edits in the same second apart for list ETags
+    edit_count = Column(Integer, nullable=False, server_default="0", onupdate=text("edit_count + 1"))
+    
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
@@ -38,4 +50,24 @@ class Comment(Base):
     document = relationship("Document", back_populates="comments")
     author = relationship("User", back_populates="comments")
     parent = relationship("Comment", remote_side=[id])
-    replies = relationship("Comment", cascade="all, delete-orphan", overlaps="parent")
\ No newline at end of file
+    replies = relationship("Comment", cascade="all, delete-orphan", overlaps="parent")
+    
+    __table_args__ = (
+        # Annotation overlays for one page of the viewer
+        Index("ix_comments_document_page", "document_id", "page_number"),
+    )
+    
+    @property
+    def depth(self) -> int:
+        """Nesting level, 1 for top-level comments"""
+        return len(self.path) // PATH_SEGMENT_WIDTH if self.path else 1
+    
+    def assign_path(self, parent: "Comment" = None) -> None:
+        """Set the path once the comment has an id (after flush)"""
+        self.path = (parent.path if parent is not None else "") + str(self.id).zfill(PATH_SEGMENT_WIDTH)
+    
+    @staticmethod
+    def subtree_filter(path: str):
+        """Range condition matching a comment and all its descendants"""
+        upper = str(int(path) + 1).zfill(len(path))
+        return and_(Comment.path >= path, Comment.path < upper)
@@ -2,9 +2,10 @@
 Document model for document management
 """
 
-from sqlalchemy import Column, Integer, String, Text, DateTime, Enum, Boolean, ForeignKey, Float
+from sqlalchemy import Column, Integer, String, Text, DateTime, Enum, Boolean, ForeignKey, Float, Index, event
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
+from sqlalchemy.orm.attributes import flag_modified
 import enum
 
 from app.core.database import Base
@@ -63,6 +64,8 @@ class Document(Base):
     # Workflow
     approval_required = Column(Boolean, default=True)
     deadline = Column(DateTime(timezone=True), nullable=True)
+    # Most urgent DEADLINE_REMINDER_OFFSETS_HOURS offset reminded of for this deadline
+    reminded_offset_hours = Column(Integer, nullable=True)
     
     # Engagement metrics
     view_count = Column(Integer, default=0)
@@ -71,6 +74,9 @@ class Document(Base):
     # Bookmarking
     bookmarked_by = Column(Text, nullable=True)  # JSON array of user IDs
     
+    # Optimistic concurrency: bumped by every ORM update, checked in its WHERE clause
+    row_version = Column(Integer, nullable=False, server_default="1")
+    
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
@@ -81,6 +87,20 @@ class Document(Base):
     approver = relationship("User", foreign_keys=[approved_by])
     comments = relationship("Comment", back_populates="document", cascade="all, delete-orphan")
     workflow_history = relationship("WorkflowHistory", back_populates="document", cascade="all, delete-orphan")
+    
+    __table_args__ = (
+        # Deadline reminder scans and overdue counts
+        Index("ix_documents_status_deadline", "status", "deadline"),
+    )
+    __mapper_args__ = {"version_id_col": row_version}
+
+@event.listens_for(Document.deadline, "set")
+def _reset_deadline_reminders(document, value, oldvalue, initiator):
+    # A new deadline is reminded of again. Written even if this session still
+    # holds None from before a reminder run
+    if value != oldvalue:
+        document.reminded_offset_hours = None
+        flag_modified(document, "reminded_offset_hours")
 
 class WorkflowHistory(Base):
     __tablename__ = "workflow_history"
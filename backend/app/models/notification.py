@@ -2,7 +2,7 @@
 Notification model for user notifications
 """
 
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Boolean, Enum
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Boolean, Enum, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 import enum
@@ -54,4 +54,29 @@ class Notification(Base):
     
     # Relationships
     user = relationship("User", back_populates="notifications")
-    document = relationship("Document")
\ No newline at end of file
+    document = relationship("Document")
+
+class NotificationDigestItem(Base):
+    """Non-urgent notification waiting to be collapsed into a daily/weekly digest"""
+    __tablename__ = "notification_digest_queue"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    
+    # Recipient and schedule (daily, weekly)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    frequency = Column(String(10), nullable=False)
+    
+    # Content of the original notification
+    title = Column(String(255), nullable=False)
+    message = Column(Text, nullable=False)
+    type = Column(Enum(NotificationType), nullable=False)
+    priority = Column(Enum(NotificationPriority), default=NotificationPriority.medium)
+    document_id = Column(Integer, ForeignKey("documents.id"), nullable=True)
+    extra_data = Column(Text, nullable=True)
+    
+    # Timestamps
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    __table_args__ = (
+        Index("ix_notification_digest_queue_frequency_user", "frequency", "user_id"),
+    )
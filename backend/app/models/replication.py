@@ -0,0 +1,17 @@
+"""
+Replication heartbeat model
+"""
+
+from sqlalchemy import Column, Integer, DateTime
+
+from app.core.database import Base
+
+class ReplicationHeartbeat(Base):
+    """
+    Single row the primary updates every REPLICA_HEARTBEAT_SECONDS; how old
+    it is on a replica is that replica's lag.
+    """
+    __tablename__ = "replication_heartbeat"
+
+    id = Column(Integer, primary_key=True)
+    beat_at = Column(DateTime, nullable=False)
\ No newline at end of file
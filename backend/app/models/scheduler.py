@@ -0,0 +1,16 @@
+"""
+Scheduler state model for background jobs
+"""
+
+from sqlalchemy import Column, String, DateTime
+from sqlalchemy.sql import func
+
+from app.core.database import Base
+
+class SchedulerWatermark(Base):
+    """Point in time up to which a periodic job has processed its work"""
+    __tablename__ = "scheduler_watermarks"
+
+    name = Column(String(50), primary_key=True)
+    value = Column(DateTime(timezone=True), nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -0,0 +1,24 @@
+"""
+Revoked token model
+"""
+
+from sqlalchemy import Column, Integer, String, DateTime
+from sqlalchemy.sql import func
+
+from app.core.database import Base
+
+class TokenRevocation(Base):
+    """
+    Either a revoked token/session id (jti or sid claim), or a cutoff that
+    revokes every token of a user issued before revoked_before.
+    """
+    __tablename__ = "token_revocations"
+
+    id = Column(Integer, primary_key=True, index=True)
+    token_id = Column(String(64), nullable=True)
+    user_id = Column(Integer, nullable=True)
+    revoked_before = Column(DateTime(timezone=True), nullable=True)
+
+    # Once every token covered by the row has expired, the row can go
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
\ No newline at end of file
@@ -6,6 +6,8 @@ from typing import Optional, List
 from pydantic import BaseModel
 from datetime import datetime
 
+from app.models.user import UserRole
+
 class CommentBase(BaseModel):
     content: str
     page_number: Optional[int] = None
@@ -32,9 +34,18 @@ class CommentInDBBase(CommentBase):
     class Config:
         from_attributes = True
 
+class CommentAuthor(BaseModel):
+    id: int
+    username: str
+    full_name: Optional[str] = None
+    role: UserRole
+
+    class Config:
+        from_attributes = True
+
 class Comment(CommentInDBBase):
     # Include author information
-    author: Optional[dict] = None
+    author: Optional[CommentAuthor] = None
     replies: Optional[List['Comment']] = None
 
 class CommentList(BaseModel):
@@ -43,5 +54,21 @@ class CommentList(BaseModel):
     page: int
     limit: int
 
+# Compact annotation overlay for the document viewer
+class Annotation(BaseModel):
+    id: int
+    page_number: int
+    position_x: Optional[int] = None
+    position_y: Optional[int] = None
+    author_id: int
+    is_resolved: bool
+    is_internal: bool
+
+    class Config:
+        from_attributes = True
+
+class AnnotationList(BaseModel):
+    annotations: List[Annotation]
+
 # Update forward references
 Comment.model_rebuild()
\ No newline at end of file
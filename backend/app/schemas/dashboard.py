@@ -6,6 +6,8 @@ from typing import List, Dict, Any, Optional
 from datetime import datetime
 from pydantic import BaseModel
 
+from app.schemas.document import Document
+
 # Schema for dashboard statistics
 class DashboardStats(BaseModel):
     total_documents: int
@@ -32,7 +34,7 @@ class Alert(BaseModel):
 # Schema for dashboard overview
 class DashboardOverview(BaseModel):
     stats: DashboardStats
-    recent_documents: List[Any]  # Will be Document objects
+    recent_documents: List[Document]
     pending_actions: List[PendingAction]
     alerts: List[Alert]
 
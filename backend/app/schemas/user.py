@@ -95,9 +95,33 @@ class UserLogin(BaseModel):
 
 class Token(BaseModel):
     access_token: str
+    refresh_token: Optional[str] = None
     token_type: str = "bearer"
     expires_in: int
     user: User
 
+# Schemas for bulk user import
+class UserImportRow(BaseModel):
+    row: int
+    username: Optional[str] = None
+    status: str  # created, error
+    errors: List[str] = []
+    user_id: Optional[int] = None
+
+class UserImportReport(BaseModel):
+    total: int
+    created: int
+    failed: int
+    rows: List[UserImportRow]
+
+class TokenRefresh(BaseModel):
+    access_token: str
+    refresh_token: str
+    token_type: str = "bearer"
+    expires_in: int
+
+class RefreshTokenRequest(BaseModel):
+    refresh_token: str
+
 class TokenData(BaseModel):
     username: Optional[str] = None
\ No newline at end of file
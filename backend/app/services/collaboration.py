@@ -0,0 +1,252 @@
+"""
+Live document collaboration rooms
+
+Every open document viewer joins the room of its document. Comment and
+workflow endpoints publish events to a room; presence (``user_viewing``) is
+broadcast on join/leave and when a viewer stops sending heartbeats.
+
+Rooms live in the memory of the worker that accepted the WebSocket. Events are
+serialized once per publish and only sent to the sockets of that room, so idle
+rooms cost nothing. With several workers, CACHE_INVALIDATION_PUBSUB relays
+events over the invalidation bus to every worker, and each worker announces
+the viewers of its rooms so presence lists everyone. Without it, publishing
+to a document nobody on this worker is viewing is a single dict lookup.
+
+A send that takes longer than WS_SEND_TIMEOUT_SECONDS drops the viewer (its
+socket is closed so the client reconnects) instead of holding up the room.
+"""
+
+import asyncio
+import json
+import logging
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from fastapi import WebSocket
+from starlette.concurrency import run_in_threadpool
+
+from app.core.cache import invalidation_bus
+from app.core.config import settings
+from app.core.permissions import Permission
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class Viewer:
+    user_id: int
+    username: str
+    full_name: Optional[str]
+    permission_bits: int
+    last_seen: float
+
+class CollaborationHub:
+    def __init__(self):
+        self.rooms: Dict[int, Dict[WebSocket, Viewer]] = {}
+        # Viewers on other workers: document id -> worker -> (announced at, viewers)
+        self.remote_viewers: Dict[int, Dict[str, Tuple[float, List[dict]]]] = {}
+        self.origin = uuid.uuid4().hex
+        self._remote_lock = threading.Lock()
+        self._sweeper: Optional[asyncio.Task] = None
+        self._pending: Set[asyncio.Task] = set()
+        # Loop owning the sockets, for events from threadpool endpoints and the bus listener
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def join(self, document_id: int, websocket: WebSocket, viewer: Viewer) -> None:
+        self._loop = asyncio.get_running_loop()
+        self.rooms.setdefault(document_id, {})[websocket] = viewer
+        if self._sweeper is None or self._sweeper.done():
+            self._sweeper = asyncio.create_task(self._expire_stale_viewers())
+        await self.broadcast_presence(document_id)
+
+    async def leave(self, document_id: int, websocket: WebSocket) -> None:
+        room = self.rooms.get(document_id)
+        if room is None or room.pop(websocket, None) is None:
+            return
+        if not room:
+            del self.rooms[document_id]
+            await self._announce(document_id, [])
+        else:
+            await self.broadcast_presence(document_id)
+
+    def has_viewers(self, document_id: int) -> bool:
+        """Whether the document is open on this worker"""
+        return document_id in self.rooms
+
+    def is_watched(self, document_id: int) -> bool:
+        """Whether an event for the document may reach anyone, on any worker when relayed"""
+        return settings.CACHE_INVALIDATION_PUBSUB or self.has_viewers(document_id)
+
+    def heartbeat(self, document_id: int, websocket: WebSocket) -> None:
+        viewer = self.rooms.get(document_id, {}).get(websocket)
+        if viewer is not None:
+            viewer.last_seen = time.monotonic()
+
+    async def broadcast(
+        self,
+        document_id: int,
+        event: str,
+        data: Dict[str, Any],
+        permission: Optional[Permission] = None
+    ) -> None:
+        """Send an event to everyone in the room, optionally only to holders of a permission"""
+        room = self.rooms.get(document_id)
+        if not room:
+            return
+
+        message = json.dumps({"event": event, "document_id": document_id, "data": data}, default=str)
+        targets = [
+            websocket for websocket, viewer in room.items()
+            if permission is None or viewer.permission_bits & permission == permission
+        ]
+        timeout = settings.WS_SEND_TIMEOUT_SECONDS
+        results = await asyncio.gather(
+            *(asyncio.wait_for(websocket.send_text(message), timeout) for websocket in targets),
+            return_exceptions=True
+        )
+        # Sockets that failed are gone, their receive loop will clean up;
+        # slow ones are closed so they stop holding up the room
+        dropped = False
+        for websocket, result in zip(targets, results):
+            if isinstance(result, Exception):
+                dropped = room.pop(websocket, None) is not None or dropped
+                if isinstance(result, asyncio.TimeoutError):
+                    logger.info("Dropped a viewer of document %s, send timed out", document_id)
+                    self._spawn(self._close, websocket)
+        if not room:
+            self.rooms.pop(document_id, None)
+            await self._announce(document_id, [])
+        elif dropped and event != "user_viewing":
+            self._spawn(self.broadcast_presence, document_id)
+
+    def publish(
+        self,
+        document_id: int,
+        event: str,
+        data: Dict[str, Any],
+        permission: Optional[Permission] = None
+    ) -> None:
+        """
+        Fire-and-forget broadcast, so HTTP handlers never wait on sockets.
+
+        Safe to call from sync (threadpool) endpoints: the broadcast is
+        handed to the event loop that owns the sockets. With pub/sub the
+        event also goes to every other worker; data must be JSON-serializable.
+        """
+        if not self.is_watched(document_id):
+            return
+        invalidation_bus.publish("collaboration_event", {
+            "document_id": document_id,
+            "event": event,
+            "data": data,
+            "permission": int(permission) if permission is not None else None
+        })
+
+    def receive_event(self, message: Dict[str, Any]) -> None:
+        """An event published on this or (over pub/sub) another worker"""
+        document_id = message["document_id"]
+        if not self.has_viewers(document_id):
+            return
+        permission = Permission(message["permission"]) if message["permission"] is not None else None
+        self._on_loop(self.broadcast, document_id, message["event"], message["data"], permission)
+
+    def _on_loop(self, coroutine_function: Callable[..., Awaitable[None]], *args) -> None:
+        """Start a coroutine on the loop owning the sockets, from any thread"""
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            self._loop.call_soon_threadsafe(self._spawn, coroutine_function, *args)
+            return
+        self._spawn(coroutine_function, *args)
+
+    def _spawn(self, coroutine_function: Callable[..., Awaitable[None]], *args) -> None:
+        task = asyncio.create_task(coroutine_function(*args))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def _close(self, websocket: WebSocket) -> None:
+        try:
+            await asyncio.wait_for(websocket.close(), settings.WS_SEND_TIMEOUT_SECONDS)
+        except Exception:
+            pass
+
+    def _local_viewers(self, document_id: int) -> List[dict]:
+        viewers = {}
+        for viewer in self.rooms.get(document_id, {}).values():
+            viewers[viewer.user_id] = {
+                "user_id": viewer.user_id,
+                "username": viewer.username,
+                "full_name": viewer.full_name
+            }
+        return list(viewers.values())
+
+    async def broadcast_presence(self, document_id: int) -> None:
+        """Announce this worker's viewers of the document and send everyone's to the room"""
+        await self._announce(document_id, self._local_viewers(document_id))
+        await self._send_presence(document_id)
+
+    async def _send_presence(self, document_id: int) -> None:
+        viewers = {}
+        cutoff = time.monotonic() - settings.WS_HEARTBEAT_TIMEOUT_SECONDS
+        with self._remote_lock:
+            for announced_at, remote in self.remote_viewers.get(document_id, {}).values():
+                if announced_at >= cutoff:
+                    viewers.update((viewer["user_id"], viewer) for viewer in remote)
+        viewers.update((viewer["user_id"], viewer) for viewer in self._local_viewers(document_id))
+        await self.broadcast(document_id, "user_viewing", {"viewers": list(viewers.values())})
+
+    async def _announce(self, document_id: int, viewers: List[dict]) -> None:
+        if not settings.CACHE_INVALIDATION_PUBSUB:
+            return
+        # Publishing to Redis blocks
+        await run_in_threadpool(invalidation_bus.publish, "collaboration_presence", {
+            "origin": self.origin,
+            "document_id": document_id,
+            "viewers": viewers
+        })
+
+    def receive_presence(self, message: Dict[str, Any]) -> None:
+        """Viewers announced by another worker"""
+        if message["origin"] == self.origin:
+            return
+        document_id = message["document_id"]
+        with self._remote_lock:
+            workers = self.remote_viewers.setdefault(document_id, {})
+            if message["viewers"]:
+                workers[message["origin"]] = (time.monotonic(), message["viewers"])
+            else:
+                workers.pop(message["origin"], None)
+            cutoff = time.monotonic() - settings.WS_HEARTBEAT_TIMEOUT_SECONDS
+            for origin, (announced_at, _) in list(workers.items()):
+                if announced_at < cutoff:
+                    del workers[origin]
+            if not workers:
+                del self.remote_viewers[document_id]
+        if self.has_viewers(document_id):
+            self._on_loop(self._send_presence, document_id)
+
+    async def _expire_stale_viewers(self) -> None:
+        """Drop viewers whose heartbeats stopped, until no rooms are left"""
+        timeout = settings.WS_HEARTBEAT_TIMEOUT_SECONDS
+        while self.rooms:
+            await asyncio.sleep(timeout / 2)
+            cutoff = time.monotonic() - timeout
+            for document_id, room in list(self.rooms.items()):
+                stale = [websocket for websocket, viewer in room.items() if viewer.last_seen < cutoff]
+                for websocket in stale:
+                    room.pop(websocket, None)
+                    await self._close(websocket)
+                if not room:
+                    self.rooms.pop(document_id, None)
+                    await self._announce(document_id, [])
+                elif stale:
+                    await self.broadcast_presence(document_id)
+                else:
+                    # Refresh the announcement before other workers consider it stale
+                    await self._announce(document_id, self._local_viewers(document_id))
+
+collaboration_hub = CollaborationHub()
+invalidation_bus.register("collaboration_event", collaboration_hub.receive_event)
+invalidation_bus.register("collaboration_presence", collaboration_hub.receive_presence)
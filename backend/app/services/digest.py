@@ -0,0 +1,177 @@
+"""
+Digest engine for users on a daily or weekly notification schedule
+
+Queued digest items are collapsed into one notification (and email) per user.
+Users are processed in keyset-paginated batches so a run over thousands of
+users only issues a handful of queries per batch.
+
+Run from cron with:
+    python -m app.services.digest daily|weekly
+or set DIGEST_SCHEDULER_ENABLED on a single worker.
+"""
+
+import asyncio
+import json
+import logging
+import sys
+from datetime import datetime, timedelta
+from itertools import groupby
+from operator import attrgetter
+from typing import List, Optional
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.notification import (
+    Notification,
+    NotificationDigestItem,
+    NotificationType,
+    NotificationPriority
+)
+from app.models.user import User
+from app.services.mailer import enqueue_email
+from app.services.notifications import DIGEST_FREQUENCIES, wants_email
+
+logger = logging.getLogger(__name__)
+
+def build_digest(frequency: str, user_id: int, items: List[NotificationDigestItem]) -> Notification:
+    """Collapse a user's queued items into a single digest notification"""
+    limit = settings.DIGEST_MAX_ITEMS_IN_MESSAGE
+    lines = [f"- {item.title}" for item in items[:limit]]
+    if len(items) > limit:
+        lines.append(f"...and {len(items) - limit} more")
+
+    return Notification(
+        title=f"Your {frequency} digest",
+        message=f"You have {len(items)} new updates:\n" + "\n".join(lines),
+        type=NotificationType.system,
+        priority=NotificationPriority.low,
+        user_id=user_id,
+        extra_data=json.dumps({
+            "digest": frequency,
+            "items": [
+                {
+                    "title": item.title,
+                    "message": item.message,
+                    "type": item.type.value,
+                    "document_id": item.document_id,
+                    "created_at": item.created_at.isoformat() if item.created_at else None
+                }
+                for item in items
+            ]
+        })
+    )
+
+def run_digest(db: Session, frequency: str, batch_size: Optional[int] = None) -> int:
+    """
+    Deliver one digest per user for the given frequency.
+
+    Returns the number of digests created. Each batch is committed on its own,
+    so an interrupted run resumes with the users that were not processed yet.
+    """
+    if frequency not in DIGEST_FREQUENCIES:
+        raise ValueError(f"Unknown digest frequency: {frequency}")
+
+    batch_size = batch_size or settings.DIGEST_BATCH_SIZE
+
+    # Users who switched back to immediate delivery get their leftovers daily
+    frequencies = ("daily", "immediate") if frequency == "daily" else (frequency,)
+
+    # Items queued while the run is in progress wait for the next run
+    max_item_id = db.query(func.max(NotificationDigestItem.id)).scalar()
+    if max_item_id is None:
+        return 0
+
+    base_filter = (
+        NotificationDigestItem.frequency.in_(frequencies),
+        NotificationDigestItem.id <= max_item_id
+    )
+
+    delivered = 0
+    last_user_id = 0
+    while True:
+        user_ids = [
+            user_id for (user_id,) in db.query(NotificationDigestItem.user_id).filter(
+                *base_filter,
+                NotificationDigestItem.user_id > last_user_id
+            ).distinct().order_by(NotificationDigestItem.user_id).limit(batch_size)
+        ]
+        if not user_ids:
+            break
+
+        batch_filter = base_filter + (NotificationDigestItem.user_id.in_(user_ids),)
+        items = db.query(NotificationDigestItem).filter(*batch_filter).order_by(
+            NotificationDigestItem.user_id, NotificationDigestItem.id
+        ).all()
+
+        users = {}
+        if settings.EMAILS_ENABLED:
+            users = {user.id: user for user in db.query(User).filter(User.id.in_(user_ids))}
+
+        for user_id, user_items in groupby(items, key=attrgetter("user_id")):
+            user_items = list(user_items)
+            digest = build_digest(frequency, user_id, user_items)
+            db.add(digest)
+
+            # One digest email with the items the user wants by email
+            user = users.get(user_id)
+            if user is not None:
+                email_items = [item for item in user_items if wants_email(user, item.type)]
+                if email_items:
+                    enqueue_email(
+                        db,
+                        user.email,
+                        digest.title,
+                        "\n\n".join(f"{item.title}\n{item.message}" for item in email_items)
+                    )
+
+        db.query(NotificationDigestItem).filter(*batch_filter).delete(synchronize_session=False)
+        db.commit()
+
+        delivered += len(user_ids)
+        last_user_id = user_ids[-1]
+
+    logger.info("Delivered %d %s digests", delivered, frequency)
+    return delivered
+
+def next_run_time(now: datetime) -> datetime:
+    """Next daily digest time after now"""
+    run_at = now.replace(hour=settings.DIGEST_DAILY_HOUR_UTC, minute=0, second=0, microsecond=0)
+    if run_at <= now:
+        run_at += timedelta(days=1)
+    return run_at
+
+def run_scheduled_digests(run_at: datetime) -> None:
+    """Daily digests every day, weekly digests on the configured weekday"""
+    db = SessionLocal()
+    try:
+        run_digest(db, "daily")
+        if run_at.weekday() == settings.DIGEST_WEEKLY_DAY:
+            run_digest(db, "weekly")
+    finally:
+        db.close()
+
+async def run_digest_scheduler() -> None:
+    """Background loop that sleeps until the next digest time"""
+    while True:
+        run_at = next_run_time(datetime.utcnow())
+        await asyncio.sleep((run_at - datetime.utcnow()).total_seconds())
+        try:
+            await run_in_threadpool(run_scheduled_digests, run_at)
+        except Exception:
+            logger.exception("Digest run failed")
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2 or sys.argv[1] not in DIGEST_FREQUENCIES:
+        print("Usage: python -m app.services.digest daily|weekly")
+        sys.exit(1)
+
+    logging.basicConfig(level=settings.LOG_LEVEL)
+    session = SessionLocal()
+    try:
+        run_digest(session, sys.argv[1])
+    finally:
+        session.close()
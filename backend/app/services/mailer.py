@@ -0,0 +1,263 @@
+"""
+Outbound email delivery
+
+API handlers only add rows to the email outbox inside their own transaction.
+A background worker drains the outbox over a small pool of reused SMTP
+connections, sending consecutive messages on the same connection, retrying
+failures with exponential backoff and staying under a per-minute rate cap.
+
+For local testing point SMTP_HOST/SMTP_PORT at an in-process stand-in
+(e.g. ``python -m aiosmtpd -n -l localhost:1025``) with SMTP_TLS=false, or
+pass a ``connection_factory`` to ``EmailWorker``.
+"""
+
+import asyncio
+import logging
+import queue
+import smtplib
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from email.message import EmailMessage
+from email.utils import formataddr
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.email_outbox import EmailOutbox, EmailStatus
+
+logger = logging.getLogger(__name__)
+
+# The server refused one message (recipient, sender or content); the
+# connection stays usable for the rest of the chunk
+MESSAGE_ERRORS = (smtplib.SMTPRecipientsRefused, smtplib.SMTPResponseException)
+
+def enqueue_email(db: Session, to_address: str, subject: str, body: str) -> Optional[EmailOutbox]:
+    """
+    Queue an email for delivery.
+
+    The row is added to the session but not committed; the caller owns the
+    transaction. Returns None when email delivery is not configured.
+    """
+    if not settings.EMAILS_ENABLED or not to_address:
+        return None
+
+    email = EmailOutbox(
+        to_address=to_address,
+        subject=subject,
+        body=body,
+        status=EmailStatus.pending,
+        attempts=0,
+        next_attempt_at=datetime.utcnow()
+    )
+    db.add(email)
+    return email
+
+def create_smtp_connection() -> smtplib.SMTP:
+    """Open an authenticated SMTP connection using the configured server"""
+    connection = smtplib.SMTP(
+        settings.SMTP_HOST,
+        settings.SMTP_PORT or 25,
+        timeout=settings.SMTP_TIMEOUT
+    )
+    if settings.SMTP_TLS:
+        connection.starttls()
+    if settings.SMTP_USER:
+        connection.login(settings.SMTP_USER, settings.SMTP_PASSWORD or "")
+    return connection
+
+class SMTPConnectionPool:
+    """Small pool of reusable SMTP connections"""
+
+    def __init__(self, connection_factory: Callable[[], smtplib.SMTP], size: int):
+        self._connection_factory = connection_factory
+        self._idle: "queue.LifoQueue[smtplib.SMTP]" = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+
+    def _checkout(self) -> smtplib.SMTP:
+        while True:
+            try:
+                connection = self._idle.get_nowait()
+            except queue.Empty:
+                return self._connection_factory()
+            # Servers drop idle connections, make sure this one is still alive
+            try:
+                if connection.noop()[0] == 250:
+                    return connection
+            except (smtplib.SMTPException, OSError):
+                pass
+            self._close(connection)
+
+    @contextmanager
+    def connection(self) -> Iterator[smtplib.SMTP]:
+        self._slots.acquire()
+        connection = None
+        try:
+            connection = self._checkout()
+            yield connection
+        except BaseException:
+            # Whatever escaped the caller (a disconnect, a TLS error, a
+            # timeout mid-reply) may have left the session unusable
+            if connection is not None:
+                self._close(connection)
+                connection = None
+            raise
+        finally:
+            if connection is not None:
+                self._idle.put(connection)
+            self._slots.release()
+
+    @staticmethod
+    def _close(connection: smtplib.SMTP) -> None:
+        try:
+            connection.quit()
+        except Exception:
+            connection.close()
+
+    def close(self) -> None:
+        while True:
+            try:
+                self._close(self._idle.get_nowait())
+            except queue.Empty:
+                return
+
+class RateLimiter:
+    """Sliding one-minute window of sent messages"""
+
+    def __init__(self, per_minute: int):
+        self.per_minute = per_minute
+        self._sent: deque = deque()
+
+    def available(self) -> int:
+        cutoff = time.monotonic() - 60
+        while self._sent and self._sent[0] <= cutoff:
+            self._sent.popleft()
+        return max(self.per_minute - len(self._sent), 0)
+
+    def record(self, count: int) -> None:
+        now = time.monotonic()
+        self._sent.extend([now] * count)
+
+class EmailWorker:
+    """Drains the email outbox"""
+
+    def __init__(
+        self,
+        connection_factory: Callable[[], smtplib.SMTP] = create_smtp_connection,
+        pool_size: Optional[int] = None
+    ):
+        self.pool_size = pool_size or settings.SMTP_POOL_SIZE
+        self.pool = SMTPConnectionPool(connection_factory, self.pool_size)
+        self.rate_limiter = RateLimiter(settings.EMAIL_RATE_LIMIT_PER_MINUTE)
+        self._executor = ThreadPoolExecutor(max_workers=self.pool_size, thread_name_prefix="smtp")
+
+    @staticmethod
+    def build_message(email: EmailOutbox) -> EmailMessage:
+        message = EmailMessage()
+        message["From"] = formataddr((settings.EMAILS_FROM_NAME or "", settings.EMAILS_FROM_EMAIL))
+        message["To"] = email.to_address
+        message["Subject"] = email.subject
+        message.set_content(email.body)
+        return message
+
+    def _send_chunk(self, messages: List[Tuple[int, EmailMessage]]) -> Dict[int, Optional[str]]:
+        """
+        Send messages back to back on one pooled connection.
+
+        Returns an error (or None on success) per outbox id. Messages not
+        attempted because the connection broke are left out of the result.
+        """
+        results: Dict[int, Optional[str]] = {}
+        try:
+            with self.pool.connection() as connection:
+                for email_id, message in messages:
+                    try:
+                        connection.send_message(message)
+                        results[email_id] = None
+                    except MESSAGE_ERRORS as e:
+                        results[email_id] = str(e)
+        except (smtplib.SMTPException, OSError) as e:
+            # The connection broke or could not be opened (refused, DNS, login)
+            logger.warning("SMTP connection failed: %s", e)
+            for email_id, _ in messages:
+                if email_id not in results:
+                    results[email_id] = str(e)
+                    break
+        return results
+
+    def process_batch(self, db: Session) -> int:
+        """Send one batch of due emails, returns the number sent"""
+        budget = min(settings.EMAIL_BATCH_SIZE, self.rate_limiter.available())
+        if budget == 0:
+            return 0
+
+        now = datetime.utcnow()
+        emails = db.query(EmailOutbox).filter(
+            EmailOutbox.status == EmailStatus.pending,
+            EmailOutbox.next_attempt_at <= now
+        ).order_by(EmailOutbox.next_attempt_at, EmailOutbox.id).limit(budget).all()
+        if not emails:
+            return 0
+
+        # Spread the batch across the pooled connections
+        messages = [(email.id, self.build_message(email)) for email in emails]
+        chunks = [messages[i::self.pool_size] for i in range(self.pool_size)]
+        results: Dict[int, Optional[str]] = {}
+        for chunk_results in self._executor.map(self._send_chunk, [c for c in chunks if c]):
+            results.update(chunk_results)
+
+        sent = 0
+        now = datetime.utcnow()
+        for email in emails:
+            if email.id not in results:
+                continue
+            error = results[email.id]
+            email.attempts += 1
+            if error is None:
+                email.status = EmailStatus.sent
+                email.sent_at = now
+                email.last_error = None
+                sent += 1
+            elif email.attempts >= settings.EMAIL_MAX_ATTEMPTS:
+                email.status = EmailStatus.failed
+                email.last_error = error
+            else:
+                delay = settings.EMAIL_RETRY_BASE_SECONDS * 2 ** (email.attempts - 1)
+                email.next_attempt_at = now + timedelta(seconds=delay)
+                email.last_error = error
+        db.commit()
+
+        self.rate_limiter.record(len(results))
+        return sent
+
+    def run_once(self) -> int:
+        db = SessionLocal()
+        try:
+            return self.process_batch(db)
+        finally:
+            db.close()
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False)
+        self.pool.close()
+
+async def run_email_worker() -> None:
+    """Background loop that drains the outbox off the event loop"""
+    worker = EmailWorker()
+    try:
+        while True:
+            try:
+                sent = await run_in_threadpool(worker.run_once)
+            except Exception:
+                logger.exception("Email batch failed")
+                sent = 0
+            if not sent:
+                await asyncio.sleep(settings.EMAIL_POLL_INTERVAL_SECONDS)
+    finally:
+        worker.close()
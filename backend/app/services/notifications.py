@@ -0,0 +1,108 @@
+"""
+Notification delivery helpers
+
+Events are either stored as a notification right away or queued for the
+recipient's daily/weekly digest, depending on their notification settings.
+"""
+
+import json
+from typing import Any, Dict, Optional, Union
+
+from sqlalchemy.orm import Session
+
+from app.models.notification import (
+    Notification,
+    NotificationDigestItem,
+    NotificationType,
+    NotificationPriority
+)
+from app.models.user import User
+from app.services.mailer import enqueue_email
+
+DIGEST_FREQUENCIES = ("daily", "weekly")
+
+# High priority events always bypass the digest
+IMMEDIATE_PRIORITIES = (NotificationPriority.high, NotificationPriority.urgent)
+
+# NotificationSettings.email flag controlling each notification type
+EMAIL_SETTING_BY_TYPE = {
+    NotificationType.document_action: "document_approval",
+    NotificationType.approval_request: "document_approval",
+    NotificationType.comment: "comments",
+    NotificationType.deadline_reminder: "deadline_reminders",
+    NotificationType.system: "system_updates",
+}
+
+def get_delivery_frequency(user: User) -> str:
+    """Return the user's notification frequency (immediate, daily or weekly)"""
+    frequency = user.notification_settings_dict.get("frequency", "immediate")
+    return frequency if frequency in DIGEST_FREQUENCIES else "immediate"
+
+def wants_email(user: User, type: NotificationType) -> bool:
+    """Whether the user receives emails for this notification type"""
+    email_settings = user.notification_settings_dict.get("email")
+    if not isinstance(email_settings, dict):
+        return True
+    return bool(email_settings.get(EMAIL_SETTING_BY_TYPE[type], True))
+
+def notify_user(
+    db: Session,
+    user: User,
+    title: str,
+    message: str,
+    type: NotificationType,
+    priority: NotificationPriority = NotificationPriority.medium,
+    document_id: Optional[int] = None,
+    action_required: bool = False,
+    extra_data: Optional[Dict[str, Any]] = None
+) -> Union[Notification, NotificationDigestItem]:
+    """
+    Deliver an event to a user, honoring their notification frequency.
+
+    The new row is added to the session but not committed; the caller owns
+    the transaction.
+    """
+    frequency = get_delivery_frequency(user)
+
+    if frequency == "immediate" or priority in IMMEDIATE_PRIORITIES or action_required:
+        notification = Notification(
+            title=title,
+            message=message,
+            type=type,
+            priority=priority,
+            user_id=user.id,
+            document_id=document_id,
+            action_required=action_required,
+            extra_data=json.dumps(extra_data) if extra_data else None
+        )
+        db.add(notification)
+        if wants_email(user, type):
+            enqueue_email(db, user.email, title, message)
+        return notification
+
+    item = NotificationDigestItem(
+        user_id=user.id,
+        frequency=frequency,
+        title=title,
+        message=message,
+        type=type,
+        priority=priority,
+        document_id=document_id,
+        extra_data=json.dumps(extra_data) if extra_data else None
+    )
+    db.add(item)
+    return item
+
+def requeue_digest_items(db: Session, user_id: int, frequency: str) -> int:
+    """
+    Move a user's queued items to their new frequency.
+
+    Items of users who switched back to immediate delivery are flushed by the
+    next daily run.
+    """
+    if frequency not in DIGEST_FREQUENCIES:
+        frequency = "immediate"
+    return db.query(NotificationDigestItem).filter(
+        NotificationDigestItem.user_id == user_id,
+        NotificationDigestItem.frequency != frequency
+    ).update({"frequency": frequency}, synchronize_session=False)
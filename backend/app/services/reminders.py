@@ -0,0 +1,120 @@
+"""
+Deadline reminders for pending documents
+
+Each document records the most urgent offset it was reminded of, committed
+in the same transaction as the reminder, so a restart never re-sends one. A
+tick sends the most urgent offset a pending document has reached but not been
+reminded of yet: a document created or resubmitted inside an offset's window
+still gets that reminder, and a changed deadline starts over. The scan is a
+(status, deadline) index range of deadlines within the largest offset.
+
+Run from cron with:
+    python -m app.services.reminders
+or set DEADLINE_REMINDERS_ENABLED on a single worker.
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Optional, Set
+
+from sqlalchemy import or_
+from sqlalchemy.orm import Session, selectinload
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.document import Document, DocumentStatus
+from app.models.notification import NotificationType, NotificationPriority
+from app.services.notifications import notify_user
+
+logger = logging.getLogger(__name__)
+
+def reminder_priority(offset_hours: int) -> NotificationPriority:
+    if offset_hours <= 0:
+        return NotificationPriority.urgent
+    if offset_hours <= 24:
+        return NotificationPriority.high
+    return NotificationPriority.medium
+
+def send_reminder(db: Session, document: Document, offset_hours: int) -> None:
+    if offset_hours <= 0:
+        title = "Document Overdue"
+        message = f"{document.title} is past its deadline"
+    else:
+        title = "Document Deadline Approaching"
+        message = f"{document.title} is due in {offset_hours} hours"
+
+    notify_user(
+        db,
+        document.uploader,
+        title=title,
+        message=message,
+        type=NotificationType.deadline_reminder,
+        priority=reminder_priority(offset_hours),
+        document_id=document.id,
+        extra_data={
+            "deadline": document.deadline.isoformat(),
+            "offset_hours": offset_hours
+        }
+    )
+
+def run_deadline_reminders(db: Session, now: Optional[datetime] = None) -> int:
+    """
+    Send the reminders of offsets that pending documents reached and were not
+    reminded of yet.
+
+    Returns the number of reminders sent.
+    """
+    now = now or datetime.utcnow()
+
+    sent = 0
+    reminded: Set[int] = set()
+    # Most urgent offset first, so a document that reached several offsets
+    # since its last reminder only gets the most relevant one
+    for offset_hours in sorted(settings.DEADLINE_REMINDER_OFFSETS_HOURS):
+        documents = db.query(Document).options(
+            selectinload(Document.uploader)
+        ).filter(
+            Document.status == DocumentStatus.pending,
+            Document.deadline <= now + timedelta(hours=offset_hours),
+            or_(Document.reminded_offset_hours.is_(None), Document.reminded_offset_hours > offset_hours)
+        ).all()
+
+        due = [document for document in documents if document.id not in reminded]
+        for document in due:
+            send_reminder(db, document, offset_hours)
+            reminded.add(document.id)
+        if due:
+            # Bookkeeping, not an edit: keep row_version (If-Match) and updated_at
+            db.query(Document).filter(Document.id.in_([document.id for document in due])).update(
+                {Document.reminded_offset_hours: offset_hours, Document.updated_at: Document.updated_at},
+                synchronize_session=False
+            )
+            sent += len(due)
+
+    db.commit()
+
+    if sent:
+        logger.info("Sent %d deadline reminders", sent)
+    return sent
+
+def run_deadline_reminders_once() -> int:
+    db = SessionLocal()
+    try:
+        return run_deadline_reminders(db)
+    finally:
+        db.close()
+
+async def run_deadline_reminder_scheduler() -> None:
+    """Background loop that ticks every DEADLINE_REMINDER_INTERVAL_SECONDS"""
+    while True:
+        try:
+            await run_in_threadpool(run_deadline_reminders_once)
+        except Exception:
+            logger.exception("Deadline reminder run failed")
+        await asyncio.sleep(settings.DEADLINE_REMINDER_INTERVAL_SECONDS)
+
+if __name__ == "__main__":
+    logging.basicConfig(level=settings.LOG_LEVEL)
+    run_deadline_reminders_once()
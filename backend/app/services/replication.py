@@ -0,0 +1,71 @@
+"""
+Replica lag monitoring
+
+The primary's heartbeat row is bumped on every tick and read back from each
+replica; the difference between now and the replicated value is the lag.
+This works the same for Postgres streaming replicas and for anything else
+that copies the primary (e.g. two SQLite files in development), and unlike
+pg_last_xact_replay_timestamp() it does not grow while the primary is idle.
+
+A replica is unused until it has been measured, and again as soon as a
+measurement fails or exceeds REPLICA_MAX_LAG_SECONDS.
+
+Read-your-writes only holds across workers when they share recent writers
+over pub/sub, so check_replica_settings refuses to start without it.
+"""
+
+import asyncio
+import logging
+from datetime import datetime
+
+from sqlalchemy import select
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.database import SessionLocal, replica_set
+from app.models.replication import ReplicationHeartbeat
+
+logger = logging.getLogger(__name__)
+
+HEARTBEAT_ID = 1
+
+def check_replica_settings() -> None:
+    """Refuse replicas whose read-your-writes would only hold per worker"""
+    if replica_set.engines and not settings.CACHE_INVALIDATION_PUBSUB and not settings.REPLICA_SINGLE_WORKER:
+        raise RuntimeError(
+            "DATABASE_REPLICA_URLS needs CACHE_INVALIDATION_PUBSUB=true so a user's reads after a write "
+            "skip the replicas on every worker; set REPLICA_SINGLE_WORKER=true when running one worker"
+        )
+
+def record_heartbeat() -> None:
+    db = SessionLocal()
+    try:
+        db.merge(ReplicationHeartbeat(id=HEARTBEAT_ID, beat_at=datetime.utcnow()))
+        db.commit()
+    finally:
+        db.close()
+
+def measure_replica_lag() -> None:
+    for index, replica in enumerate(replica_set.engines):
+        try:
+            with replica.connect() as conn:
+                beat_at = conn.execute(
+                    select(ReplicationHeartbeat.beat_at).where(ReplicationHeartbeat.id == HEARTBEAT_ID)
+                ).scalar()
+        except Exception as e:
+            logger.warning("Could not read heartbeat from replica %d: %s", index, e)
+            beat_at = None
+        lag = (datetime.utcnow() - beat_at).total_seconds() if beat_at else None
+        if lag is not None and lag > settings.REPLICA_MAX_LAG_SECONDS:
+            logger.warning("Replica %d lags %.1fs, reading from the primary", index, lag)
+        replica_set.lag[index] = lag
+
+async def run_replica_monitor() -> None:
+    """Background loop measuring replica lag"""
+    while True:
+        try:
+            await run_in_threadpool(record_heartbeat)
+            await run_in_threadpool(measure_replica_lag)
+        except Exception:
+            logger.exception("Replica lag check failed")
+        await asyncio.sleep(settings.REPLICA_HEARTBEAT_SECONDS)
@@ -0,0 +1,155 @@
+"""
+Revoked access and refresh tokens
+
+Every token carries a ``jti`` (the token) and a ``sid`` (the login session it
+belongs to). Revocations are rows in ``token_revocations`` mirrored into
+in-memory hash sets, so checking a token is a couple of dict lookups:
+
+- logout revokes the session id, which covers the access and refresh tokens
+  of that login including ones obtained through refresh;
+- a used refresh token is revoked by its jti;
+- deactivating a user stores a cutoff, tokens of the user issued before it are
+  rejected.
+
+Revocations are applied immediately on the worker that made them, relayed to
+other workers over the invalidation bus, and every worker also pulls new rows
+every TOKEN_REVOCATION_SYNC_SECONDS so nothing depends on pub/sub. The pull
+goes by id, plus every row created within TOKEN_REVOCATION_SYNC_OVERLAP_SECONDS:
+a Postgres sequence hands out ids at insert time, so a row can commit after
+one with a higher id was already synced. Applying a row twice is harmless.
+Entries are dropped once the tokens they cover have expired.
+
+The list is loaded at startup; is_revoked only falls back to loading it
+itself (a blocking query) outside the app, e.g. in scripts.
+"""
+
+import asyncio
+import calendar
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.core.cache import invalidation_bus
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.token_revocation import TokenRevocation
+
+logger = logging.getLogger(__name__)
+
+def _epoch(value: datetime) -> float:
+    return calendar.timegm(value.utctimetuple())
+
+class RevocationList:
+    def __init__(self):
+        self.token_ids: Dict[str, float] = {}  # jti/sid -> expiry
+        self.user_cutoffs: Dict[int, tuple] = {}  # user id -> (revoked_before, expiry)
+        self._last_id = 0
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def is_revoked(self, payload: Dict[str, Any]) -> bool:
+        if not self._loaded:
+            self.sync()
+        if payload.get("jti") in self.token_ids or payload.get("sid") in self.token_ids:
+            return True
+        cutoff = self.user_cutoffs.get(int(payload["sub"]))
+        return cutoff is not None and payload.get("iat", 0) < cutoff[0]
+
+    def apply(self, entry: Dict[str, Any]) -> None:
+        """Add a revocation; idempotent, so rows may be applied again"""
+        if entry.get("token_id"):
+            self.token_ids[entry["token_id"]] = entry["expires_at"]
+        if entry.get("user_id") is not None:
+            current = self.user_cutoffs.get(entry["user_id"])
+            if current is None or current[0] < entry["revoked_before"]:
+                self.user_cutoffs[entry["user_id"]] = (entry["revoked_before"], entry["expires_at"])
+
+    def prune(self, now: float) -> None:
+        for token_id, expires_at in list(self.token_ids.items()):
+            if expires_at <= now:
+                self.token_ids.pop(token_id, None)
+        for user_id, (_, expires_at) in list(self.user_cutoffs.items()):
+            if expires_at <= now:
+                self.user_cutoffs.pop(user_id, None)
+
+    def sync(self, db: Optional[Session] = None) -> None:
+        """Pull revocations added since the last sync, and re-read the recent ones"""
+        with self._lock:
+            own_session = db is None
+            db = db or SessionLocal()
+            try:
+                now = datetime.utcnow()
+                overlap_start = now - timedelta(seconds=settings.TOKEN_REVOCATION_SYNC_OVERLAP_SECONDS)
+                rows = db.query(TokenRevocation).filter(
+                    or_(TokenRevocation.id > self._last_id, TokenRevocation.created_at >= overlap_start),
+                    TokenRevocation.expires_at > now
+                ).order_by(TokenRevocation.id).all()
+                for row in rows:
+                    self.apply(_entry(row))
+                    self._last_id = max(self._last_id, row.id)
+                self._loaded = True
+            finally:
+                if own_session:
+                    db.close()
+            self.prune(time.time())
+
+revocation_list = RevocationList()
+invalidation_bus.register("token_revocation", revocation_list.apply)
+
+def _entry(row: TokenRevocation) -> Dict[str, Any]:
+    return {
+        "token_id": row.token_id,
+        "user_id": row.user_id,
+        "revoked_before": _epoch(row.revoked_before) if row.revoked_before else None,
+        "expires_at": _epoch(row.expires_at)
+    }
+
+def _store(db: Session, row: TokenRevocation) -> None:
+    db.add(row)
+    db.commit()
+    invalidation_bus.publish("token_revocation", _entry(row))
+
+def revoke_token_id(db: Session, token_id: str, expires_at: datetime) -> None:
+    """Revoke a token (jti) or a whole login session (sid) until expires_at"""
+    _store(db, TokenRevocation(token_id=token_id, expires_at=expires_at))
+
+def revoke_user_tokens(db: Session, user_id: int) -> None:
+    """Revoke every token issued to the user so far"""
+    now = datetime.utcnow()
+    # iat has second precision, round up so tokens from this second are covered
+    revoked_before = now.replace(microsecond=0) + timedelta(seconds=1)
+    _store(db, TokenRevocation(
+        user_id=user_id,
+        revoked_before=revoked_before,
+        expires_at=now + timedelta(minutes=settings.REFRESH_TOKEN_EXPIRE_MINUTES)
+    ))
+
+def purge_expired_revocations(db: Session) -> int:
+    deleted = db.query(TokenRevocation).filter(
+        TokenRevocation.expires_at <= datetime.utcnow()
+    ).delete(synchronize_session=False)
+    db.commit()
+    return deleted
+
+def sync_revocations_once() -> None:
+    db = SessionLocal()
+    try:
+        revocation_list.sync(db)
+        purge_expired_revocations(db)
+    finally:
+        db.close()
+
+async def run_revocation_sync() -> None:
+    """Background loop keeping this worker's revocation list current"""
+    while True:
+        try:
+            await run_in_threadpool(sync_revocations_once)
+        except Exception:
+            logger.exception("Token revocation sync failed")
+        await asyncio.sleep(settings.TOKEN_REVOCATION_SYNC_SECONDS)
@@ -0,0 +1,242 @@
+"""
+Bulk user import
+
+Rows are validated with the UserCreate schema, checked for duplicates within
+the file and against the database with one query for usernames and one for
+emails, then the passwords are hashed across a process pool and all valid
+users are inserted with a single executemany. Invalid rows are reported and
+skipped, they never abort the import.
+
+Hashing takes seconds, so a concurrent import or create_user can take a
+username or email after the check. The insert then fails as a whole; the
+rows are checked again, the conflicting ones reported and the rest inserted.
+
+The worker processes are started by the first large import and kept for
+later ones: each spawned process imports the app before it can hash.
+"""
+
+import csv
+import io
+import json
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, List, Optional, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.security import get_password_hash
+from app.models.user import User
+from app.schemas.user import UserCreate
+
+logger = logging.getLogger(__name__)
+
+# Below this many passwords, handing them to worker processes costs more than it saves
+PROCESS_POOL_MIN_PASSWORDS = 8
+# Inserts retried after losing a race for a username or email
+INSERT_ATTEMPTS = 3
+
+_hash_pool: Optional[ProcessPoolExecutor] = None
+_hash_pool_lock = threading.Lock()
+
+class ImportFileError(ValueError):
+    """The uploaded file could not be parsed"""
+
+def parse_import_file(filename: str, content: bytes) -> List[Dict[str, Any]]:
+    """Rows of a CSV (header row required) or JSON (list of objects) file"""
+    try:
+        text = content.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise ImportFileError("File must be UTF-8 encoded")
+
+    if filename.lower().endswith(".json"):
+        try:
+            data = json.loads(text)
+        except json.JSONDecodeError as e:
+            raise ImportFileError(f"Invalid JSON: {e}")
+        if isinstance(data, dict):
+            data = data.get("users")
+        if not isinstance(data, list):
+            raise ImportFileError("JSON must be a list of user objects")
+        return data
+
+    if filename.lower().endswith(".csv"):
+        rows = []
+        for row in csv.DictReader(io.StringIO(text)):
+            # Empty cells fall back to the schema defaults
+            row = {key.strip(): value.strip() for key, value in row.items() if key and value and value.strip()}
+            if "permissions" in row:
+                row["permissions"] = [p.strip() for p in row["permissions"].split(";") if p.strip()]
+            rows.append(row)
+        return rows
+
+    raise ImportFileError("Only .csv and .json files are supported")
+
+def hash_pool_size() -> int:
+    return settings.PASSWORD_HASH_PROCESSES or os.cpu_count() or 1
+
+def get_hash_pool() -> ProcessPoolExecutor:
+    """The worker processes for bulk hashing, started on first use"""
+    global _hash_pool
+    with _hash_pool_lock:
+        if _hash_pool is None:
+            # spawn: forking a process that runs threads (the server) is not safe
+            _hash_pool = ProcessPoolExecutor(
+                max_workers=hash_pool_size(),
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return _hash_pool
+
+def shutdown_hash_pool() -> None:
+    global _hash_pool
+    with _hash_pool_lock:
+        pool, _hash_pool = _hash_pool, None
+    if pool is not None:
+        pool.shutdown(cancel_futures=True)
+
+def hash_passwords(passwords: List[str]) -> List[str]:
+    """Hash passwords in parallel, preserving order"""
+    if len(passwords) < PROCESS_POOL_MIN_PASSWORDS:
+        return [get_password_hash(password) for password in passwords]
+
+    chunksize = max(1, len(passwords) // (hash_pool_size() * 4))
+    try:
+        return list(get_hash_pool().map(get_password_hash, passwords, chunksize=chunksize))
+    except BrokenProcessPool:
+        # A worker died; the next import starts a new pool
+        shutdown_hash_pool()
+        raise
+
+def _error_messages(error: ValidationError) -> List[str]:
+    return [
+        f"{'.'.join(str(part) for part in e['loc'])}: {e['msg']}" if e["loc"] else e["msg"]
+        for e in error.errors()
+    ]
+
+def _without_taken(db: Session, rows: List[Tuple[Dict[str, Any], UserCreate]]) -> List[Tuple[Dict[str, Any], UserCreate]]:
+    """Rows whose username and email are free, with errors added to the others; one query per column"""
+    if not rows:
+        return []
+    taken_usernames = {
+        username for (username,) in
+        db.query(User.username).filter(User.username.in_([u.username for _, u in rows]))
+    }
+    taken_emails = {
+        email for (email,) in
+        db.query(User.email).filter(User.email.in_([u.email for _, u in rows]))
+    }
+
+    free = []
+    for entry, user_data in rows:
+        if user_data.username in taken_usernames:
+            entry["errors"].append("Username already registered")
+        if user_data.email in taken_emails:
+            entry["errors"].append("Email already registered")
+        if not entry["errors"]:
+            free.append((entry, user_data))
+    return free
+
+def _insert_users(db: Session, users: List[Tuple[UserCreate, str]]) -> Dict[str, int]:
+    """Insert and commit users with their password hashes; returns user ids by username"""
+    if not users:
+        return {}
+    result = db.execute(
+        insert(User).returning(User.id, User.username),
+        [
+            {
+                "username": user_data.username,
+                "email": user_data.email,
+                "hashed_password": hashed_password,
+                "full_name": user_data.full_name,
+                "role": user_data.role,
+                "department": user_data.department,
+                "language_preference": user_data.language_preference,
+                "is_active": user_data.is_active,
+                "permissions": json.dumps(user_data.permissions or [])
+            }
+            for user_data, hashed_password in users
+        ]
+    )
+    user_ids = {username: user_id for user_id, username in result}
+    db.commit()
+    return user_ids
+
+def import_users(db: Session, rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Create the valid rows as users and return a per-row report"""
+    report = [
+        {
+            "row": index,
+            "username": row.get("username") if isinstance(row, dict) else None,
+            "status": "error",
+            "errors": [],
+            "user_id": None
+        }
+        for index, row in enumerate(rows, start=1)
+    ]
+
+    # Validate every row
+    candidates = []
+    for entry, row in zip(report, rows):
+        if not isinstance(row, dict):
+            entry["errors"] = ["Row must be an object"]
+            continue
+        try:
+            candidates.append((entry, UserCreate(**row)))
+        except ValidationError as e:
+            entry["errors"] = _error_messages(e)
+
+    # Duplicates within the file: the first occurrence wins
+    seen_usernames, seen_emails = set(), set()
+    unique = []
+    for entry, user_data in candidates:
+        if user_data.username in seen_usernames:
+            entry["errors"].append("Duplicate username in file")
+        if user_data.email in seen_emails:
+            entry["errors"].append("Duplicate email in file")
+        seen_usernames.add(user_data.username)
+        seen_emails.add(user_data.email)
+        if not entry["errors"]:
+            unique.append((entry, user_data))
+
+    valid = _without_taken(db, unique)
+    # Give the connection back to the pool while hashing
+    db.rollback()
+
+    if valid:
+        # Usernames are unique within the file by now
+        hashes = dict(zip(
+            (user_data.username for _, user_data in valid),
+            hash_passwords([user_data.password for _, user_data in valid])
+        ))
+        for _ in range(INSERT_ATTEMPTS):
+            try:
+                user_ids = _insert_users(db, [(user_data, hashes[user_data.username]) for _, user_data in valid])
+            except IntegrityError as e:
+                # Someone took a username or email since the check
+                db.rollback()
+                logger.info("User import conflicted with a concurrent insert: %s", e.orig)
+                valid = _without_taken(db, valid)
+                db.rollback()
+                continue
+            for entry, user_data in valid:
+                entry["status"] = "created"
+                entry["user_id"] = user_ids.get(user_data.username)
+            break
+        else:
+            for entry, _ in valid:
+                entry["errors"].append("Conflicted with concurrent imports, import the row again")
+
+    created = sum(1 for entry in report if entry["status"] == "created")
+    return {
+        "total": len(report),
+        "created": created,
+        "failed": len(report) - created,
+        "rows": report
+    }
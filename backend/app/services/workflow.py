@@ -0,0 +1,89 @@
+"""
+Document workflow transitions
+
+transition() checks an action against the state machine below and adds the
+status change, its history entry and the owner's notification to the
+session. Nothing is committed here: the caller commits once, so a transition
+is either fully recorded or not at all.
+"""
+
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, FrozenSet, Optional
+
+from sqlalchemy.orm import Session
+
+from app.models.document import Document, DocumentStatus, WorkflowHistory
+from app.models.notification import NotificationType, NotificationPriority
+from app.models.user import User
+from app.services.notifications import notify_user
+
+@dataclass(frozen=True)
+class Transition:
+    sources: FrozenSet[DocumentStatus]
+    target: DocumentStatus
+    # Notification for the uploader, formatted with the document title
+    notify_title: Optional[str] = None
+    notify_message: Optional[str] = None
+
+# A document sent back for revision is a draft again and can be decided directly
+TRANSITIONS: Dict[str, Transition] = {
+    "approve": Transition(
+        frozenset({DocumentStatus.pending, DocumentStatus.draft}),
+        DocumentStatus.approved
+    ),
+    "reject": Transition(
+        frozenset({DocumentStatus.pending, DocumentStatus.draft}),
+        DocumentStatus.rejected
+    ),
+    "request_revision": Transition(
+        frozenset({DocumentStatus.pending, DocumentStatus.approved, DocumentStatus.rejected}),
+        DocumentStatus.draft,
+        notify_title="Document Revision Requested",
+        notify_message="Revision requested for {title}"
+    ),
+}
+
+class InvalidTransition(ValueError):
+    """The action is not allowed from the document's current status"""
+
+def transition(
+    db: Session,
+    document: Document,
+    action: str,
+    user: User,
+    comments: Optional[str] = None
+) -> WorkflowHistory:
+    """Apply a workflow action to a document; returns the (uncommitted) history entry"""
+    rule = TRANSITIONS[action]
+    previous_status = document.status
+    if previous_status not in rule.sources:
+        raise InvalidTransition(f"Cannot {action.replace('_', ' ')} a document that is {previous_status.value}")
+
+    document.status = rule.target
+    if rule.target == DocumentStatus.approved:
+        document.approved_by = user.id
+        document.approved_at = datetime.utcnow()
+
+    workflow_entry = WorkflowHistory(
+        document_id=document.id,
+        user_id=user.id,
+        action=action,
+        comments=comments,
+        previous_status=previous_status.value,
+        new_status=rule.target.value
+    )
+    db.add(workflow_entry)
+
+    if rule.notify_title:
+        notify_user(
+            db,
+            document.uploader,
+            title=rule.notify_title,
+            message=rule.notify_message.format(title=document.title),
+            type=NotificationType.document_action,
+            priority=NotificationPriority.high,
+            document_id=document.id
+        )
+
+    return workflow_entry
@@ -0,0 +1,434 @@
+#!/usr/bin/env python3
+"""
+HTTP load test with recorded baselines
+
+Virtual users log in together (a login burst), then each loops over weighted
+scenarios until --duration is over:
+
+  list 30, view 20, search 12, dashboard overview 10, notifications 8,
+  comments 8, comment 4, dashboard analytics 3, login 3, approve 2
+
+Users view documents they saw in earlier lists, send If-None-Match with the
+ETags they got (like the browser cache), and only admins and executives
+approve. Requests in the first --warmup seconds are not counted. The report
+has throughput, p50/p95/p99 latency and error counts per route; latency and
+throughput only count successful (2xx/3xx) responses, so fast failures
+cannot make a route look better.
+
+--save writes the report as JSON; --compare checks a run against such a
+file and exits with 1 when a route's p95 is more than --tolerance slower or
+its throughput that much lower, when its error rate rises by more than
+--error-tolerance, or when a baseline route is missing or got fewer than
+half of --min-requests requests. Routes with fewer than --min-requests
+requests in either run are otherwise shown but not judged. Compare runs
+with the same settings, data and machine.
+
+Run against a database filled by generate_synthetic_data.py; approvals and
+comments modify it, so load a copy of a snapshot:
+
+    python generate_synthetic_data.py --sqlite-snapshot snapshots/100k.db
+    cp snapshots/100k.db loadtest.db
+    SQLITE_DB_PATH=loadtest.db python benchmarks/loadtest.py --start --save benchmarks/baselines/100k.json
+    cp snapshots/100k.db loadtest.db
+    SQLITE_DB_PATH=loadtest.db python benchmarks/loadtest.py --start --compare benchmarks/baselines/100k.json
+
+--start runs `uvicorn main:app` with the current environment; without it
+the app at --base-url is used (SQLite or a local Postgres alike). All virtual
+users log in from one address, so --start lifts the LOGIN_* throttling limits
+(raise them on a --base-url target too); the run stops if any user cannot
+log in during the initial burst.
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+API = "/api/v1"
+
+SCENARIO_WEIGHTS = {
+    "list": 30,
+    "view": 20,
+    "search": 12,
+    "dashboard_overview": 10,
+    "notifications": 8,
+    "comments": 8,
+    "comment": 4,
+    "dashboard_analytics": 3,
+    "login": 3,
+    "approve": 2,
+}
+SEARCH_TERMS = ["Aluva", "Inspection", "Budget", "Safety", "Vyttila", "Escalator", "Audit", "Roster", "vendor", "Training"]
+STATUSES = ["pending", "approved", "draft", "rejected"]
+DEPARTMENTS = ["engineering", "operations", "legal_compliance", "finance", "management", "general"]
+APPROVER_ROLES = ("admin", "executive")
+SEEN_DOCUMENTS = 200
+
+def succeeded(status: str) -> bool:
+    """2xx and 3xx (304 from the ETags) responses; transport errors are named after their exception"""
+    return status[0] in "23"
+
+class Stats:
+    """Latencies of successful requests and status codes per route"""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.statuses: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        self.recording = False
+
+    def record(self, route: str, seconds: float, status: str) -> None:
+        if self.recording:
+            if succeeded(status):
+                self.latencies[route].append(seconds)
+            self.statuses[route][status] += 1
+
+def percentile_ms(values: List[float], fraction: float) -> Optional[float]:
+    """Nearest-rank percentile of sorted values in milliseconds, None without values"""
+    if not values:
+        return None
+    return round(values[max(0, math.ceil(fraction * len(values)) - 1)] * 1000, 2)
+
+def summarize(stats: Stats, seconds: float) -> Dict[str, dict]:
+    routes = {}
+    for route, statuses in sorted(stats.statuses.items()):
+        latencies = sorted(stats.latencies.get(route, []))
+        requests = sum(statuses.values())
+        routes[route] = {
+            "requests": requests,
+            "throughput": round(len(latencies) / seconds, 2),
+            "p50_ms": percentile_ms(latencies, 0.50),
+            "p95_ms": percentile_ms(latencies, 0.95),
+            "p99_ms": percentile_ms(latencies, 0.99),
+            "max_ms": percentile_ms(latencies, 1.0),
+            "client_errors": sum(n for code, n in statuses.items() if code.startswith("4")),
+            "errors": sum(n for code, n in statuses.items() if code[0] not in "234"),
+            "error_rate": round((requests - len(latencies)) / requests, 4),
+            "statuses": dict(statuses),
+        }
+    return routes
+
+class VirtualUser:
+    def __init__(self, client: httpx.AsyncClient, stats: Stats, username: str, password: str, approver: bool, seed: str):
+        self.client = client
+        self.stats = stats
+        self.username = username
+        self.password = password
+        self.approver = approver
+        self.rng = random.Random(seed)
+        self.headers: Dict[str, str] = {}
+        self.etags: Dict[str, str] = {}
+        self.seen: List[int] = []
+
+    async def request(self, route: str, method: str, url: str, conditional: bool = False, **kwargs) -> Optional[httpx.Response]:
+        headers = dict(self.headers)
+        if conditional and url in self.etags:
+            headers["If-None-Match"] = self.etags[url]
+        started = time.perf_counter()
+        try:
+            response = await self.client.request(method, url, headers=headers, **kwargs)
+        except httpx.HTTPError as e:
+            self.stats.record(route, time.perf_counter() - started, type(e).__name__)
+            return None
+        self.stats.record(route, time.perf_counter() - started, str(response.status_code))
+        if conditional and "etag" in response.headers:
+            self.etags[url] = response.headers["etag"]
+        return response
+
+    def remember(self, response: Optional[httpx.Response]) -> None:
+        """Keep ids of listed documents to view later"""
+        if response is not None and response.status_code == 200:
+            self.seen.extend(document["id"] for document in response.json()["documents"])
+            del self.seen[:-SEEN_DOCUMENTS]
+
+    async def login(self, route: str = "POST /auth/login") -> None:
+        response = await self.request(
+            route, "POST", f"{API}/auth/login",
+            data={"username": self.username, "password": self.password}
+        )
+        if response is not None and response.status_code == 200:
+            self.headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    async def list(self) -> None:
+        params = {"page": 1 if self.rng.random() < 0.7 else self.rng.randint(2, 20)}
+        if self.rng.random() < 0.3:
+            params["status"] = self.rng.choice(STATUSES)
+        if self.rng.random() < 0.2:
+            params["department"] = self.rng.choice(DEPARTMENTS)
+        url = str(httpx.URL(f"{API}/documents/", params=params))
+        self.remember(await self.request("GET /documents/", "GET", url, conditional=True))
+
+    async def search(self) -> None:
+        url = str(httpx.URL(f"{API}/documents/", params={"search": self.rng.choice(SEARCH_TERMS)}))
+        self.remember(await self.request("GET /documents/?search", "GET", url, conditional=True))
+
+    async def view(self) -> None:
+        if not self.seen:
+            return await self.list()
+        await self.request("GET /documents/{id}", "GET", f"{API}/documents/{self.rng.choice(self.seen)}", conditional=True)
+
+    async def comments(self) -> None:
+        if not self.seen:
+            return await self.list()
+        await self.request("GET /documents/{id}/comments", "GET", f"{API}/documents/{self.rng.choice(self.seen)}/comments")
+
+    async def comment(self) -> None:
+        if not self.seen:
+            return await self.list()
+        await self.request(
+            "POST /documents/{id}/comments", "POST", f"{API}/documents/{self.rng.choice(self.seen)}/comments",
+            json={"content": "Checked during the load test.", "page_number": self.rng.randint(1, 10)}
+        )
+
+    async def approve(self) -> None:
+        if not self.approver:
+            return await self.view()
+        response = await self.request(
+            "GET /documents/?status=pending", "GET", f"{API}/documents/?status=pending&limit=50"
+        )
+        if response is None or response.status_code != 200 or not response.json()["documents"]:
+            return
+        document = self.rng.choice(response.json()["documents"])
+        await self.request(
+            "POST /documents/{id}/approve", "POST", f"{API}/documents/{document['id']}/approve",
+            json={"action": "approve", "comments": "Approved during the load test"}
+        )
+
+    async def dashboard_overview(self) -> None:
+        await self.request("GET /dashboard/overview", "GET", f"{API}/dashboard/overview", conditional=True)
+
+    async def dashboard_analytics(self) -> None:
+        await self.request("GET /dashboard/analytics", "GET", f"{API}/dashboard/analytics", conditional=True)
+
+    async def notifications(self) -> None:
+        await self.request("GET /notifications/", "GET", f"{API}/notifications/", conditional=True)
+
+    async def run(self, deadline: float, think_time: float) -> None:
+        scenarios = list(SCENARIO_WEIGHTS)
+        weights = list(SCENARIO_WEIGHTS.values())
+        while time.perf_counter() < deadline:
+            await getattr(self, self.rng.choices(scenarios, weights)[0])()
+            if think_time:
+                await asyncio.sleep(self.rng.expovariate(1 / think_time))
+
+async def discover_users(client: httpx.AsyncClient, admin: str, password: str) -> Dict[str, List[str]]:
+    """Usernames by role, read with the admin account"""
+    response = await client.post(f"{API}/auth/login", data={"username": admin, "password": password})
+    response.raise_for_status()
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+    users = defaultdict(list)
+    for role in ("admin", "executive", "maintenance", "compliance", "finance", "user"):
+        response = await client.get(f"{API}/users/", params={"role": role, "limit": 100}, headers=headers)
+        response.raise_for_status()
+        users[role] = [user["username"] for user in response.json() if user["is_active"]]
+    return users
+
+async def run_load(args) -> Dict[str, dict]:
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=args.timeout) as client:
+        users = await discover_users(client, args.admin, args.password)
+        approvers = [name for role in APPROVER_ROLES for name in users[role]]
+        others = [name for role, names in users.items() if role not in APPROVER_ROLES for name in names]
+        rng = random.Random(args.seed)
+        stats = Stats()
+        virtual_users = []
+        for index in range(args.concurrency):
+            # About one in ten users can approve
+            approver = bool(approvers) and (not others or rng.random() < 0.1)
+            username = rng.choice(approvers if approver else others)
+            virtual_users.append(VirtualUser(client, stats, username, args.password, approver, f"{args.seed}:{index}"))
+
+        # Everyone logs in at once, as at a shift change
+        stats.recording = True
+        await asyncio.gather(*(user.login("POST /auth/login (burst)") for user in virtual_users))
+        stats.recording = args.warmup <= 0
+        failed = [user.username for user in virtual_users if not user.headers]
+        if failed:
+            # Users without a token would only measure 401s for the rest of the run
+            statuses = dict(stats.statuses["POST /auth/login (burst)"])
+            raise SystemExit(f"{len(failed)} of {len(virtual_users)} users could not log in ({statuses}), e.g. {failed[0]}")
+
+        started = time.perf_counter()
+        deadline = started + args.warmup + args.duration
+
+        async def start_recording():
+            await asyncio.sleep(args.warmup)
+            stats.recording = True
+
+        recorder = asyncio.create_task(start_recording()) if args.warmup > 0 else None
+        await asyncio.gather(*(user.run(deadline, args.think_time) for user in virtual_users))
+        if recorder is not None:
+            await recorder
+        return summarize(stats, args.duration)
+
+def ms(value: Optional[float], width: int) -> str:
+    return f"{value:>{width}.1f}" if value is not None else f"{'-':>{width}}"
+
+def print_report(routes: Dict[str, dict]) -> None:
+    print(f"{'route':<34} {'requests':>8} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'4xx':>5} {'errors':>6}")
+    for route, row in routes.items():
+        print(
+            f"{route:<34} {row['requests']:>8} {row['throughput']:>8.1f} {ms(row['p50_ms'], 8)}"
+            f" {ms(row['p95_ms'], 8)} {ms(row['p99_ms'], 8)} {row['client_errors']:>5} {row['errors']:>6}"
+        )
+    total = sum(row["requests"] for row in routes.values())
+    print(f"{'total':<34} {total:>8} {sum(row['throughput'] for row in routes.values()):>8.1f}")
+
+def compare(
+    routes: Dict[str, dict],
+    baseline: Dict[str, dict],
+    tolerance: float,
+    error_tolerance: float,
+    min_requests: int
+) -> bool:
+    """Print the change per route against a baseline, True if none regressed"""
+    ok = True
+    print(
+        f"\n{'route':<34} {'p95 base':>9} {'p95 now':>9} {'change':>8} {'req/s base':>10} {'req/s now':>10}"
+        f" {'err base':>8} {'err now':>8}"
+    )
+    for route in sorted(baseline.keys() | routes.keys()):
+        row, base = routes.get(route), baseline.get(route)
+        if base is None:
+            print(f"{route:<34} {'(new)':>9}")
+            continue
+        if row is None:
+            # A route the run no longer exercises would hide its regressions
+            judged = base["requests"] >= min_requests
+            flag = "REGRESSION (missing from this run)" if judged else "(missing, too few requests to judge)"
+            print(f"{route:<34} {ms(base['p95_ms'], 9)} {'-':>9}  {flag}")
+            ok = ok and not judged
+            continue
+
+        if row["p95_ms"] is not None and base["p95_ms"]:
+            p95_change = row["p95_ms"] / base["p95_ms"] - 1
+        else:
+            p95_change = 0.0
+        if row["requests"] < min_requests / 2 and base["requests"] >= min_requests:
+            flag = f"  REGRESSION (only {row['requests']} requests)"
+        elif min(row["requests"], base["requests"]) < min_requests:
+            flag = "  (too few requests to judge)"
+        elif row["error_rate"] > base["error_rate"] + error_tolerance:
+            flag = "  REGRESSION (error rate)"
+        elif row["p95_ms"] is None or p95_change > tolerance or row["throughput"] < base["throughput"] * (1 - tolerance):
+            flag = "  REGRESSION"
+        else:
+            flag = ""
+        ok = ok and "REGRESSION" not in flag
+        print(
+            f"{route:<34} {ms(base['p95_ms'], 9)} {ms(row['p95_ms'], 9)} {p95_change:>+8.0%}"
+            f" {base['throughput']:>10.1f} {row['throughput']:>10.1f}"
+            f" {base['error_rate']:>8.1%} {row['error_rate']:>8.1%}{flag}"
+        )
+    return ok
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def start_app(workers: int, timeout: float = 60) -> Tuple[subprocess.Popen, str]:
+    """Start uvicorn on a free port and wait for /health, returns the process and its URL"""
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    env = dict(os.environ)
+    # Logging every request's queries would skew the numbers, unless asked for
+    env.setdefault("SQL_INSTRUMENTATION_ENABLED", "false")
+    # Every virtual user logs in from 127.0.0.1; measure bcrypt, not 429s
+    for name in ("LOGIN_IP_BURST", "LOGIN_IP_PER_MINUTE", "LOGIN_USERNAME_BURST", "LOGIN_USERNAME_PER_MINUTE"):
+        env.setdefault(name, "1000000")
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env
+    )
+    started = time.perf_counter()
+    while time.perf_counter() - started < timeout:
+        if process.poll() is not None:
+            raise RuntimeError(f"uvicorn exited with {process.returncode}")
+        try:
+            if httpx.get(f"{base_url}/health").status_code == 200:
+                return process, base_url
+        except httpx.HTTPError:
+            time.sleep(0.1)
+    process.terminate()
+    raise RuntimeError("app did not become ready")
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--start", action="store_true", help="Start uvicorn main:app for the run")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers with --start")
+    parser.add_argument("--concurrency", type=int, default=20, help="Virtual users")
+    parser.add_argument("--duration", type=float, default=60, help="Measured seconds")
+    parser.add_argument("--warmup", type=float, default=5, help="Seconds before measuring")
+    parser.add_argument("--think-time", type=float, default=0, help="Mean pause between a user's requests")
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--admin", default="admin", help="Account used to find users to log in as")
+    parser.add_argument("--password", default="demo123", help="Password of every user")
+    parser.add_argument("--save", metavar="JSON", help="Write the results as a baseline")
+    parser.add_argument("--compare", metavar="JSON", help="Compare with a baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed p95/throughput change vs the baseline")
+    parser.add_argument(
+        "--error-tolerance", type=float, default=0.01,
+        help="Allowed rise of a route's error rate vs the baseline (0.01 = one percentage point)"
+    )
+    parser.add_argument(
+        "--min-requests", type=int, default=30,
+        help="Routes with fewer requests are not judged, a baseline route with fewer than half as many fails"
+    )
+    args = parser.parse_args()
+
+    process = None
+    if args.start:
+        process, args.base_url = start_app(args.workers)
+    try:
+        routes = asyncio.run(run_load(args))
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+    print(f"{args.concurrency} users for {args.duration:.0f}s against {args.base_url}\n")
+    print_report(routes)
+    if args.save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save)), exist_ok=True)
+        with open(args.save, "w") as f:
+            json.dump({
+                "recorded_at": datetime.utcnow().isoformat(timespec="seconds"),
+                "revision": git_revision(),
+                "settings": {
+                    "concurrency": args.concurrency, "duration": args.duration, "warmup": args.warmup,
+                    "think_time": args.think_time, "seed": args.seed, "workers": args.workers
+                },
+                "routes": routes,
+            }, f, indent=2)
+        print(f"\nSaved {args.save}")
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if not compare(routes, baseline["routes"], args.tolerance, args.error_tolerance, args.min_requests):
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,28 @@
+"""
+Token verification and the current-user dependency
+"""
+
+from app.api.deps import auth_user_cache, get_current_user
+from app.core.security import create_access_token, decode_token, verify_token
+
+TOKEN = create_access_token(1)
+
+def bench_verify_token(benchmark):
+    assert benchmark(verify_token, TOKEN) == "1"
+
+def bench_verify_token_bad_signature(benchmark):
+    assert benchmark(verify_token, TOKEN[:-4] + "AAAA") is None
+
+def bench_get_current_user_cached(benchmark, db):
+    claims = decode_token(TOKEN)
+    get_current_user(db=db, claims=claims)
+    assert benchmark(get_current_user, db=db, claims=claims).id == 1
+
+def bench_get_current_user_uncached(benchmark, db):
+    claims = decode_token(TOKEN)
+
+    def setup():
+        auth_user_cache.clear()
+        return (), {"db": db, "claims": claims}
+
+    benchmark.pedantic(get_current_user, setup=setup, rounds=200)
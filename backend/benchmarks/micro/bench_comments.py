@@ -0,0 +1,31 @@
+"""
+Comment thread loading and enrichment (author and nested replies)
+"""
+
+from sqlalchemy.orm import selectinload
+
+from app.api.v1.endpoints.comments import load_threads
+from app.core.serialization import dump_json
+from app.models.comment import Comment
+from app.schemas.comment import CommentList
+
+def load_page(db, limit=20):
+    roots = db.query(Comment).options(selectinload(Comment.author)).filter(
+        Comment.document_id == 1,
+        Comment.parent_id.is_(None)
+    ).order_by(Comment.created_at.desc()).limit(limit).all()
+    load_threads(db, roots, show_internal=False)
+    return roots
+
+def bench_load_threads(benchmark, db):
+    def run():
+        db.expunge_all()
+        return load_page(db)
+
+    roots = benchmark(run)
+    assert roots[0].replies[0].replies
+
+def bench_comment_list_json(benchmark, db):
+    roots = load_page(db, limit=100)
+    payload = {"comments": roots, "total": len(roots), "page": 1, "limit": 100}
+    benchmark(dump_json, CommentList, payload)
@@ -0,0 +1,32 @@
+"""
+Document list filter building and execution
+"""
+
+from app.api.v1.endpoints.documents import filter_documents
+from app.models.document import Document, DocumentStatus, DocumentType
+
+FILTERS = {
+    "type": DocumentType.maintenance,
+    "department": "engineering",
+    "status": DocumentStatus.pending,
+    "search": "inspection",
+}
+
+def bench_build_filters(benchmark, db):
+    benchmark(lambda: filter_documents(db.query(Document), **FILTERS))
+
+def bench_compile_filters(benchmark, db):
+    query = filter_documents(db.query(Document), **FILTERS)
+    benchmark(lambda: str(query.statement.compile(db.get_bind())))
+
+def bench_count(benchmark, db):
+    benchmark(lambda: filter_documents(db.query(Document), department="engineering").count())
+
+def bench_first_page(benchmark, db):
+    def run():
+        db.expunge_all()
+        return filter_documents(db.query(Document), department="engineering").order_by(
+            Document.created_at.desc()
+        ).limit(20).all()
+
+    benchmark(run)
@@ -0,0 +1,31 @@
+"""
+Response schema validation and serialization
+"""
+
+from app.core.serialization import dump_json
+from app.schemas.document import Document as DocumentSchema, DocumentList
+from app.schemas.notification import Notification as NotificationSchema, NotificationList
+
+def bench_document_validate(benchmark, documents):
+    result = benchmark(lambda: [DocumentSchema.model_validate(d) for d in documents])
+    assert result[0].bookmarked_by == DocumentSchema.parse_bookmarked_by(documents[0].bookmarked_by)
+
+def bench_parse_bookmarked_by(benchmark, documents):
+    values = [d.bookmarked_by for d in documents]
+    benchmark(lambda: [DocumentSchema.parse_bookmarked_by(v) for v in values])
+
+def bench_document_list_json(benchmark, documents):
+    payload = {"documents": documents, "total": len(documents), "page": 1, "limit": len(documents), "pages": 1}
+    benchmark(dump_json, DocumentList, payload)
+
+def bench_notification_validate(benchmark, notifications):
+    result = benchmark(lambda: [NotificationSchema.model_validate(n) for n in notifications])
+    assert result[0].extra_data["action"] == "approve"
+
+def bench_parse_extra_data(benchmark, notifications):
+    values = [n.extra_data for n in notifications]
+    benchmark(lambda: [NotificationSchema.parse_extra_data(v) for v in values])
+
+def bench_notification_list_json(benchmark, notifications):
+    payload = {"notifications": notifications, "total": len(notifications), "unread_count": 0, "page": 1, "limit": len(notifications)}
+    benchmark(dump_json, NotificationList, payload)
@@ -0,0 +1,116 @@
+"""
+Fixtures for the micro-benchmarks
+
+Schema benchmarks use transient ORM objects; query and auth benchmarks use an
+in-memory SQLite database created from the models, filled with SIZES rows.
+"""
+
+import json
+import os
+import random
+import sys
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+from app.core.database import Base
+from app.models import user, document, comment, notification, email_outbox, scheduler, token_revocation, replication  # Register mappers
+from app.models.comment import Comment, PATH_SEGMENT_WIDTH
+from app.models.document import Document, DocumentType, DocumentStatus, DocumentPriority
+from app.models.notification import Notification, NotificationType, NotificationPriority
+from app.models.user import User, UserRole, UserDepartment
+
+SIZES = [10, 100, 1000]
+NOW = datetime(2026, 1, 1)
+
+def make_document(rng: random.Random, document_id: int) -> Document:
+    return Document(
+        id=document_id,
+        title=f"Track Inspection Report #{document_id}",
+        summary="Inspection covered rolling stock, track infrastructure and station facilities.",
+        content="Readings outside the tolerance band are highlighted in the attached tables. " * 5,
+        type=rng.choice(list(DocumentType)),
+        department=rng.choice(["engineering", "operations", "finance"]),
+        status=rng.choice(list(DocumentStatus)),
+        priority=rng.choice(list(DocumentPriority)),
+        file_path=f"uploads/{document_id}.pdf",
+        file_name=f"report-{document_id}.pdf",
+        file_type="pdf",
+        file_size=rng.randint(10_000, 5_000_000),
+        version="1.0",
+        page_count=rng.randint(1, 100),
+        uploaded_by=1,
+        approval_required=True,
+        view_count=rng.randint(0, 500),
+        download_count=rng.randint(0, 50),
+        bookmarked_by=json.dumps(rng.sample(range(1, 500), rng.randint(0, 20))),
+        created_at=NOW - timedelta(days=document_id % 365),
+    )
+
+def make_notification(rng: random.Random, notification_id: int) -> Notification:
+    return Notification(
+        id=notification_id,
+        title="Document action",
+        message=f"Document #{notification_id} needs your attention",
+        type=rng.choice(list(NotificationType)),
+        priority=rng.choice(list(NotificationPriority)),
+        user_id=1,
+        document_id=notification_id,
+        is_read=rng.random() < 0.5,
+        action_required=False,
+        extra_data=json.dumps({"action": "approve", "document_title": f"Report {notification_id}", "by": "executive.7"}),
+        created_at=NOW - timedelta(hours=notification_id),
+    )
+
+@pytest.fixture(params=SIZES, ids=lambda n: f"{n}rows")
+def documents(request):
+    rng = random.Random(request.param)
+    return [make_document(rng, i) for i in range(1, request.param + 1)]
+
+@pytest.fixture(params=SIZES, ids=lambda n: f"{n}rows")
+def notifications(request):
+    rng = random.Random(request.param)
+    return [make_notification(rng, i) for i in range(1, request.param + 1)]
+
+def create_database(size: int):
+    """In-memory database with one admin, `size` documents and `size` root comments with two replies each"""
+    rng = random.Random(size)
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    with Session(engine) as db:
+        db.add(User(
+            id=1, username="admin", email="admin@kmrl.co.in", hashed_password="x",
+            role=UserRole.admin, department=UserDepartment.management, permissions="[]"
+        ))
+        db.add_all(make_document(rng, i) for i in range(1, size + 1))
+        db.flush()
+        comment_id = 0
+        for _ in range(size):
+            parent_path = ""
+            parent_id = None
+            for _ in range(3):
+                comment_id += 1
+                path = parent_path + str(comment_id).zfill(PATH_SEGMENT_WIDTH)
+                db.add(Comment(
+                    id=comment_id, content="Please verify the figures on this page.", document_id=1,
+                    author_id=1, parent_id=parent_id, path=path, created_at=NOW + timedelta(minutes=comment_id)
+                ))
+                parent_path, parent_id = path, comment_id
+        db.commit()
+    return engine
+
+@pytest.fixture(scope="module", params=SIZES, ids=lambda n: f"{n}rows")
+def database(request):
+    engine = create_database(request.param)
+    yield engine
+    engine.dispose()
+
+@pytest.fixture
+def db(database):
+    with Session(database) as session:
+        yield session
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Serialization micro-benchmark for the main response models
+
+Compares, per payload, the time to turn in-memory ORM rows into response
+bytes with:
+  fastapi   response_model validation + dump to Python + stdlib json
+  orjson    response_model validation + dump to Python + orjson
+  adapter   cached TypeAdapter + pydantic-core dump_json (json_response)
+
+Usage:
+    python benchmarks/serialization.py [--documents 100] [--threads 20] [--repeat 5]
+"""
+
+import argparse
+import json
+import os
+import sys
+import timeit
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import orjson
+
+from app.core.serialization import dump_json, get_adapter
+from app.models import user, document, comment, notification  # Register mappers
+from app.models.comment import Comment
+from app.models.document import Document, DocumentType, DocumentStatus, DocumentPriority
+from app.models.user import User, UserRole, UserDepartment
+from app.schemas.comment import CommentList
+from app.schemas.dashboard import AnalyticsData
+from app.schemas.document import DocumentList
+
+NOW = datetime(2024, 1, 1, 9, 30)
+
+def make_documents(count: int) -> dict:
+    documents = [
+        Document(
+            id=i,
+            title=f"Rolling stock maintenance report {i}",
+            summary="Quarterly inspection of bogies, brakes and pantographs. " * 3,
+            type=list(DocumentType)[i % len(DocumentType)],
+            department="engineering",
+            status=DocumentStatus.pending,
+            priority=DocumentPriority.medium,
+            file_path=f"uploads/report_{i}.pdf",
+            file_name=f"report_{i}.pdf",
+            file_type="pdf",
+            file_size=1_250_000 + i,
+            version="1.0",
+            page_count=42,
+            uploaded_by=1,
+            approval_required=True,
+            deadline=NOW + timedelta(days=i),
+            view_count=i * 3,
+            download_count=i,
+            bookmarked_by="[1, 2, 3]",
+            created_at=NOW,
+            updated_at=NOW
+        )
+        for i in range(1, count + 1)
+    ]
+    return {"documents": documents, "total": count, "page": 1, "limit": count, "pages": 1}
+
+def make_comments(threads: int, replies: int = 4) -> dict:
+    author = User(
+        id=1,
+        username="maintenance.engineer",
+        full_name="Maintenance Engineer",
+        role=UserRole.maintenance,
+        department=UserDepartment.engineering
+    )
+    next_id = iter(range(1, 10 ** 6))
+
+    def make(depth: int) -> Comment:
+        c = Comment(
+            id=next(next_id),
+            content="Please recheck the torque values on page 12 before sign-off.",
+            document_id=1,
+            author_id=1,
+            page_number=12,
+            position_x=120,
+            position_y=480,
+            is_resolved=False,
+            is_internal=False,
+            created_at=NOW,
+            updated_at=None
+        )
+        c.author = author
+        c.replies = [make(depth + 1) for _ in range(replies)] if depth < 2 else []
+        return c
+
+    comments = [make(0) for _ in range(threads)]
+    return {"comments": comments, "total": threads, "page": 1, "limit": threads}
+
+def make_analytics() -> dict:
+    return {
+        "period": "year",
+        "date_range": {"start": "2023-01-01T00:00:00", "end": "2024-01-01T00:00:00"},
+        "document_trends": [{"date": f"2023-{m:02d}-{d:02d}", "count": m + d} for m in range(1, 13) for d in range(1, 29)],
+        "approval_metrics": {
+            "total_documents": 1200, "approved": 900, "rejected": 100, "pending": 200,
+            "approval_rate": 75.0, "rejection_rate": 8.3
+        },
+        "department_stats": {
+            d.value: {"total": 200, "approved": 150, "pending": 50, "approval_rate": 75.0}
+            for d in UserDepartment
+        },
+        "compliance_tracking": {
+            t.value: {"total": 100, "approved": 80, "compliance_rate": 80.0}
+            for t in DocumentType
+        }
+    }
+
+def fastapi_default(tp, payload) -> bytes:
+    # What a route with response_model does: validate, dump to JSON-able
+    # Python objects, then JSONResponse.render
+    adapter = get_adapter(tp)
+    content = adapter.dump_python(adapter.validate_python(payload, from_attributes=True), mode="json")
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+def orjson_default(tp, payload) -> bytes:
+    adapter = get_adapter(tp)
+    content = adapter.dump_python(adapter.validate_python(payload, from_attributes=True), mode="json")
+    return orjson.dumps(content)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--documents", type=int, default=100)
+    parser.add_argument("--threads", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    cases = [
+        (f"DocumentList ({args.documents} docs)", DocumentList, make_documents(args.documents)),
+        (f"CommentList ({args.threads} threads x 21)", CommentList, make_comments(args.threads)),
+        ("AnalyticsData (year)", AnalyticsData, make_analytics()),
+    ]
+    methods = [("fastapi", fastapi_default), ("orjson", orjson_default), ("adapter", dump_json)]
+
+    print(f"{'payload':<34}{'bytes':>9}" + "".join(f"{name + ' ms':>13}" for name, _ in methods) + f"{'speedup':>10}")
+    for label, tp, payload in cases:
+        outputs = [json.loads(fn(tp, payload)) for _, fn in methods]
+        assert all(o == outputs[0] for o in outputs), f"{label}: serializers disagree"
+
+        timings = []
+        for _, fn in methods:
+            number = 20
+            best = min(timeit.repeat(lambda: fn(tp, payload), number=number, repeat=args.repeat))
+            timings.append(best / number * 1000)
+        size = len(dump_json(tp, payload))
+        print(
+            f"{label:<34}{size:>9}" + "".join(f"{t:>13.3f}" for t in timings)
+            + f"{timings[0] / timings[-1]:>9.1f}x"
+        )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+SQLite concurrency benchmark: default settings vs the production profile
+
+Runs the same mixed workload against a fresh database file twice:
+  default   rollback journal, no pragmas, writers race for the file lock
+  tuned     apply_sqlite_pragmas (WAL, synchronous=NORMAL, ...) and
+            SQLiteWriteLock serializing writers in the process
+
+Each worker thread loops for --seconds, doing a read (document list page
+and unread notification count) or, with probability --write-ratio, a write
+transaction (view count update plus a notification insert). Reports
+reads/s, writes/s and how many operations failed with "database is locked".
+
+Usage:
+    python benchmarks/sqlite_concurrency.py [--threads 16] [--seconds 10] [--write-ratio 0.3]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, event, func, update
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base, SQLiteWriteLock, apply_sqlite_pragmas
+from app.models import user, document, comment, notification  # Register mappers
+from app.models.document import Document, DocumentType, DocumentStatus
+from app.models.notification import Notification, NotificationType
+from app.models.user import User, UserRole, UserDepartment
+
+DOCUMENTS = 2000
+USERS = 50
+
+def make_engine(path: str, tuned: bool, busy_timeout_ms: int):
+    engine = create_engine(
+        f"sqlite:///{path}",
+        connect_args={"check_same_thread": False, "timeout": busy_timeout_ms / 1000},
+        pool_size=32,
+        max_overflow=0
+    )
+    if tuned:
+        @event.listens_for(engine, "connect")
+        def _connect(dbapi_connection, connection_record):
+            apply_sqlite_pragmas(dbapi_connection, connection_record)
+            # Same wait budget as the default run
+            dbapi_connection.execute(f"PRAGMA busy_timeout={busy_timeout_ms}")
+    return engine
+
+def seed(session_factory) -> None:
+    db = session_factory()
+    db.add_all(
+        User(
+            id=i, email=f"user{i}@kmrl.co.in", username=f"user{i}", full_name=f"User {i}",
+            hashed_password="x", role=UserRole.user, department=UserDepartment.engineering
+        )
+        for i in range(1, USERS + 1)
+    )
+    db.add_all(
+        Document(
+            id=i, title=f"Document {i}", type=list(DocumentType)[i % len(DocumentType)],
+            department="engineering", status=DocumentStatus.pending, file_path=f"uploads/{i}.pdf",
+            file_name=f"{i}.pdf", file_type="pdf", file_size=1000, uploaded_by=1 + i % USERS
+        )
+        for i in range(1, DOCUMENTS + 1)
+    )
+    db.commit()
+    db.close()
+
+def read(db, rng: random.Random) -> None:
+    offset = rng.randrange(0, DOCUMENTS - 20)
+    db.query(Document).order_by(Document.created_at.desc()).offset(offset).limit(20).all()
+    db.query(func.count(Notification.id)).filter(
+        Notification.user_id == rng.randint(1, USERS), Notification.is_read == False
+    ).scalar()
+
+def write(db, rng: random.Random) -> None:
+    document_id = rng.randint(1, DOCUMENTS)
+    db.execute(
+        update(Document)
+        .where(Document.id == document_id)
+        .values(view_count=Document.view_count + 1)
+    )
+    db.add(Notification(
+        title="Document viewed", message=f"Document {document_id} was viewed",
+        type=NotificationType.document_action, user_id=rng.randint(1, USERS),
+        document_id=document_id
+    ))
+    db.commit()
+
+def run(tuned: bool, args) -> dict:
+    directory = tempfile.mkdtemp(prefix="kmrl-sqlite-bench-")
+    path = os.path.join(directory, "bench.db")
+    engine = make_engine(path, tuned, args.busy_timeout_ms)
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    seed(session_factory)
+    if tuned:
+        SQLiteWriteLock(timeout=args.busy_timeout_ms / 1000).install(session_factory)
+
+    counts = Counter()
+    counts_lock = threading.Lock()
+    deadline = time.perf_counter() + args.seconds
+
+    def worker(seed_value: int) -> None:
+        rng = random.Random(seed_value)
+        local = Counter()
+        while time.perf_counter() < deadline:
+            kind = "write" if rng.random() < args.write_ratio else "read"
+            db = session_factory()
+            try:
+                (write if kind == "write" else read)(db, rng)
+                local[kind] += 1
+            except OperationalError as e:
+                db.rollback()
+                if "locked" not in str(e) and "write lock" not in str(e):
+                    raise
+                local[f"{kind}_locked"] += 1
+            finally:
+                db.close()
+        with counts_lock:
+            counts.update(local)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(args.threads)]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    with engine.connect() as conn:
+        journal_mode = conn.exec_driver_sql("PRAGMA journal_mode").scalar()
+    engine.dispose()
+    for name in os.listdir(directory):
+        os.remove(os.path.join(directory, name))
+    os.rmdir(directory)
+
+    return {
+        "journal": journal_mode,
+        "reads/s": counts["read"] / elapsed,
+        "writes/s": counts["write"] / elapsed,
+        "locked": counts["read_locked"] + counts["write_locked"],
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--write-ratio", type=float, default=0.3)
+    parser.add_argument("--busy-timeout-ms", type=int, default=1000)
+    args = parser.parse_args()
+
+    print(
+        f"{args.threads} threads, {args.seconds:g}s, {args.write_ratio:.0%} writes, "
+        f"busy timeout {args.busy_timeout_ms} ms"
+    )
+    print(f"{'profile':<10}{'journal':>10}{'reads/s':>12}{'writes/s':>12}{'locked':>10}")
+    for label, tuned in (("default", False), ("tuned", True)):
+        result = run(tuned, args)
+        print(
+            f"{label:<10}{result['journal']:>10}{result['reads/s']:>12.1f}"
+            f"{result['writes/s']:>12.1f}{result['locked']:>10}"
+        )
+
+if __name__ == "__main__":
+    main()
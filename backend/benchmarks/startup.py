@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Cold start benchmark for one uvicorn worker
+
+Migrates a scratch SQLite database to head, then for each run starts
+`uvicorn main:app` in a fresh process and measures:
+  import    time to import main in a fresh interpreter
+  ready     time from spawning uvicorn until GET /health answers 200
+
+Usage:
+    python benchmarks/startup.py [--runs 5]
+"""
+
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DB_NAME = "startup_benchmark.db"
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def measure_import(env: dict) -> float:
+    code = "import time; t = time.perf_counter(); import main; print(time.perf_counter() - t)"
+    out = subprocess.run(
+        [sys.executable, "-c", code], cwd=BACKEND_DIR, env=env,
+        check=True, capture_output=True, text=True
+    ).stdout
+    return float(out.strip().splitlines()[-1])
+
+def measure_ready(env: dict, timeout: float = 60) -> float:
+    port = free_port()
+    url = f"http://127.0.0.1:{port}/health"
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1",
+         "--port", str(port), "--workers", "1", "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            if process.poll() is not None:
+                raise RuntimeError(f"uvicorn exited with {process.returncode}")
+            try:
+                with urllib.request.urlopen(url, timeout=1) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - started
+            except OSError:
+                time.sleep(0.01)
+        raise RuntimeError("worker did not become ready")
+    finally:
+        process.terminate()
+        process.wait()
+
+def summary(values: list) -> str:
+    return (
+        f"min {min(values) * 1000:7.0f} ms   median {statistics.median(values) * 1000:7.0f} ms"
+        f"   max {max(values) * 1000:7.0f} ms"
+    )
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    env = dict(os.environ, USE_SQLITE="true", SQLITE_DB_PATH=DB_NAME, DEBUG="false")
+    db_path = os.path.join(BACKEND_DIR, DB_NAME)
+    subprocess.run(
+        [sys.executable, "-m", "alembic", "upgrade", "head"], cwd=BACKEND_DIR, env=env,
+        check=True, capture_output=True
+    )
+    try:
+        # Warm the bytecode and OS file caches once, runs measure process start
+        measure_import(env)
+        imports = [measure_import(env) for _ in range(args.runs)]
+        ready = [measure_ready(env) for _ in range(args.runs)]
+    finally:
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(db_path + suffix):
+                os.remove(db_path + suffix)
+
+    print(f"{args.runs} runs")
+    print(f"import main   {summary(imports)}")
+    print(f"ready         {summary(ready)}")
+
+if __name__ == "__main__":
+    main()
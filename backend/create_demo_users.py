@@ -10,7 +10,8 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 from sqlalchemy.orm import Session
 from app.core.database import engine, get_db
 from app.models.user import User, UserRole, UserDepartment
-from app.core.security import get_password_hash
+from app.models import document, comment, notification  # Register related mappers
+from app.services.user_import import hash_passwords
 import json
 
 def create_demo_users():
@@ -71,16 +72,24 @@ def create_demo_users():
         
         created_users = []
         
+        # Check which users already exist with a single query
+        existing_usernames = {
+            username for (username,) in db.query(User.username).filter(
+                User.username.in_([user_data["username"] for user_data in demo_users])
+            )
+        }
+        new_users = []
         for user_data in demo_users:
-            # Check if user already exists
-            existing_user = db.query(User).filter(User.username == user_data["username"]).first()
-            if existing_user:
+            if user_data["username"] in existing_usernames:
                 print(f"User {user_data['username']} already exists, skipping...")
-                continue
-            
+            else:
+                new_users.append(user_data)
+        
+        # Hash all passwords at once across worker processes
+        hashed_passwords = hash_passwords([user_data["password"] for user_data in new_users])
+        
+        for user_data, hashed_password in zip(new_users, hashed_passwords):
             # Create new user
-            hashed_password = get_password_hash(user_data["password"])
-            
             new_user = User(
                 username=user_data["username"],
                 email=user_data["email"],
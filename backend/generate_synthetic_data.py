@@ -0,0 +1,530 @@
+#!/usr/bin/env python3
+"""
+Synthetic data generator for load testing
+
+Fills an empty, migrated database with users, documents (and their workflow
+history), comments and notifications at production-like volumes and skew:
+
+- more documents in recent months, ids increasing with created_at
+- departments, types, statuses and priorities weighted; recent documents are
+  mostly pending or drafts, old ones approved or archived
+- a minority of users uploads most documents, recent documents get most
+  comments and notifications, comments come in threads with replies
+
+Rows are generated and bulk inserted in chunks by a pool of processes. Every
+chunk has its own random generator seeded from (--seed, table, chunk) and
+writes explicit ids, so the same arguments produce the same data whatever
+the number of workers (bar the password hash's random salt). Dates are
+relative to --end-date (default: today).
+
+Usage:
+    python generate_synthetic_data.py --documents 1000000 --comments 5000000 --notifications 10000000
+    python generate_synthetic_data.py --sqlite-snapshot snapshots/1m.db --documents 1000000
+
+Without --sqlite-snapshot the configured database is used; run
+`alembic upgrade head` first. With it, a new SQLite file is migrated, filled
+and left in rollback journal mode so it can be copied as a single file.
+Every user's password is --password (admin user: `admin`).
+"""
+
+import argparse
+import json
+import math
+import os
+import random
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, replace
+from datetime import datetime, timedelta
+from typing import Dict, List, Tuple
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import create_engine, event, func, select, text
+
+from app.models.user import User, UserRole, UserDepartment
+from app.models.document import Document, DocumentType, DocumentStatus, DocumentPriority, WorkflowHistory
+from app.models.comment import Comment, PATH_SEGMENT_WIDTH
+from app.models.notification import Notification, NotificationType, NotificationPriority
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Workflow history ids reserved per document (submit, decision, archive)
+WORKFLOW_SLOTS = 3
+MAX_THREAD_SIZE = 8
+
+ROLE_WEIGHTS = {
+    UserRole.admin: 0.2,
+    UserRole.executive: 3,
+    UserRole.maintenance: 30,
+    UserRole.compliance: 8,
+    UserRole.finance: 8,
+    UserRole.user: 50.8,
+}
+ROLE_DEPARTMENTS = {
+    UserRole.admin: UserDepartment.management,
+    UserRole.executive: UserDepartment.management,
+    UserRole.maintenance: UserDepartment.engineering,
+    UserRole.compliance: UserDepartment.legal_compliance,
+    UserRole.finance: UserDepartment.finance,
+}
+USER_DEPARTMENT_WEIGHTS = {
+    UserDepartment.operations: 50,
+    UserDepartment.engineering: 20,
+    UserDepartment.general: 20,
+    UserDepartment.management: 10,
+}
+DIGEST_FREQUENCY_WEIGHTS = {"immediate": 80, "daily": 15, "weekly": 5}
+
+TYPE_WEIGHTS = {
+    DocumentType.maintenance: 30,
+    DocumentType.operations: 25,
+    DocumentType.safety: 15,
+    DocumentType.compliance: 12,
+    DocumentType.finance: 10,
+    DocumentType.training: 8,
+}
+TYPE_DEPARTMENTS = {
+    DocumentType.maintenance: "engineering",
+    DocumentType.operations: "operations",
+    DocumentType.safety: "operations",
+    DocumentType.compliance: "legal_compliance",
+    DocumentType.finance: "finance",
+    DocumentType.training: "general",
+}
+DEPARTMENT_WEIGHTS = {
+    "engineering": 35,
+    "operations": 30,
+    "legal_compliance": 10,
+    "finance": 10,
+    "management": 8,
+    "general": 7,
+}
+# Status mix of documents younger than RECENT_DAYS and of older ones
+RECENT_DAYS = 14
+RECENT_STATUS_WEIGHTS = {
+    DocumentStatus.pending: 45,
+    DocumentStatus.draft: 20,
+    DocumentStatus.approved: 25,
+    DocumentStatus.rejected: 10,
+}
+OLD_STATUS_WEIGHTS = {
+    DocumentStatus.approved: 70,
+    DocumentStatus.archived: 12,
+    DocumentStatus.rejected: 10,
+    DocumentStatus.pending: 5,
+    DocumentStatus.draft: 3,
+}
+PRIORITY_WEIGHTS = {
+    DocumentPriority.low: 30,
+    DocumentPriority.medium: 45,
+    DocumentPriority.high: 18,
+    DocumentPriority.urgent: 7,
+}
+FILE_TYPE_WEIGHTS = {"pdf": 70, "docx": 20, "xlsx": 7, "png": 3}
+NOTIFICATION_TYPE_WEIGHTS = {
+    NotificationType.document_action: 40,
+    NotificationType.comment: 30,
+    NotificationType.approval_request: 15,
+    NotificationType.deadline_reminder: 10,
+    NotificationType.system: 5,
+}
+NOTIFICATION_PRIORITY_WEIGHTS = {
+    NotificationPriority.low: 35,
+    NotificationPriority.medium: 45,
+    NotificationPriority.high: 15,
+    NotificationPriority.urgent: 5,
+}
+
+SUBJECTS = {
+    DocumentType.maintenance: ["Rolling Stock Overhaul", "Track Inspection Report", "Escalator Maintenance Log", "Signalling Fault Analysis", "Preventive Maintenance Schedule"],
+    DocumentType.operations: ["Timetable Revision", "Service Disruption Report", "Crowd Management Plan", "Station Operations Manual", "Shift Roster"],
+    DocumentType.safety: ["Safety Protocol Update", "Incident Investigation", "Fire Drill Report", "Emergency Evacuation Plan", "Hazard Assessment"],
+    DocumentType.compliance: ["Regulatory Audit", "Environmental Clearance", "Contract Compliance Review", "Statutory Inspection", "Policy Amendment"],
+    DocumentType.finance: ["Budget Allocation", "Vendor Invoice Summary", "Procurement Approval", "Quarterly Expense Report", "Fare Revenue Statement"],
+    DocumentType.training: ["Operator Training Module", "Safety Induction Material", "Assessment Results", "Refresher Course Plan", "Skill Matrix"],
+}
+LOCATIONS = ["Aluva", "Kalamassery", "Edappally", "Palarivattom", "Kaloor", "MG Road", "Ernakulam South", "Vyttila", "Petta", "Muttom Depot", "Line 1", "Water Metro"]
+SENTENCES = [
+    "All staff must review and acknowledge these changes within 30 days.",
+    "Coordination with the operations team is required for service disruptions.",
+    "The findings were discussed with the contractor and corrective actions agreed.",
+    "Readings outside the tolerance band are highlighted in the attached tables.",
+    "Costs are within the sanctioned budget for the financial year.",
+    "The revised procedure replaces the version circulated last quarter.",
+    "Inspection covered rolling stock, track infrastructure and station facilities.",
+    "Passenger feedback collected during the period is summarised in the annex.",
+    "Pending items will be tracked in the next review meeting.",
+    "Approval is requested before the work order is issued.",
+    "Spare parts availability has been confirmed with the vendor.",
+    "Training completion is mandatory for all shift supervisors.",
+]
+COMMENTS = [
+    "Please verify the figures on this page.",
+    "Agreed, this matches the site inspection.",
+    "Can we get the vendor's confirmation in writing?",
+    "Updated as discussed.",
+    "This section needs sign-off from safety.",
+    "Minor typo in the second paragraph.",
+    "Looks good to me.",
+    "What is the timeline for the corrective action?",
+]
+
+def cumulative(weights: Dict) -> Tuple[list, list]:
+    """(values, cumulative weights) for random.choices"""
+    values = list(weights)
+    totals, running = [], 0.0
+    for value in values:
+        running += weights[value]
+        totals.append(running)
+    return values, totals
+
+def pick(rng: random.Random, table: Tuple[list, list], k: int) -> list:
+    values, totals = table
+    return rng.choices(values, cum_weights=totals, k=k)
+
+def skewed_id(rng: random.Random, count: int, exponent: float) -> int:
+    """1..count, low ids much more likely for exponent > 1"""
+    return 1 + int(count * rng.random() ** exponent)
+
+def recent_id(rng: random.Random, count: int, exponent: float) -> int:
+    """1..count, high (recent) ids much more likely for exponent > 1"""
+    return count - int(count * rng.random() ** exponent)
+
+@dataclass(frozen=True)
+class Plan:
+    """Everything a worker needs to generate its chunks"""
+    url: str
+    seed: int
+    users: int
+    documents: int
+    comments: int
+    notifications: int
+    days: int
+    end: datetime
+    password_hash: str
+    approver_ids: Tuple[int, ...]
+
+    def rng(self, table: str, chunk: int) -> random.Random:
+        return random.Random(f"{self.seed}:{table}:{chunk}")
+
+    def document_created_at(self, document_id: int) -> datetime:
+        # Document volume grows linearly over time: the square root of the
+        # id's position spreads ids with density increasing towards `end`
+        position = math.sqrt((document_id - 0.5) / self.documents)
+        return self.end - timedelta(days=self.days * (1 - position))
+
+def generate_users(plan: Plan) -> Tuple[List[dict], Tuple[int, ...]]:
+    rng = plan.rng("users", 0)
+    roles = pick(rng, cumulative(ROLE_WEIGHTS), plan.users)
+    roles[0] = UserRole.admin
+    departments = pick(rng, cumulative(USER_DEPARTMENT_WEIGHTS), plan.users)
+    frequencies = pick(rng, cumulative(DIGEST_FREQUENCY_WEIGHTS), plan.users)
+    start = plan.end - timedelta(days=plan.days)
+    rows, approvers = [], []
+    for index in range(plan.users):
+        user_id = index + 1
+        role = roles[index]
+        username = "admin" if user_id == 1 else f"{role.value}.{user_id}"
+        if role in (UserRole.admin, UserRole.executive, UserRole.compliance, UserRole.finance):
+            approvers.append(user_id)
+        rows.append({
+            "id": user_id,
+            "username": username,
+            "email": f"{username}@kmrl.co.in",
+            "hashed_password": plan.password_hash,
+            "full_name": f"Synthetic User {user_id}",
+            "role": role,
+            "department": ROLE_DEPARTMENTS.get(role, departments[index]),
+            "permissions": "[]",
+            "language_preference": "ml" if rng.random() < 0.3 else "en",
+            "notification_settings": json.dumps({"frequency": frequencies[index]}),
+            "is_active": rng.random() > 0.03,
+            "is_verified": True,
+            "created_at": start + timedelta(days=plan.days * index / plan.users),
+            "last_login": plan.end - timedelta(hours=rng.expovariate(1 / 72)),
+        })
+    return rows, tuple(approvers)
+
+def generate_documents(plan: Plan, chunk: int, first_id: int, last_id: int) -> Tuple[List[dict], List[dict]]:
+    """Documents first_id..last_id and their workflow history"""
+    rng = plan.rng("documents", chunk)
+    count = last_id - first_id + 1
+    types = pick(rng, cumulative(TYPE_WEIGHTS), count)
+    departments = pick(rng, cumulative(DEPARTMENT_WEIGHTS), count)
+    priorities = pick(rng, cumulative(PRIORITY_WEIGHTS), count)
+    file_types = pick(rng, cumulative(FILE_TYPE_WEIGHTS), count)
+    recent_statuses = cumulative(RECENT_STATUS_WEIGHTS)
+    old_statuses = cumulative(OLD_STATUS_WEIGHTS)
+    documents, history = [], []
+    for index in range(count):
+        document_id = first_id + index
+        doc_type = types[index]
+        created_at = plan.document_created_at(document_id)
+        age_days = (plan.end - created_at).days
+        status = pick(rng, recent_statuses if age_days < RECENT_DAYS else old_statuses, 1)[0]
+        uploaded_by = skewed_id(rng, plan.users, 3)
+        department = TYPE_DEPARTMENTS[doc_type] if rng.random() < 0.8 else departments[index]
+        decided = status in (DocumentStatus.approved, DocumentStatus.archived, DocumentStatus.rejected)
+        decided_at = min(plan.end, created_at + timedelta(hours=rng.expovariate(1 / 48))) if decided else None
+        approved_by = rng.choice(plan.approver_ids) if decided and plan.approver_ids else None
+        if status == DocumentStatus.pending or rng.random() < 0.3:
+            deadline = created_at + timedelta(days=rng.randint(3, 30))
+        else:
+            deadline = None
+        views = int(rng.paretovariate(1.2)) - 1
+        page_count = max(1, int(rng.lognormvariate(2.5, 0.9)))
+        subject = rng.choice(SUBJECTS[doc_type])
+        location = rng.choice(LOCATIONS)
+        documents.append({
+            "id": document_id,
+            "title": f"{subject} - {location} #{document_id}",
+            "summary": f"{subject} for {location}. {rng.choice(SENTENCES)}",
+            "content": " ".join(rng.choices(SENTENCES, k=rng.randint(3, 12))),
+            "type": doc_type,
+            "department": department,
+            "status": status,
+            "priority": priorities[index],
+            "file_path": f"uploads/synthetic/{document_id}.{file_types[index]}",
+            "file_name": f"{subject.lower().replace(' ', '-')}-{document_id}.{file_types[index]}",
+            "file_type": file_types[index],
+            "file_size": int(rng.lognormvariate(13.5, 1.2)),
+            "version": "1.0" if rng.random() < 0.8 else f"{rng.randint(1, 3)}.{rng.randint(0, 9)}",
+            "page_count": page_count,
+            "uploaded_by": uploaded_by,
+            "approved_by": approved_by if status != DocumentStatus.rejected else None,
+            "approval_required": True,
+            "deadline": deadline,
+            "view_count": views,
+            "download_count": int(views * rng.random() * 0.3),
+            "created_at": created_at,
+            "updated_at": decided_at,
+            "approved_at": decided_at if status in (DocumentStatus.approved, DocumentStatus.archived) else None,
+        })
+
+        # Explicit ids in fixed slots keep workflow history independent of chunk order
+        slot = (document_id - 1) * WORKFLOW_SLOTS
+        if status == DocumentStatus.draft:
+            continue
+        history.append({
+            "id": slot + 1, "document_id": document_id, "user_id": uploaded_by, "action": "submit",
+            "comments": None, "previous_status": "draft", "new_status": "pending",
+            "timestamp": created_at + timedelta(minutes=rng.randint(1, 120)),
+        })
+        if decided:
+            action, new_status = ("reject", "rejected") if status == DocumentStatus.rejected else ("approve", "approved")
+            history.append({
+                "id": slot + 2, "document_id": document_id, "user_id": approved_by or 1, "action": action,
+                "comments": rng.choice(COMMENTS), "previous_status": "pending", "new_status": new_status,
+                "timestamp": decided_at,
+            })
+        if status == DocumentStatus.archived:
+            history.append({
+                "id": slot + 3, "document_id": document_id, "user_id": approved_by or 1, "action": "archive",
+                "comments": None, "previous_status": "approved", "new_status": "archived",
+                "timestamp": min(plan.end, decided_at + timedelta(days=rng.randint(30, 365))),
+            })
+    return documents, history
+
+def generate_comments(plan: Plan, chunk: int, first_id: int, last_id: int) -> List[dict]:
+    """Comments first_id..last_id in threads of up to MAX_THREAD_SIZE on recent documents"""
+    rng = plan.rng("comments", chunk)
+    rows = []
+    comment_id = first_id
+    while comment_id <= last_id:
+        document_id = recent_id(rng, plan.documents, 3)
+        thread_start = plan.document_created_at(document_id)
+        page_number = rng.randint(1, 50) if rng.random() < 0.6 else None
+        thread = []
+        for _ in range(min(rng.randint(1, MAX_THREAD_SIZE), last_id - comment_id + 1)):
+            parent = rng.choice(thread) if thread else None
+            created_at = min(plan.end, (parent["created_at"] if parent else thread_start) + timedelta(hours=rng.expovariate(1 / 24)))
+            row = {
+                "id": comment_id,
+                "content": rng.choice(COMMENTS),
+                "page_number": page_number,
+                "position_x": rng.randint(0, 800) if page_number else None,
+                "position_y": rng.randint(0, 1100) if page_number else None,
+                "document_id": document_id,
+                "author_id": skewed_id(rng, plan.users, 2),
+                "parent_id": parent["id"] if parent else None,
+                "path": (parent["path"] if parent else "") + str(comment_id).zfill(PATH_SEGMENT_WIDTH),
+                "is_resolved": rng.random() < 0.3,
+                "is_internal": rng.random() < 0.15,
+                "created_at": created_at,
+            }
+            thread.append(row)
+            rows.append(row)
+            comment_id += 1
+    return rows
+
+def generate_notifications(plan: Plan, chunk: int, first_id: int, last_id: int) -> List[dict]:
+    rng = plan.rng("notifications", chunk)
+    count = last_id - first_id + 1
+    types = pick(rng, cumulative(NOTIFICATION_TYPE_WEIGHTS), count)
+    priorities = pick(rng, cumulative(NOTIFICATION_PRIORITY_WEIGHTS), count)
+    rows = []
+    for index in range(count):
+        document_id = recent_id(rng, plan.documents, 2) if rng.random() < 0.9 else None
+        if document_id is not None:
+            earliest = plan.document_created_at(document_id)
+            created_at = min(plan.end, earliest + timedelta(hours=rng.expovariate(1 / 72)))
+        else:
+            created_at = plan.end - timedelta(days=plan.days * rng.random() ** 2)
+        age_days = (plan.end - created_at).days
+        is_read = rng.random() < (0.95 if age_days > 14 else 0.4)
+        notification_type = types[index]
+        rows.append({
+            "id": first_id + index,
+            "title": notification_type.value.replace("_", " ").capitalize(),
+            "message": f"Document #{document_id} needs your attention" if document_id else "Scheduled maintenance of the document system",
+            "type": notification_type,
+            "priority": priorities[index],
+            "user_id": skewed_id(rng, plan.users, 2),
+            "document_id": document_id,
+            "is_read": is_read,
+            "action_required": notification_type == NotificationType.approval_request,
+            "extra_data": None,
+            "created_at": created_at,
+            "read_at": created_at + timedelta(hours=rng.expovariate(1 / 12)) if is_read else None,
+        })
+    return rows
+
+_plan = None
+_engine = None
+
+def _sqlite_load_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    # Loading into a scratch or empty database: durability is not needed, waiting for other workers is
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=OFF")
+    cursor.execute("PRAGMA busy_timeout=600000")
+    cursor.execute("PRAGMA cache_size=-262144")
+    cursor.close()
+
+def make_engine(url: str):
+    new_engine = create_engine(url)
+    if url.startswith("sqlite"):
+        event.listen(new_engine, "connect", _sqlite_load_pragmas)
+    return new_engine
+
+def init_worker(plan: Plan) -> None:
+    global _plan, _engine
+    _plan = plan
+    _engine = make_engine(plan.url)
+
+def load_chunk(table: str, chunk: int, first_id: int, last_id: int) -> int:
+    """Generate and insert one chunk in one transaction, returns the rows written"""
+    if table == "documents":
+        documents, history = generate_documents(_plan, chunk, first_id, last_id)
+        batches = [(Document.__table__, documents), (WorkflowHistory.__table__, history)]
+    elif table == "comments":
+        batches = [(Comment.__table__, generate_comments(_plan, chunk, first_id, last_id))]
+    else:
+        batches = [(Notification.__table__, generate_notifications(_plan, chunk, first_id, last_id))]
+    with _engine.begin() as conn:
+        for target, rows in batches:
+            if rows:
+                conn.execute(target.insert(), rows)
+    return last_id - first_id + 1
+
+def chunks(total: int, size: int) -> List[Tuple[int, int, int]]:
+    return [(index, start, min(start + size - 1, total)) for index, start in enumerate(range(1, total + 1, size))]
+
+def load_table(pool: ProcessPoolExecutor, table: str, total: int, chunk_size: int) -> None:
+    if total <= 0:
+        return
+    started = time.perf_counter()
+    futures = [pool.submit(load_chunk, table, *chunk) for chunk in chunks(total, chunk_size)]
+    done = 0
+    for future in futures:
+        done += future.result()
+        print(f"\r  {table:<14} {done:>12,} / {total:,}", end="", flush=True)
+    elapsed = time.perf_counter() - started
+    print(f"\r  {table:<14} {total:>12,} rows in {elapsed:7.1f}s ({total / elapsed:,.0f} rows/s)")
+
+def prepare_snapshot(path: str) -> str:
+    """Migrate a new SQLite file at path and return its URL"""
+    if os.path.exists(path):
+        sys.exit(f"{path} already exists")
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    # DATABASE_URL is built as sqlite:///./<SQLITE_DB_PATH>, relative to the backend directory
+    relative = os.path.relpath(os.path.abspath(path), BACKEND_DIR)
+    env = dict(os.environ, USE_SQLITE="true", SQLITE_DB_PATH=relative)
+    subprocess.run([sys.executable, "-m", "alembic", "upgrade", "head"], cwd=BACKEND_DIR, env=env, check=True)
+    return f"sqlite:///{os.path.abspath(path)}"
+
+def finish(url: str, snapshot: bool) -> None:
+    """Planner statistics, sequences and a self-contained snapshot file"""
+    target = create_engine(url)
+    with target.begin() as conn:
+        if target.dialect.name == "postgresql":
+            # Rows were written with explicit ids
+            for table in ("users", "documents", "workflow_history", "comments", "notifications"):
+                conn.execute(text(
+                    f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), COALESCE(MAX(id), 1)) FROM {table}"
+                ))
+        conn.execute(text("ANALYZE"))
+    if snapshot:
+        with target.connect() as conn:
+            conn.exec_driver_sql("PRAGMA wal_checkpoint(TRUNCATE)")
+            conn.exec_driver_sql("PRAGMA journal_mode=DELETE")
+    target.dispose()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--documents", type=int, default=100_000)
+    parser.add_argument("--comments", type=int, default=500_000)
+    parser.add_argument("--notifications", type=int, default=1_000_000)
+    parser.add_argument("--days", type=int, default=730, help="History covered by the data")
+    parser.add_argument("--end-date", help="YYYY-MM-DD the data ends at, default today")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk-size", type=int, default=20_000)
+    parser.add_argument("--password", default="demo123")
+    parser.add_argument("--sqlite-snapshot", metavar="PATH", help="Write a new SQLite database instead of the configured one")
+    args = parser.parse_args()
+    if args.users < 1 or args.documents < 1:
+        parser.error("--users and --documents must be at least 1")
+
+    if args.sqlite_snapshot:
+        url = prepare_snapshot(args.sqlite_snapshot)
+    else:
+        from app.core.config import settings
+        from app.core.schema import check_schema_revision
+        check_schema_revision()
+        url = settings.DATABASE_URL
+    engine = make_engine(url)
+    with engine.connect() as conn:
+        if conn.execute(select(func.count()).select_from(User.__table__)).scalar():
+            sys.exit("The database already has users; generate into an empty database")
+
+    from app.core.security import get_password_hash
+    end = datetime.strptime(args.end_date, "%Y-%m-%d") if args.end_date else datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    plan = Plan(
+        url=url, seed=args.seed, users=args.users, documents=args.documents, comments=args.comments,
+        notifications=args.notifications, days=args.days, end=end,
+        password_hash=get_password_hash(args.password), approver_ids=()
+    )
+    users, approver_ids = generate_users(plan)
+    plan = replace(plan, approver_ids=approver_ids)
+
+    print(f"Generating into {url} with {args.workers} workers (seed {args.seed})")
+    started = time.perf_counter()
+    with engine.begin() as conn:
+        conn.execute(User.__table__.insert(), users)
+    engine.dispose()
+    print(f"  {'users':<14} {len(users):>12,}")
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=init_worker, initargs=(plan,)) as pool:
+        # Documents first: comments and notifications reference them
+        load_table(pool, "documents", args.documents, args.chunk_size)
+        load_table(pool, "comments", args.comments, args.chunk_size)
+        load_table(pool, "notifications", args.notifications, args.chunk_size)
+    finish(url, snapshot=bool(args.sqlite_snapshot))
+    print(f"Done in {time.perf_counter() - started:.1f}s")
+
+if __name__ == "__main__":
+    main()
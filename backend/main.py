@@ -3,36 +3,45 @@ KMRL Document Management System - FastAPI Backend
 Main application entry point
 """
 
-from fastapi import FastAPI
+import asyncio
+import logging
+from functools import partial
+
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
-import uvicorn
+from starlette.concurrency import run_in_threadpool
 
+from app.core.cache import invalidation_bus
 from app.core.config import settings
-from app.core.database import engine, Base
-from app.api.v1.api import api_router
+from app.core.database import engine, replica_set
+from app.core.metrics import CONTENT_TYPE_LATEST, MetricsMiddleware, instrument_engine, mark_worker_dead, render_metrics
+from app.core.permissions import Permission
+from app.core.profiling import ProfilingMiddleware, profile_store
+from app.core.schema import check_schema_revision
+from app.core.serialization import default_response_class
+from app.core.sql_instrumentation import SQLInstrumentationMiddleware, install as install_sql_instrumentation
+from app.api.deps import authorization_has_permission
+from app.api.v1.api import api_router, ws_router
+from app.services.digest import run_digest_scheduler
+from app.services.mailer import run_email_worker
+from app.services.reminders import run_deadline_reminder_scheduler
+from app.services.replication import check_replica_settings, run_replica_monitor
+from app.services.token_revocation import revocation_list, run_revocation_sync
+from app.services.user_import import shutdown_hash_pool
 
 # Import all models to ensure they're registered with SQLAlchemy
-from app.models import user, document, comment, notification
-
-def create_tables():
-    """Create database tables"""
-    try:
-        Base.metadata.create_all(bind=engine)
-        print("Database tables created successfully")
-    except Exception as e:
-        print(f"Error creating database tables: {e}")
-        # For development, we'll continue even if tables exist
+from app.models import user, document, comment, notification, email_outbox, scheduler, token_revocation, replication
 
-# Create database tables
-create_tables()
+logging.basicConfig(level=settings.LOG_LEVEL)
 
 # Create FastAPI instance
 app = FastAPI(
     title=settings.PROJECT_NAME,
     description="KMRL Document Management System API",
     version="1.0.0",
-    openapi_url=f"{settings.API_V1_STR}/openapi.json"
+    openapi_url=f"{settings.API_V1_STR}/openapi.json",
+    default_response_class=default_response_class
 )
 
 # Set up CORS
@@ -50,8 +59,71 @@ app.add_middleware(
     allowed_hosts=settings.ALLOWED_HOSTS
 )
 
+# Query count and DB time per request (Server-Timing header and logs)
+if settings.SQL_INSTRUMENTATION_ENABLED:
+    install_sql_instrumentation()
+    app.add_middleware(
+        SQLInstrumentationMiddleware,
+        sample_rate=settings.SQL_INSTRUMENTATION_SAMPLE_RATE
+    )
+
+# Prometheus latency histograms, in-flight requests and pool usage
+if settings.METRICS_ENABLED:
+    instrument_engine(engine, "primary")
+    for index, replica_engine in enumerate(replica_set.engines):
+        instrument_engine(replica_engine, f"replica{index}")
+    app.add_middleware(MetricsMiddleware)
+
+# Sampling profiler, see app.core.profiling
+if settings.PROFILING_ENABLED:
+    app.add_middleware(
+        ProfilingMiddleware,
+        authorize=partial(authorization_has_permission, permission=Permission.system_admin),
+        store=profile_store,
+        interval=settings.PROFILING_INTERVAL_MS / 1000,
+        sample_every=settings.PROFILING_SAMPLE_EVERY
+    )
+
 # Include API router
 app.include_router(api_router, prefix=settings.API_V1_STR)
+app.include_router(ws_router, prefix="/ws")
+
+@app.on_event("startup")
+async def verify_schema():
+    # Schema changes are applied out of band with `alembic upgrade head`
+    if settings.SCHEMA_REVISION_CHECK:
+        check_schema_revision()
+
+@app.on_event("startup")
+async def verify_replica_settings():
+    check_replica_settings()
+
+# Background schedulers started with the app
+background_tasks = []
+
+@app.on_event("startup")
+async def start_background_tasks():
+    invalidation_bus.start()
+    # Every worker keeps its own copy of the token revocation list, loaded
+    # before the first request so token checks never query on the event loop
+    await run_in_threadpool(revocation_list.sync)
+    background_tasks.append(asyncio.create_task(run_revocation_sync()))
+    if settings.DIGEST_SCHEDULER_ENABLED:
+        background_tasks.append(asyncio.create_task(run_digest_scheduler()))
+    if settings.EMAIL_WORKER_ENABLED and settings.EMAILS_ENABLED:
+        background_tasks.append(asyncio.create_task(run_email_worker()))
+    if settings.DEADLINE_REMINDERS_ENABLED:
+        background_tasks.append(asyncio.create_task(run_deadline_reminder_scheduler()))
+    if replica_set.engines:
+        background_tasks.append(asyncio.create_task(run_replica_monitor()))
+
+@app.on_event("shutdown")
+async def stop_background_tasks():
+    for task in background_tasks:
+        task.cancel()
+    background_tasks.clear()
+    shutdown_hash_pool()
+    mark_worker_dead()
 
 @app.get("/")
 async def root():
@@ -61,7 +133,15 @@ async def root():
 async def health_check():
     return {"status": "healthy"}
 
+if settings.METRICS_ENABLED:
+    @app.get("/metrics", include_in_schema=False)
+    def metrics():
+        # Sync so the queue depth queries run in the threadpool
+        return Response(render_metrics(), headers={"Content-Type": CONTENT_TYPE_LATEST})
+
 if __name__ == "__main__":
+    import uvicorn
+
     uvicorn.run(
         "main:app",
         host=settings.HOST,
@@ -0,0 +1,82 @@
+"""
+Shared test configuration
+
+Settings are read at import time, so the environment is prepared before any
+app module is imported. Tests run against a throwaway SQLite database
+created from the models.
+"""
+
+import atexit
+import os
+import shutil
+import tempfile
+
+_DB_DIR = tempfile.mkdtemp(prefix="kmrl-tests-")
+atexit.register(shutil.rmtree, _DB_DIR, ignore_errors=True)
+# DATABASE_URL is relative to the working directory
+os.environ["SQLITE_DB_PATH"] = os.path.relpath(os.path.join(_DB_DIR, "test.db"))
+os.environ["SCHEMA_REVISION_CHECK"] = "false"
+os.environ.setdefault("DEBUG", "false")
+os.environ["SMTP_HOST"] = "smtp.test"
+os.environ["EMAILS_FROM_EMAIL"] = "noreply@kmrl.test"
+os.environ["BCRYPT_ROUNDS"] = "4"  # Tests that log in hash for real
+
+import pytest
+
+@pytest.fixture(scope="session")
+def app():
+    import main
+    from app.core.database import Base, engine
+    Base.metadata.create_all(engine)
+    return main.app
+
+@pytest.fixture
+def db(app):
+    from app.core.database import SessionLocal
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+@pytest.fixture
+def client(app):
+    from fastapi.testclient import TestClient
+    return TestClient(app, base_url="http://localhost")
+
+@pytest.fixture(scope="session")
+def admin(app):
+    """An admin user; returns its id"""
+    from app.core.database import SessionLocal
+    from app.models.user import User, UserRole, UserDepartment
+    db = SessionLocal()
+    try:
+        user = db.query(User).filter(User.username == "admin").first()
+        if user is None:
+            user = User(
+                username="admin", email="admin@kmrl.co.in", hashed_password="!",
+                role=UserRole.admin, department=UserDepartment.management
+            )
+            db.add(user)
+            db.commit()
+        return user.id
+    finally:
+        db.close()
+
+@pytest.fixture
+def admin_headers(admin):
+    from app.core.security import create_access_token
+    return {"Authorization": f"Bearer {create_access_token(admin)}"}
+
+@pytest.fixture
+def document(db, admin):
+    """A pending engineering document; returns its id"""
+    from app.models.document import Document, DocumentType, DocumentStatus
+    document = Document(
+        title="Track inspection", type=DocumentType.maintenance, department="engineering",
+        status=DocumentStatus.pending, file_path="uploads/test.pdf", file_name="test.pdf",
+        file_type="pdf", file_size=1, uploaded_by=admin
+    )
+    db.add(document)
+    db.commit()
+    return document.id
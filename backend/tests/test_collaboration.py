@@ -0,0 +1,135 @@
+"""
+Collaboration rooms: slow viewers and events relayed between workers
+"""
+
+import asyncio
+import json
+import time
+
+import pytest
+
+from app.core.cache import invalidation_bus
+from app.core.config import settings
+from app.core.permissions import Permission
+from app.services.collaboration import CollaborationHub, Viewer
+
+class FakeSocket:
+    def __init__(self, delay: float = 0):
+        self.delay = delay
+        self.messages = []
+        self.closed = False
+
+    async def send_text(self, message: str) -> None:
+        await asyncio.sleep(self.delay)
+        self.messages.append(json.loads(message))
+
+    async def close(self) -> None:
+        self.closed = True
+
+    def events(self, name: str):
+        return [message["data"] for message in self.messages if message["event"] == name]
+
+def viewer(user_id: int, permission_bits: int = 0) -> Viewer:
+    return Viewer(
+        user_id=user_id, username=f"user.{user_id}", full_name=None,
+        permission_bits=permission_bits, last_seen=time.monotonic()
+    )
+
+@pytest.fixture
+def hub(monkeypatch):
+    """A hub receiving the bus topics in place of the app's"""
+    hub = CollaborationHub()
+    monkeypatch.setitem(invalidation_bus._handlers, "collaboration_event", hub.receive_event)
+    monkeypatch.setitem(invalidation_bus._handlers, "collaboration_presence", hub.receive_presence)
+    monkeypatch.setattr(settings, "WS_SEND_TIMEOUT_SECONDS", 0.2)
+    return hub
+
+@pytest.fixture
+def relayed(monkeypatch):
+    """Messages this worker sends over Redis"""
+    sent = []
+
+    class FakeRedis:
+        def publish(self, channel, message):
+            sent.append(json.loads(message))
+
+    monkeypatch.setattr(settings, "CACHE_INVALIDATION_PUBSUB", True)
+    monkeypatch.setattr(invalidation_bus, "_client", FakeRedis())
+    return sent
+
+def from_other_worker(topic: str, payload: dict) -> None:
+    """What the bus listener does with a message from another worker"""
+    invalidation_bus._dispatch(topic, payload)
+
+async def settle():
+    await asyncio.sleep(0.05)
+
+def test_slow_viewer_does_not_hold_up_the_room(hub):
+    fast, slow = FakeSocket(), FakeSocket(delay=10)
+
+    async def scenario():
+        await hub.join(1, fast, viewer(1))
+        hub.rooms[1][slow] = viewer(2)
+        started = time.monotonic()
+        await hub.broadcast(1, "comment_added", {"id": 1})
+        elapsed = time.monotonic() - started
+        await settle()
+        return elapsed
+
+    elapsed = asyncio.run(scenario())
+
+    assert elapsed < 1
+    assert fast.events("comment_added") == [{"id": 1}]
+    assert slow not in hub.rooms[1] and slow.closed
+    # The remaining viewers learn that the slow one left
+    assert fast.events("user_viewing")[-1]["viewers"] == [{"user_id": 1, "username": "user.1", "full_name": None}]
+
+def test_published_events_are_relayed_to_other_workers(hub, relayed):
+    hub.publish(7, "status_changed", {"new_status": "approved"})
+
+    assert relayed == [{
+        "origin": invalidation_bus._origin,
+        "topic": "collaboration_event",
+        "payload": {"document_id": 7, "event": "status_changed", "data": {"new_status": "approved"}, "permission": None}
+    }]
+
+def test_events_from_other_workers_reach_local_viewers(hub, relayed):
+    reader, internal = FakeSocket(), FakeSocket()
+
+    async def scenario():
+        await hub.join(1, reader, viewer(1))
+        await hub.join(1, internal, viewer(2, int(Permission.view_internal_comments)))
+        from_other_worker("collaboration_event", {
+            "document_id": 1, "event": "comment_added", "data": {"id": 5},
+            "permission": int(Permission.view_internal_comments)
+        })
+        await settle()
+
+    asyncio.run(scenario())
+
+    assert internal.events("comment_added") == [{"id": 5}]
+    assert reader.events("comment_added") == []
+
+def test_presence_includes_viewers_on_other_workers(hub, relayed):
+    local = FakeSocket()
+
+    async def scenario():
+        await hub.join(1, local, viewer(1))
+        from_other_worker("collaboration_presence", {
+            "origin": "other-worker", "document_id": 1,
+            "viewers": [{"user_id": 2, "username": "user.2", "full_name": None}]
+        })
+        await settle()
+        joined = local.events("user_viewing")[-1]["viewers"]
+        from_other_worker("collaboration_presence", {"origin": "other-worker", "document_id": 1, "viewers": []})
+        await settle()
+        return joined, local.events("user_viewing")[-1]["viewers"]
+
+    joined, left = asyncio.run(scenario())
+
+    assert sorted(v["user_id"] for v in joined) == [1, 2]
+    assert [v["user_id"] for v in left] == [1]
+    # This worker announced its own viewer to the others
+    assert {"origin": hub.origin, "document_id": 1, "viewers": [{"user_id": 1, "username": "user.1", "full_name": None}]} in [
+        message["payload"] for message in relayed if message["topic"] == "collaboration_presence"
+    ]
@@ -0,0 +1,48 @@
+"""
+The current user: cached authorization fields, everything else through load()
+"""
+
+import pytest
+
+from app.api.deps import CurrentUser, get_auth_user
+from app.models.document import Document, DocumentType, DocumentStatus
+from app.models.notification import Notification
+from app.models.user import User, UserRole, UserDepartment
+
+def test_uncached_fields_need_load(db, admin):
+    current_user = CurrentUser(get_auth_user(db, admin), db)
+
+    assert current_user.department == UserDepartment.management
+    with pytest.raises(AttributeError):
+        current_user.full_name
+    assert current_user.load().username == "admin"
+
+def test_comment_notification_names_the_author(client, db, admin_headers):
+    uploader = User(
+        username="comment.owner", email="comment.owner@kmrl.co.in", hashed_password="!",
+        role=UserRole.user, department=UserDepartment.engineering
+    )
+    db.add(uploader)
+    db.flush()
+    document = Document(
+        title="Signal relay report", type=DocumentType.maintenance, department="engineering",
+        status=DocumentStatus.pending, file_path="uploads/relay.pdf", file_name="relay.pdf",
+        file_type="pdf", file_size=1, uploaded_by=uploader.id
+    )
+    db.add(document)
+    db.commit()
+
+    created = client.post(
+        f"/api/v1/documents/{document.id}/comments", headers=admin_headers, json={"content": "Checked"}
+    )
+
+    assert created.status_code == 200
+    assert created.json()["author"]["username"] == "admin"
+    messages = [message for message, in db.query(Notification.message).filter(Notification.user_id == uploader.id)]
+    assert messages == ["admin commented on Signal relay report"]
+
+def test_notification_settings_are_loaded(client, admin_headers):
+    response = client.get("/api/v1/notifications/settings", headers=admin_headers)
+
+    assert response.status_code == 200
+    assert response.json()["frequency"] == "immediate"
@@ -0,0 +1,72 @@
+"""
+A request holds at most one pooled connection at a time
+"""
+
+import pytest
+from sqlalchemy import event
+
+from app.api.deps import auth_user_cache
+from app.api.v1.endpoints import auth
+from app.core.database import engine
+from app.core.security import get_password_hash
+from app.models.user import User, UserRole, UserDepartment
+
+@pytest.fixture
+def checked_out():
+    """Peak number of connections checked out of the pool at once"""
+    state = {"current": 0, "peak": 0}
+
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        state["current"] += 1
+        state["peak"] = max(state["peak"], state["current"])
+
+    def on_checkin(dbapi_connection, connection_record):
+        state["current"] -= 1
+
+    event.listen(engine, "checkout", on_checkout)
+    event.listen(engine, "checkin", on_checkin)
+    yield state
+    event.remove(engine, "checkout", on_checkout)
+    event.remove(engine, "checkin", on_checkin)
+
+@pytest.mark.parametrize("path", [
+    "/api/v1/documents/",
+    "/api/v1/documents/{id}/comments",
+    "/api/v1/documents/{id}/workflow",
+    "/api/v1/notifications/",
+    "/api/v1/dashboard/overview",
+])
+@pytest.mark.parametrize("cached_user", [False, True], ids=["auth-miss", "auth-hit"])
+def test_read_request_uses_one_connection(client, admin_headers, document, checked_out, path, cached_user):
+    if cached_user:
+        client.get("/api/v1/auth/me", headers=admin_headers)
+    else:
+        auth_user_cache.clear()
+    checked_out["peak"] = 0
+
+    response = client.get(path.format(id=document), headers=admin_headers)
+
+    assert response.status_code == 200
+    assert checked_out["peak"] == 1
+    assert checked_out["current"] == 0
+
+def test_login_holds_no_connection_while_hashing(client, db, checked_out, monkeypatch):
+    db.add(User(
+        username="depot.login", email="depot.login@kmrl.co.in", hashed_password=get_password_hash("secret-123"),
+        role=UserRole.user, department=UserDepartment.operations
+    ))
+    db.commit()
+    during_bcrypt = []
+    verify = auth.verify_and_update_password_async
+
+    async def recording_verify(*args):
+        during_bcrypt.append(checked_out["current"])
+        return await verify(*args)
+
+    monkeypatch.setattr(auth, "verify_and_update_password_async", recording_verify)
+    response = client.post("/api/v1/auth/login", data={"username": "depot.login", "password": "secret-123"})
+
+    assert response.status_code == 200
+    # Logins queue for bcrypt during a burst; a held connection each would exhaust the pool
+    assert during_bcrypt == [0]
+    assert checked_out["current"] == 0
@@ -0,0 +1,126 @@
+"""
+Digest delivery: routing in notify_user and one digest per user per run
+"""
+
+import json
+
+import pytest
+from sqlalchemy import event
+
+from app.models.email_outbox import EmailOutbox
+from app.models.notification import Notification, NotificationDigestItem, NotificationType, NotificationPriority
+from app.models.user import User, UserRole, UserDepartment
+from app.services.digest import run_digest
+from app.services.notifications import notify_user, requeue_digest_items
+
+@pytest.fixture
+def make_user(db):
+    created = []
+
+    def make(name: str, frequency: str = "immediate") -> User:
+        user = User(
+            username=f"digest.{name}", email=f"digest.{name}@kmrl.co.in", hashed_password="!",
+            role=UserRole.user, department=UserDepartment.operations,
+            notification_settings=json.dumps({"frequency": frequency})
+        )
+        db.add(user)
+        db.commit()
+        created.append(user)
+        return user
+
+    yield make
+    ids = [user.id for user in created]
+    emails = [user.email for user in created]
+    db.rollback()
+    db.query(NotificationDigestItem).filter(NotificationDigestItem.user_id.in_(ids)).delete(synchronize_session=False)
+    db.query(Notification).filter(Notification.user_id.in_(ids)).delete(synchronize_session=False)
+    db.query(EmailOutbox).filter(EmailOutbox.to_address.in_(emails)).delete(synchronize_session=False)
+    db.query(User).filter(User.id.in_(ids)).delete(synchronize_session=False)
+    db.commit()
+
+def notify(db, user: User, title: str, **kwargs):
+    kwargs.setdefault("type", NotificationType.comment)
+    delivered = notify_user(db, user, title=title, message=f"{title} details", **kwargs)
+    db.commit()
+    return delivered
+
+def queued(db, user: User):
+    return [(item.title, item.frequency) for item in db.query(NotificationDigestItem).filter(
+        NotificationDigestItem.user_id == user.id
+    ).order_by(NotificationDigestItem.id)]
+
+def digests(db, user: User):
+    return db.query(Notification).filter(
+        Notification.user_id == user.id,
+        Notification.title.like("Your % digest")
+    ).all()
+
+def count_commits(db) -> list:
+    commits = []
+    event.listen(db, "after_commit", lambda session: commits.append(1))
+    return commits
+
+def test_immediate_users_are_notified_right_away(db, make_user):
+    user = make_user("immediate")
+
+    assert isinstance(notify(db, user, "New comment"), Notification)
+    assert queued(db, user) == []
+    assert db.query(EmailOutbox).filter(EmailOutbox.to_address == user.email).count() == 1
+
+def test_digest_users_get_queued_unless_urgent(db, make_user):
+    user = make_user("daily", "daily")
+
+    assert isinstance(notify(db, user, "New comment"), NotificationDigestItem)
+    assert isinstance(notify(db, user, "Approval needed", action_required=True), Notification)
+    assert isinstance(notify(db, user, "Document rejected", priority=NotificationPriority.high), Notification)
+
+    assert queued(db, user) == [("New comment", "daily")]
+    # Only the two immediate ones are emailed now
+    assert db.query(EmailOutbox).filter(EmailOutbox.to_address == user.email).count() == 2
+
+def test_run_collapses_items_into_one_digest_per_user(db, make_user):
+    users = [make_user(f"batch{i}", "daily") for i in range(3)]
+    weekly = make_user("weekly", "weekly")
+    for user in users + [weekly]:
+        notify(db, user, "First update")
+        notify(db, user, "Second update")
+    commits = count_commits(db)
+
+    assert run_digest(db, "daily", batch_size=2) == 3
+
+    # One commit per batch of users, each deleting what it delivered
+    assert len(commits) == 2
+    for user in users:
+        (digest,) = digests(db, user)
+        assert "2 new updates" in digest.message
+        assert [item["title"] for item in json.loads(digest.extra_data)["items"]] == ["First update", "Second update"]
+        assert queued(db, user) == []
+    assert db.query(EmailOutbox).filter(EmailOutbox.to_address == users[0].email, EmailOutbox.subject == "Your daily digest").count() == 1
+    # Weekly items wait for the weekly run
+    assert digests(db, weekly) == []
+    assert len(queued(db, weekly)) == 2
+    assert run_digest(db, "weekly") == 1
+    assert len(digests(db, weekly)) == 1
+
+def test_changed_frequency_moves_queued_items(db, make_user):
+    to_weekly = make_user("to.weekly", "daily")
+    to_immediate = make_user("to.immediate", "weekly")
+    notify(db, to_weekly, "Queued daily")
+    notify(db, to_immediate, "Queued weekly")
+
+    # Both change their settings while items are queued
+    for user, frequency in ((to_weekly, "weekly"), (to_immediate, "immediate")):
+        user.notification_settings = json.dumps({"frequency": frequency})
+        requeue_digest_items(db, user.id, frequency)
+    db.commit()
+
+    assert queued(db, to_weekly) == [("Queued daily", "weekly")]
+    assert queued(db, to_immediate) == [("Queued weekly", "immediate")]
+    # New events follow the new setting
+    assert isinstance(notify(db, to_immediate, "After the change"), Notification)
+
+    run_digest(db, "daily")
+
+    # Leftovers of users back on immediate delivery go out with the daily run
+    assert len(digests(db, to_immediate)) == 1 and queued(db, to_immediate) == []
+    assert digests(db, to_weekly) == [] and len(queued(db, to_weekly)) == 1
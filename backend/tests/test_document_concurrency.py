@@ -0,0 +1,75 @@
+"""
+Optimistic concurrency on documents: lost updates become 409 or 412, counters never bump the version
+"""
+
+import pytest
+from fastapi import HTTPException
+
+from app.api.v1.endpoints.documents import commit_document_change
+from app.core.database import SessionLocal
+from app.models.document import Document, DocumentStatus, WorkflowHistory
+from app.models.user import User
+from app.services.workflow import transition
+
+def history_count(db, document_id: int) -> int:
+    return db.query(WorkflowHistory).filter(WorkflowHistory.document_id == document_id).count()
+
+def test_second_of_two_concurrent_transitions_is_a_conflict(db, admin, document):
+    first, second = SessionLocal(), SessionLocal()
+    try:
+        # Both requests load the pending document before either commits
+        first_document, second_document = first.get(Document, document), second.get(Document, document)
+
+        transition(first, first_document, "approve", first.get(User, admin), "Looks good")
+        commit_document_change(first)
+
+        transition(second, second_document, "reject", second.get(User, admin), "Missing pages")
+        with pytest.raises(HTTPException) as raised:
+            commit_document_change(second)
+        assert raised.value.status_code == 409
+    finally:
+        first.close()
+        second.close()
+
+    assert db.get(Document, document).status == DocumentStatus.approved
+    assert history_count(db, document) == 1
+
+def test_put_with_stale_if_match_is_refused(client, admin_headers, document):
+    url = f"/api/v1/documents/{document}"
+    etag = client.get(url, headers=admin_headers).headers["etag"]
+    assert client.put(url, headers={**admin_headers, "If-Match": etag}, json={"title": "First edit"}).status_code == 200
+
+    stale = client.put(url, headers={**admin_headers, "If-Match": etag}, json={"title": "Second edit"})
+
+    assert stale.status_code == 412
+    assert client.get(url, headers=admin_headers).json()["title"] == "First edit"
+
+def test_approve_with_stale_if_match_is_refused(client, db, admin_headers, document):
+    url = f"/api/v1/documents/{document}"
+    etag = client.get(url, headers=admin_headers).headers["etag"]
+    assert client.put(url, headers=admin_headers, json={"title": "Edited after loading"}).status_code == 200
+
+    stale = client.post(
+        f"{url}/approve", headers={**admin_headers, "If-Match": etag},
+        json={"action": "approve", "comments": "Approving what I read"}
+    )
+
+    assert stale.status_code == 412
+    assert db.get(Document, document).status == DocumentStatus.pending
+    assert history_count(db, document) == 0
+
+def test_views_and_downloads_leave_the_version_alone(client, db, admin_headers, document):
+    url = f"/api/v1/documents/{document}"
+    before = db.get(Document, document)
+    row_version, updated_at = before.row_version, before.updated_at
+    etag = client.get(url, headers=admin_headers).headers["etag"]
+
+    assert client.get(url, headers=admin_headers).status_code == 200
+    assert client.get(f"{url}/download", headers=admin_headers).status_code == 200
+
+    db.expire_all()
+    after = db.get(Document, document)
+    assert after.row_version == row_version and after.updated_at == updated_at
+    assert after.view_count == 2 and after.download_count == 1
+    # A copy loaded before the views can still be changed
+    assert client.put(url, headers={**admin_headers, "If-Match": etag}, json={"title": "Still current"}).status_code == 200
@@ -0,0 +1,35 @@
+"""
+List ETags change on every edit, including edits within the same second
+"""
+
+def revalidate(client, url, headers, etag):
+    return client.get(url, headers={**headers, "If-None-Match": etag})
+
+def test_document_list_etag_changes_on_same_second_edit(client, admin_headers, document):
+    url = "/api/v1/documents/?department=engineering"
+    listed = client.get(url, headers=admin_headers)
+    assert listed.status_code == 200
+    etag = listed.headers["etag"]
+    assert revalidate(client, url, admin_headers, etag).status_code == 304
+
+    edited = client.put(f"/api/v1/documents/{document}", headers=admin_headers, json={"title": "Renamed"})
+    assert edited.status_code == 200
+
+    fresh = revalidate(client, url, admin_headers, etag)
+    assert fresh.status_code == 200
+    assert "Renamed" in fresh.text
+
+def test_comment_list_etag_changes_on_same_second_edit(client, admin_headers, document):
+    url = f"/api/v1/documents/{document}/comments"
+    created = client.post(url, headers=admin_headers, json={"content": "First draft"})
+    assert created.status_code == 200
+    etag = client.get(url, headers=admin_headers).headers["etag"]
+
+    edited = client.put(
+        f"/api/v1/documents/comments/{created.json()['id']}", headers=admin_headers, json={"content": "Edited"}
+    )
+    assert edited.status_code == 200
+
+    fresh = revalidate(client, url, admin_headers, etag)
+    assert fresh.status_code == 200
+    assert "Edited" in fresh.text
@@ -0,0 +1,60 @@
+"""
+Login throttling charges failed attempts only
+"""
+
+import pytest
+
+from app.api.v1.endpoints import auth
+from app.core.ratelimit import TokenBucketLimiter
+from app.core.security import get_password_hash
+from app.models.user import User, UserRole, UserDepartment
+
+PASSWORD = "shift-change-123"
+
+@pytest.fixture
+def limiters(monkeypatch):
+    """Small buckets that do not refill during the test"""
+    ip_limiter = TokenBucketLimiter(burst=3, per_minute=0.001)
+    username_limiter = TokenBucketLimiter(burst=2, per_minute=0.001)
+    monkeypatch.setattr(auth, "login_ip_limiter", ip_limiter)
+    monkeypatch.setattr(auth, "login_username_limiter", username_limiter)
+    return ip_limiter, username_limiter
+
+@pytest.fixture
+def staff(db):
+    """Usernames of a few depot staff with PASSWORD"""
+    users = [
+        User(
+            username=f"depot.{i}", email=f"depot.{i}@kmrl.co.in", hashed_password=get_password_hash(PASSWORD),
+            role=UserRole.maintenance, department=UserDepartment.engineering
+        )
+        for i in range(6)
+    ]
+    db.add_all(users)
+    db.commit()
+    yield [user.username for user in users]
+    for user in users:
+        db.delete(user)
+    db.commit()
+
+def login(client, username: str, password: str = PASSWORD) -> int:
+    return client.post("/api/v1/auth/login", data={"username": username, "password": password}).status_code
+
+def test_successful_logins_from_one_address_are_not_throttled(client, limiters, staff):
+    # More logins than the address and username bursts, all from the test client's address
+    for username in staff:
+        assert login(client, username) == 200
+    for _ in range(3):
+        assert login(client, staff[0]) == 200
+
+def test_failed_attempts_use_up_the_username_budget(client, limiters, staff):
+    assert login(client, staff[0], "wrong") == 401
+    assert login(client, staff[0], "wrong") == 401
+    # Locked even with the right password, other users are unaffected
+    assert login(client, staff[0]) == 429
+    assert login(client, staff[1]) == 200
+
+def test_failed_attempts_use_up_the_address_budget(client, limiters, staff):
+    for username in staff[:3]:
+        assert login(client, username, "wrong") == 401
+    assert login(client, staff[3]) == 429
@@ -0,0 +1,157 @@
+"""
+Email outbox worker against a local SMTP server: per-message failures vs broken connections
+"""
+
+import socketserver
+import ssl
+import threading
+from email.message import EmailMessage
+
+import pytest
+
+from app.core.config import settings
+from app.services.mailer import EmailWorker
+
+class SMTPServer(socketserver.ThreadingTCPServer):
+    """
+    A minimal SMTP server on localhost.
+
+    Recipients in ``refused`` get a 550, messages to ``rejected`` a 552 after
+    their data, and the connection is dropped at the RCPT of ``disconnect_on``.
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), SMTPHandler)
+        self.refused = set()
+        self.rejected = set()
+        self.disconnect_on = set()
+        self.delivered = []
+        self.sessions = 0
+        self.quits = 0
+
+class SMTPHandler(socketserver.StreamRequestHandler):
+    def reply(self, line: str) -> None:
+        self.wfile.write(f"{line}\r\n".encode())
+
+    def handle(self) -> None:
+        server = self.server
+        server.sessions += 1
+        recipients = []
+        self.reply("220 localhost ESMTP")
+        while True:
+            line = self.rfile.readline().decode().rstrip("\r\n")
+            if not line:
+                return
+            command, _, argument = line.partition(" ")
+            command = command.upper()
+            if command in ("EHLO", "HELO"):
+                self.reply("250 localhost")
+            elif command == "MAIL":
+                recipients = []
+                self.reply("250 OK")
+            elif command == "RCPT":
+                address = argument.split(":", 1)[1].strip("<> ")
+                if address in server.disconnect_on:
+                    return
+                if address in server.refused:
+                    self.reply("550 No such user")
+                else:
+                    recipients.append(address)
+                    self.reply("250 OK")
+            elif command == "DATA":
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                while self.rfile.readline() not in (b".\r\n", b""):
+                    pass
+                if any(address in server.rejected for address in recipients):
+                    self.reply("552 Message size exceeds limit")
+                else:
+                    server.delivered.extend(recipients)
+                    self.reply("250 OK")
+            elif command in ("RSET", "NOOP"):
+                self.reply("250 OK")
+            elif command == "QUIT":
+                server.quits += 1
+                self.reply("221 Bye")
+                return
+            else:
+                self.reply("502 Command not implemented")
+
+@pytest.fixture
+def smtp_server(monkeypatch):
+    server = SMTPServer()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setattr(settings, "SMTP_HOST", "127.0.0.1")
+    monkeypatch.setattr(settings, "SMTP_PORT", server.server_address[1])
+    monkeypatch.setattr(settings, "SMTP_TLS", False)
+    monkeypatch.setattr(settings, "SMTP_USER", None)
+    monkeypatch.setattr(settings, "SMTP_TIMEOUT", 5)
+    yield server
+    server.shutdown()
+    server.server_close()
+
+@pytest.fixture
+def worker(smtp_server):
+    worker = EmailWorker(pool_size=1)
+    yield worker
+    worker.close()
+
+def message(to):
+    msg = EmailMessage()
+    msg["From"] = "noreply@kmrl.test"
+    msg["To"] = to
+    msg["Subject"] = "Test"
+    msg.set_content("Body")
+    return msg
+
+def test_refused_recipient_fails_only_that_message(smtp_server, worker):
+    smtp_server.refused.add("gone@kmrl.test")
+
+    results = worker._send_chunk([
+        (1, message("a@kmrl.test")),
+        (2, message("gone@kmrl.test")),
+        (3, message("b@kmrl.test")),
+    ])
+
+    assert results[1] is None and results[3] is None
+    assert "No such user" in results[2]
+    assert smtp_server.delivered == ["a@kmrl.test", "b@kmrl.test"]
+    assert smtp_server.sessions == 1
+
+def test_rejected_message_keeps_connection_pooled(smtp_server, worker):
+    smtp_server.rejected.add("big@kmrl.test")
+
+    results = worker._send_chunk([(1, message("big@kmrl.test")), (2, message("a@kmrl.test"))])
+    worker._send_chunk([(3, message("b@kmrl.test"))])
+
+    assert results[2] is None and "552" in results[1]
+    assert smtp_server.delivered == ["a@kmrl.test", "b@kmrl.test"]
+    assert smtp_server.sessions == 1
+
+def test_disconnect_leaves_rest_of_chunk_pending(smtp_server, worker):
+    smtp_server.disconnect_on.add("b@kmrl.test")
+
+    results = worker._send_chunk([
+        (1, message("a@kmrl.test")),
+        (2, message("b@kmrl.test")),
+        (3, message("c@kmrl.test")),
+    ])
+
+    assert results[1] is None
+    assert "closed" in results[2]
+    assert 3 not in results  # Retried in the next batch
+    # The next chunk gets a new connection
+    assert worker._send_chunk([(3, message("c@kmrl.test"))]) == {3: None}
+    assert smtp_server.sessions == 2
+
+def test_unexpected_error_discards_the_connection(smtp_server, worker):
+    with pytest.raises(ssl.SSLError):
+        with worker.pool.connection():
+            raise ssl.SSLError("decryption failed or bad record mac")
+
+    assert smtp_server.quits == 1
+    assert worker._send_chunk([(1, message("a@kmrl.test"))]) == {1: None}
+    assert smtp_server.sessions == 2
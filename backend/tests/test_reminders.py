@@ -0,0 +1,127 @@
+"""
+Deadline reminders: one per offset reached, never repeated across runs
+"""
+
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.document import Document, DocumentType, DocumentStatus
+from app.models.notification import Notification, NotificationType
+from app.services.reminders import run_deadline_reminders
+
+NOW = datetime.utcnow().replace(microsecond=0)
+
+@pytest.fixture(autouse=True)
+def offsets(monkeypatch):
+    monkeypatch.setattr(settings, "DEADLINE_REMINDER_OFFSETS_HOURS", [72, 24, 0])
+
+@pytest.fixture
+def make_document(db, admin):
+    created = []
+
+    def make(deadline: datetime, status: DocumentStatus = DocumentStatus.pending) -> int:
+        document = Document(
+            title="Escalator audit", type=DocumentType.safety, department="operations",
+            status=status, file_path="uploads/audit.pdf", file_name="audit.pdf",
+            file_type="pdf", file_size=1, uploaded_by=admin, deadline=deadline
+        )
+        db.add(document)
+        db.commit()
+        created.append(document)
+        return document.id
+
+    yield make
+    # Keep other tests' reminder runs to their own documents
+    for document in created:
+        db.delete(document)
+    db.query(Notification).filter(Notification.document_id.in_([d.id for d in created])).delete()
+    db.commit()
+
+def run(at: datetime) -> int:
+    """A reminder run in its own session, as after a restart"""
+    db = SessionLocal()
+    try:
+        return run_deadline_reminders(db, now=at)
+    finally:
+        db.close()
+
+def reminded_offsets(db, document_id: int):
+    rows = db.query(Notification.extra_data).filter(
+        Notification.document_id == document_id,
+        Notification.type == NotificationType.deadline_reminder
+    ).order_by(Notification.id).all()
+    return [json.loads(extra_data)["offset_hours"] for extra_data, in rows]
+
+def test_each_offset_is_reminded_once(db, make_document):
+    document_id = make_document(NOW + timedelta(hours=100))
+
+    run(NOW)
+    run(NOW + timedelta(hours=30))
+    run(NOW + timedelta(hours=31))
+    run(NOW + timedelta(hours=80))
+    run(NOW + timedelta(hours=101))
+    run(NOW + timedelta(hours=200))
+
+    assert reminded_offsets(db, document_id) == [72, 24, 0]
+
+def test_document_created_inside_a_window_gets_its_reminder(db, make_document):
+    document_id = make_document(NOW + timedelta(hours=10))
+
+    assert run(NOW) >= 1
+    run(NOW + timedelta(hours=11))
+
+    assert reminded_offsets(db, document_id) == [24, 0]
+
+def test_document_pending_after_its_window_passed(db, make_document):
+    document_id = make_document(NOW + timedelta(hours=50), status=DocumentStatus.draft)
+    run(NOW)
+    assert reminded_offsets(db, document_id) == []
+
+    document = db.get(Document, document_id)
+    document.status = DocumentStatus.pending
+    db.commit()
+    run(NOW + timedelta(hours=30))
+
+    assert reminded_offsets(db, document_id) == [24]
+
+def test_restart_does_not_resend(db, make_document):
+    document_id = make_document(NOW + timedelta(hours=60))
+
+    run(NOW)
+    # A restarted worker, or a cron run overlapping with one, starts from the database
+    assert run(NOW) == 0
+    assert run(NOW + timedelta(minutes=5)) == 0
+
+    assert reminded_offsets(db, document_id) == [72]
+
+def test_rolled_back_run_is_retried(db, make_document):
+    document_id = make_document(NOW + timedelta(hours=60))
+
+    session = SessionLocal()
+    try:
+        session.commit = session.rollback  # The process dies before the commit lands
+        run_deadline_reminders(session, now=NOW)
+    finally:
+        session.close()
+    assert reminded_offsets(db, document_id) == []
+
+    run(NOW)
+    assert reminded_offsets(db, document_id) == [72]
+
+def test_new_deadline_is_reminded_again(db, make_document):
+    document_id = make_document(NOW + timedelta(hours=20))
+    run(NOW)
+
+    document = db.get(Document, document_id)
+    row_version = document.row_version
+    document.deadline = NOW + timedelta(hours=70)
+    db.commit()
+    run(NOW + timedelta(hours=1))
+
+    assert reminded_offsets(db, document_id) == [24, 72]
+    # Reminders themselves are not edits
+    assert db.get(Document, document_id).row_version == row_version + 1
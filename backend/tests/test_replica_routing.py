@@ -0,0 +1,97 @@
+"""
+Read replica routing, with two local SQLite files as primary and replica
+"""
+
+import pytest
+from sqlalchemy import update
+from sqlalchemy.orm import sessionmaker
+
+from app.core import database
+from app.core.cache import invalidation_bus
+from app.core.config import settings
+from app.core.database import Base, ReplicaSet, RoutingSession
+from app.models.user import User, UserRole, UserDepartment
+from app.services import replication
+from app.services.replication import check_replica_settings
+
+@pytest.fixture
+def replica_set(app, tmp_path, monkeypatch):
+    """A replica with the schema but none of the primary's rows, in use until a test changes its lag"""
+    monkeypatch.setitem(invalidation_bus._handlers, "replica_writer", None)
+    replicas = ReplicaSet([f"sqlite:///{tmp_path / 'replica.db'}"])
+    Base.metadata.create_all(replicas.engines[0])
+    replicas.lag = [0.0]
+    monkeypatch.setattr(database, "replica_set", replicas)
+    monkeypatch.setattr(replication, "replica_set", replicas)
+    yield replicas
+    replicas.engines[0].dispose()
+
+@pytest.fixture
+def session_factory(replica_set):
+    factory = sessionmaker(class_=RoutingSession, autocommit=False, autoflush=False, bind=database.engine)
+    database._track_writes(factory)
+    return factory
+
+@pytest.fixture
+def primary_user(db):
+    user = User(
+        username="replica.reader", email="replica.reader@kmrl.co.in", hashed_password="!",
+        role=UserRole.user, department=UserDepartment.general
+    )
+    db.add(user)
+    db.commit()
+    yield user.id
+    db.delete(user)
+    db.commit()
+
+def read_session(factory, subject: str):
+    session = factory()
+    session.info.update(read_only=True, subject=subject)
+    return session
+
+def on_replica(session, user_id: int) -> bool:
+    """The replica has no users, so a user row is only found on the primary"""
+    return session.get(User, user_id) is None
+
+def test_reads_go_to_a_measured_replica(session_factory, replica_set, primary_user):
+    with read_session(session_factory, "1") as session:
+        assert on_replica(session, primary_user)
+        assert session.info["bind"] is replica_set.engines[0]
+
+def test_unmeasured_or_lagging_replica_falls_back_to_primary(session_factory, replica_set, primary_user):
+    for lag in (None, settings.REPLICA_MAX_LAG_SECONDS + 1):
+        replica_set.lag = [lag]
+        with read_session(session_factory, "1") as session:
+            assert not on_replica(session, primary_user)
+
+def test_writer_reads_from_primary_afterwards(session_factory, replica_set, primary_user):
+    with session_factory() as session:
+        session.info["subject"] = "writer"
+        session.get(User, primary_user).full_name = "Replica Reader"
+        session.commit()
+
+    with read_session(session_factory, "writer") as session:
+        assert not on_replica(session, primary_user)
+    with read_session(session_factory, "someone-else") as session:
+        assert on_replica(session, primary_user)
+
+def test_dml_in_a_read_only_session_goes_to_primary(session_factory, replica_set, primary_user, db):
+    with read_session(session_factory, "1") as session:
+        result = session.execute(update(User).where(User.id == primary_user).values(full_name="Updated"))
+        assert result.rowcount == 1
+        assert session.info["bind"] is database.engine
+        # Later reads stay on the primary, which has the uncommitted change
+        assert session.get(User, primary_user).full_name == "Updated"
+        session.commit()
+
+    db.expire_all()
+    assert db.get(User, primary_user).full_name == "Updated"
+
+def test_replicas_require_shared_recent_writers(replica_set, monkeypatch):
+    monkeypatch.setattr(settings, "CACHE_INVALIDATION_PUBSUB", False)
+    monkeypatch.setattr(settings, "REPLICA_SINGLE_WORKER", False)
+    with pytest.raises(RuntimeError, match="CACHE_INVALIDATION_PUBSUB"):
+        check_replica_settings()
+
+    monkeypatch.setattr(settings, "REPLICA_SINGLE_WORKER", True)
+    check_replica_settings()
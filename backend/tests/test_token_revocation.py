@@ -0,0 +1,34 @@
+"""
+Revocation list sync between workers
+"""
+
+from datetime import datetime, timedelta
+
+from app.models.token_revocation import TokenRevocation
+from app.services.token_revocation import RevocationList
+
+def add_revocation(db, token_id: str, row_id: int) -> None:
+    db.add(TokenRevocation(id=row_id, token_id=token_id, expires_at=datetime.utcnow() + timedelta(hours=1)))
+    db.commit()
+
+def test_sync_picks_up_rows_committed_out_of_id_order(db):
+    revocations = RevocationList()
+    revocations.sync(db)
+
+    # The sequence handed out 9001 before 9002, but 9002 committed first
+    add_revocation(db, "session-later-id", 9002)
+    revocations.sync(db)
+    add_revocation(db, "session-earlier-id", 9001)
+    revocations.sync(db)
+
+    assert revocations.is_revoked({"sub": "1", "sid": "session-later-id"})
+    assert revocations.is_revoked({"sub": "1", "sid": "session-earlier-id"})
+
+def test_sync_is_idempotent(db):
+    revocations = RevocationList()
+    add_revocation(db, "session-synced-twice", 9100)
+    revocations.sync(db)
+    revocations.sync(db)
+
+    assert revocations.is_revoked({"sub": "1", "sid": "session-synced-twice"})
+    assert not revocations.is_revoked({"sub": "1", "sid": "another-session"})
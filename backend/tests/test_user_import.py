@@ -0,0 +1,77 @@
+"""
+Bulk user import racing other inserts of the same usernames and emails
+"""
+
+import pytest
+
+from app.core.database import SessionLocal
+from app.models.user import User, UserRole, UserDepartment
+from app.services import user_import
+from app.services.user_import import import_users
+
+def row(name: str, email: str = None) -> dict:
+    return {
+        "username": name,
+        "email": email or f"{name}@kmrl.co.in",
+        "password": "Station#2024",
+        "full_name": name.title(),
+        "role": "user",
+        "department": "operations"
+    }
+
+@pytest.fixture
+def cleanup(db):
+    usernames = []
+    yield usernames
+    db.query(User).filter(User.username.in_(usernames)).delete(synchronize_session=False)
+    db.commit()
+
+def insert_concurrently(username: str, email: str) -> None:
+    """A create_user on another connection, committed while the import hashes"""
+    other = SessionLocal()
+    try:
+        other.add(User(
+            username=username, email=email, hashed_password="!",
+            role=UserRole.user, department=UserDepartment.general
+        ))
+        other.commit()
+    finally:
+        other.close()
+
+def test_conflicting_rows_are_reported_and_the_rest_created(db, cleanup, monkeypatch):
+    cleanup += ["import.alpha", "import.beta", "import.gamma", "import.taken"]
+    hash_passwords = user_import.hash_passwords
+
+    def hash_while_others_insert(passwords):
+        insert_concurrently("import.beta", "beta.elsewhere@kmrl.co.in")
+        insert_concurrently("import.taken", "import.gamma@kmrl.co.in")
+        return hash_passwords(passwords)
+
+    monkeypatch.setattr(user_import, "hash_passwords", hash_while_others_insert)
+
+    result = import_users(db, [row("import.alpha"), row("import.beta"), row("import.gamma")])
+
+    assert result["created"] == 1
+    alpha, beta, gamma = result["rows"]
+    assert alpha["status"] == "created" and alpha["user_id"] is not None
+    assert beta["status"] == "error" and beta["errors"] == ["Username already registered"]
+    assert gamma["status"] == "error" and gamma["errors"] == ["Email already registered"]
+    assert db.query(User).filter(User.username == "import.alpha").count() == 1
+
+def test_rows_taken_before_the_import_are_reported(db, cleanup):
+    cleanup += ["import.first", "import.second"]
+    import_users(db, [row("import.first")])
+
+    result = import_users(db, [row("import.first"), row("import.second")])
+
+    assert [entry["status"] for entry in result["rows"]] == ["error", "created"]
+    assert result["rows"][0]["errors"] == ["Username already registered", "Email already registered"]
+
+def test_hash_pool_is_reused(monkeypatch):
+    monkeypatch.setattr(user_import, "_hash_pool", None)
+    try:
+        first = user_import.get_hash_pool()
+        assert user_import.get_hash_pool() is first
+    finally:
+        user_import.shutdown_hash_pool()
+    assert user_import._hash_pool is None
@@ -0,0 +1,92 @@
+"""
+Workflow transitions: the state machine and single-commit recording
+"""
+
+import pytest
+from fastapi import HTTPException
+
+from app.api.v1.endpoints.documents import commit_document_change
+from app.core.database import SessionLocal
+from app.models.document import Document, DocumentStatus, WorkflowHistory
+from app.models.notification import Notification, NotificationType
+from app.models.user import User
+from app.services.workflow import TRANSITIONS, InvalidTransition, transition
+
+ALLOWED = {
+    "approve": ({DocumentStatus.pending, DocumentStatus.draft}, DocumentStatus.approved),
+    "reject": ({DocumentStatus.pending, DocumentStatus.draft}, DocumentStatus.rejected),
+    "request_revision": (
+        {DocumentStatus.pending, DocumentStatus.approved, DocumentStatus.rejected},
+        DocumentStatus.draft
+    ),
+}
+
+def recorded(db, document_id: int):
+    """Status, history actions and revision notifications as committed"""
+    db.expire_all()
+    history = db.query(WorkflowHistory.action).filter(WorkflowHistory.document_id == document_id).all()
+    notifications = db.query(Notification).filter(
+        Notification.document_id == document_id,
+        Notification.type == NotificationType.document_action
+    ).count()
+    return db.get(Document, document_id).status, [action for action, in history], notifications
+
+def test_state_machine(db, admin, document):
+    assert set(TRANSITIONS) == set(ALLOWED)
+    user = db.get(User, admin)
+    for action, (sources, target) in ALLOWED.items():
+        for current in DocumentStatus:
+            loaded = db.get(Document, document)
+            loaded.status = current
+            if current in sources:
+                entry = transition(db, loaded, action, user)
+                assert loaded.status == target
+                assert (entry.previous_status, entry.new_status) == (current.value, target.value)
+            else:
+                with pytest.raises(InvalidTransition):
+                    transition(db, loaded, action, user)
+                assert loaded.status == current
+            db.rollback()
+
+def test_approved_document_cannot_be_approved_again(client, db, admin_headers, document):
+    url = f"/api/v1/documents/{document}/approve"
+    body = {"action": "approve"}
+    assert client.post(url, headers=admin_headers, json=body).status_code == 200
+
+    again = client.post(url, headers=admin_headers, json=body)
+
+    assert again.status_code == 409
+    assert "approved" in again.json()["detail"]
+    assert recorded(db, document)[:2] == (DocumentStatus.approved, ["approve"])
+
+def test_transition_is_recorded_in_one_commit(db, admin, document):
+    session = SessionLocal()
+    try:
+        transition(session, session.get(Document, document), "request_revision", session.get(User, admin), "Add photos")
+        session.flush()
+        # Nothing is visible to others until the caller commits
+        assert recorded(db, document) == (DocumentStatus.pending, [], 0)
+        db.rollback()
+
+        commit_document_change(session)
+    finally:
+        session.close()
+
+    assert recorded(db, document) == (DocumentStatus.draft, ["request_revision"], 1)
+
+def test_failed_commit_records_nothing(db, admin, document):
+    session = SessionLocal()
+    try:
+        loaded = session.get(Document, document)
+        # Another request changes the document in between
+        db.get(Document, document).title = "Renamed meanwhile"
+        db.commit()
+
+        transition(session, loaded, "request_revision", session.get(User, admin))
+        with pytest.raises(HTTPException) as raised:
+            commit_document_change(session)
+        assert raised.value.status_code == 409
+    finally:
+        session.close()
+
+    assert recorded(db, document) == (DocumentStatus.pending, [], 0)
@@ -0,0 +1,45 @@
+"""
+A write waiting on the SQLite write lock does not block the event loop
+"""
+
+import threading
+
+from fastapi.testclient import TestClient
+
+from app.models.document import Document
+
+def test_waiting_writer_leaves_event_loop_free(app, db, admin_headers, document):
+    # One shared event loop for all requests, as in a server worker
+    with TestClient(app, base_url="http://localhost") as client:
+        # Hold the write lock from another "request"
+        db.get(Document, document).title = "Track inspection (locked)"
+        db.flush()
+
+        responses = {}
+
+        def comment():
+            responses["comment"] = client.post(
+                f"/api/v1/documents/{document}/comments",
+                headers=admin_headers, json={"content": "Waiting for the lock"}
+            )
+
+        def health():
+            responses["health"] = client.get("/health")
+
+        writer = threading.Thread(target=comment)
+        writer.start()
+        writer.join(timeout=0.5)
+        assert writer.is_alive(), "the comment should wait for the write lock"
+
+        reader = threading.Thread(target=health)
+        reader.start()
+        reader.join(timeout=5)
+        alive = reader.is_alive()
+
+        db.rollback()
+        writer.join()
+        reader.join()
+
+    assert not alive, "/health was blocked by a writer waiting on the lock"
+    assert responses["health"].status_code == 200
+    assert responses["comment"].status_code == 200
@@ -26,13 +26,61 @@ apiClient.interceptors.request.use(
   }
 );
 
+// Single in-flight refresh shared by all requests that got a 401
+let refreshRequest = null;
+
+// Tabs share the stored tokens, and a refresh token can be used only once
+// (the server revokes the session on reuse), so refreshes are serialized
+// across tabs with the Web Locks API where available
+const withRefreshLock = (callback) =>
+  navigator.locks ? navigator.locks.request('kmrl-token-refresh', callback) : callback();
+
+const refreshAccessToken = (failedToken) => {
+  if (!refreshRequest) {
+    refreshRequest = withRefreshLock(async () => {
+      // Another tab may have refreshed while this one waited for the lock
+      const currentToken = localStorage.getItem('authToken');
+      if (currentToken && currentToken !== failedToken) {
+        return currentToken;
+      }
+      const refreshToken = localStorage.getItem('refreshToken');
+      const response = await axios.post(`${API_BASE_URL}/auth/refresh`, { refresh_token: refreshToken });
+      localStorage.setItem('authToken', response.data.access_token);
+      localStorage.setItem('refreshToken', response.data.refresh_token);
+      return response.data.access_token;
+    }).finally(() => {
+      refreshRequest = null;
+    });
+  }
+  return refreshRequest;
+};
+
 // Response interceptor for error handling
 apiClient.interceptors.response.use(
   (response) => response,
-  (error) => {
+  async (error) => {
+    const originalRequest = error.config;
+    if (
+      error.response?.status === 401 &&
+      originalRequest &&
+      !originalRequest._retried &&
+      localStorage.getItem('refreshToken')
+    ) {
+      // Access tokens are short-lived, get a new one and retry once
+      originalRequest._retried = true;
+      try {
+        const failedToken = originalRequest.headers.Authorization?.replace('Bearer ', '');
+        const token = await refreshAccessToken(failedToken);
+        originalRequest.headers.Authorization = `Bearer ${token}`;
+        return apiClient(originalRequest);
+      } catch (refreshError) {
+        // Fall through to the login redirect
+      }
+    }
     if (error.response?.status === 401) {
       // Handle unauthorized - redirect to login
       localStorage.removeItem('authToken');
+      localStorage.removeItem('refreshToken');
       window.location.href = '/login';
     }
     return Promise.reject(error);
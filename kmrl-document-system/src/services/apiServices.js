@@ -21,6 +21,7 @@ export const authService = {
   logout: async () => {
     const response = await apiClient.post('/auth/logout');
     localStorage.removeItem('authToken');
+    localStorage.removeItem('refreshToken');
     return response.data;
   },
 
@@ -13,6 +13,9 @@ export const loginUser = createAsyncThunk(
       if (response.access_token) {
         localStorage.setItem('authToken', response.access_token);
       }
+      if (response.refresh_token) {
+        localStorage.setItem('refreshToken', response.refresh_token);
+      }
       
       // Automatically fetch user data after successful login
       dispatch(getCurrentUser());
@@ -51,13 +54,13 @@ export const logoutUser = createAsyncThunk(
   'auth/logout',
   async (_, { rejectWithValue }) => {
     try {
-      // Mock logout for demo
-      localStorage.removeItem('authToken');
-      return true;
+      await authService.logout();
     } catch (error) {
+      // Log out locally even if the server could not revoke the tokens
       localStorage.removeItem('authToken');
-      return rejectWithValue('Logout failed');
+      localStorage.removeItem('refreshToken');
     }
+    return true;
   }
 );
 